@@ -19,6 +19,7 @@ DEFAULT_VISION_MODEL = "gemini-2.5-pro" # Gemini has vision capabilities
 # --- Agent Configuration ---
 MAX_ITERATIONS = 25  # Max iterations for the main development loop in S3
 ALLOW_INTERIM_FEEDBACK = True  # Flag to allow user feedback during development
+PRELOAD_S1_AGENTS = []  # S1 agents to create at startup; all others are created on first use
 
 # --- Logging Configuration ---
 LOG_LEVEL = "INFO"  # "DEBUG", "INFO", "WARNING", "ERROR"
@@ -29,7 +30,124 @@ PROJECTS_DIR = "generated_projects"
 KNOWLEDGE_BASE_DIR = "vsm_knowledge_base"
 S5_POLICY_FILE = os.path.join(KNOWLEDGE_BASE_DIR, "system5_policies.json")
 S4_KNOWLEDGE_FILE = os.path.join(KNOWLEDGE_BASE_DIR, "system4_knowledge.json")
+S4_KNOWLEDGE_JOURNAL_FILE = os.path.join(KNOWLEDGE_BASE_DIR, "system4_knowledge.journal.jsonl")
+
+# --- State Hot Reload ---
+STATE_RELOAD_POLL_INTERVAL = 2  # Seconds between checks of the policy/knowledge files
+
+# --- S4 Knowledge Store ---
+S4_CATEGORY_CAPACITY = 50  # Max entries kept per knowledge category
+S4_CATEGORY_CAPACITIES = {}  # Per-category overrides, e.g. {"security_threats": 100}
+S4_KNOWLEDGE_MAX_AGE_SECONDS = 30 * 86400  # Entries not re-seen for this long are dropped
+S4_RELEVANCE_HALF_LIFE_SECONDS = 7 * 86400  # Decay of an entry's hit count when ranking for eviction
+S4_JOURNAL_COMPACT_THRESHOLD = 500  # Journal records before the knowledge file is rewritten
+
+# --- S4 Knowledge Retrieval ---
+ENABLE_S4_RETRIEVAL = True  # Give agents only the relevant S4 entries instead of the whole base
+S4_CONTEXT_TOP_K = 8  # Number of knowledge entries put into an agent's context
+S4_EMBEDDING_DIM = 256  # Size of the hashed term embeddings (only used if NumPy is installed)
+S4_EMBEDDING_WEIGHT = 0.5  # Weight of embedding similarity relative to normalised BM25
+
+# --- Project Archival ---
+PROJECT_ARCHIVE_DIR = "archived_projects"
+ARCHIVE_ON_FINALIZE = False  # Archive a project as soon as S3 finalizes it
+ARCHIVE_MIN_AGE_SECONDS = 7 * 86400  # Completed projects untouched this long are compacted
+ARCHIVE_COMPACTION_INTERVAL = 3600  # Seconds between background compaction runs
+
+# --- Artifact Reading ---
+ARTIFACT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Total size of artifact contents kept in memory
+ARTIFACT_MMAP_THRESHOLD = 1024 * 1024  # Files at least this large are memory-mapped
+ARTIFACT_READ_CHUNK_SIZE = 64 * 1024  # Chunk size for streaming artifact reads
+
+# --- Symbol Index ---
+SYMBOL_CONTEXT_MAX_CHARS = 6000  # Budget for existing-code context in an agent prompt
+SYMBOL_SNIPPET_MAX_LINES = 40  # Source lines shown per directly referenced symbol
+
+# --- Algedonic Signals ---
+ALGEDONIC_BUS_CAPACITY = 10000  # Signals kept in the ring buffer; older ones are overwritten
+ALGEDONIC_METRIC_WINDOWS = {  # name -> (window seconds, bucket seconds)
+    "hour": (3600, 60),
+    "day": (86400, 3600),
+    "week": (7 * 86400, 6 * 3600),
+}
+S5_PERFORMANCE_WINDOW = "week"  # Window S5 reviews when adapting policies
+ALGEDONIC_LOG_DIR = "algedonic_signal_log"
+ALGEDONIC_LOG_SEGMENT_BYTES = 4 * 1024 * 1024  # Size at which a log segment is sealed
+ALGEDONIC_LOG_MAX_SEGMENTS = 64  # Oldest segments beyond this are deleted
+ALGEDONIC_LOG_INDEX_INTERVAL = 256  # Records between time-index checkpoints
+ALGEDONIC_DEFAULT_SEVERITY = {"PAIN": 0.3, "PLEASURE": 0.0}  # Severity (0-1) of signals raised without one
+ALGEDONIC_DEBOUNCE_SECONDS = 30  # Repeats of a category for a project within this time are dropped
+ALGEDONIC_RATE_LIMIT = 5  # Signals delivered per handler per rate period
+ALGEDONIC_RATE_PERIOD_SECONDS = 60
+ALGEDONIC_ROUTING_BYPASS_SEVERITY = 0.9  # Signals this severe skip debouncing and rate limiting
+
+# --- S3 Interventions ---
+S3_PAIN_THRESHOLDS = {"replan": 0.5, "pause": 0.75, "abort": 0.9}  # Minimum PAIN severity per action
+S3_PAUSE_TIMEOUT_SECONDS = 300  # A paused project resumes on its own after this long
+
+# --- Tool Execution ---
+TOOL_MAX_CONCURRENCY = max(4, os.cpu_count() or 1)  # Commands the ToolInterface pool runs at once; most wait on I/O
+TOOL_DEFAULT_TIMEOUT = 60  # Seconds before a tool command is killed
+TOOL_OUTPUT_HEAD_BYTES = 64 * 1024  # Bytes kept from the start of each output stream
+TOOL_OUTPUT_TAIL_BYTES = 64 * 1024  # Bytes kept from the end of each output stream
+TOOL_OUTPUT_LOG_DIR = ".tool_logs"  # Full output of streams that exceed the caps; None to disable
+TOOL_OUTPUT_LOG_MAX_FILES = 200  # Newest full-output logs kept in TOOL_OUTPUT_LOG_DIR; None to keep all
+
+# --- Tool Caches ---
+TOOL_CACHE_DIR = ".tool_cache"  # Content-addressed cache of lint (and other tool) results
+LINT_BATCH_MAX_FILES = 200  # Files passed to one linter invocation
+COMPILE_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Least recently used compile outputs are evicted beyond this
+LINT_CONFIG_FILES = [  # Linter config files whose contents are part of the lint cache key
+    "pyproject.toml", "setup.cfg", "tox.ini", ".pylintrc", "pylintrc", ".flake8", "ruff.toml", ".ruff.toml",
+]
+
+# --- Local Validation ---
+LOCAL_VALIDATION_TIERS = ["syntax", "imports", "lint", "quick_tests"]  # Run cheapest first; drop a tier to disable it
+LOCAL_VALIDATION_LINTER = "pylint --errors-only --disable=import-error,no-name-in-module"  # Imports are a tier of their own
+LOCAL_VALIDATION_LIMITS = {"cpu_seconds": 10, "memory_bytes": 512 * 1024 * 1024, "wall_seconds": 15}  # Quick-test run
+LOCAL_VALIDATION_MAX_REPAIRS = 2  # Quick LLM repairs of a validation failure before the task fails
+
+# --- Self-Critique ---
+SELF_CRITIQUE_MAX_ROUNDS = 3  # Review rounds for code that fails static validation
+SELF_CRITIQUE_CONVERGENCE_RATIO = 0.98  # difflib similarity of successive versions at which refinement stops
+SELF_CRITIQUE_SIMPLE_MAX_LINES = 40  # Code this short that passes static validation is not reviewed...
+SELF_CRITIQUE_SIMPLE_MAX_BRANCHES = 5  # ...if it also has at most this many decision points
+
+# --- Best-of-N Generation ---
+CODE_CANDIDATES = 1  # Candidates coding agents generate concurrently per task; 1 disables best-of-N
+CODE_CANDIDATE_TEMPERATURES = [0.7, 0.3, 1.0]  # Cycled over the candidates
+CODE_CANDIDATE_TIERS = ["syntax", "imports", "lint", "quick_tests"]  # Validation a candidate must pass to be accepted
+
+# --- Sandboxed Execution ---
+SANDBOX_ROOT = None  # Parent directory of the private sandbox directories; None for the system temp dir
+SANDBOX_ISOLATE_NETWORK = True  # Cut off network access where `unshare --net` is permitted
+SANDBOX_LIMITS = {  # rlimits for sandboxed commands (see core/resource_limits.py)
+    "cpu_seconds": 60,
+    "memory_bytes": 2 * 1024 * 1024 * 1024,
+    "file_size_bytes": 256 * 1024 * 1024,
+    "open_files": 1024,
+    # RLIMIT_NPROC; stops fork bombs. Applied only when the command runs in
+    # its own user namespace (network isolation), where the count covers the
+    # sandbox's processes alone; otherwise it would count every process of
+    # the agent's user. The kernel does not enforce it for real root.
+    "processes": 512,
+}
+
+# --- Python Fork Server ---
+FORK_SERVER_POOL_SIZE = 2  # Warm interpreters kept for running generated Python code
+FORK_SERVER_PRELOAD = ["json", "re", "unittest", "unittest.mock"]  # Imported once per server, not per job
+PYTHON_JOB_LIMITS = {  # Applied to every Python job (see core/resource_limits.py)
+    "cpu_seconds": 30,
+    "memory_bytes": 1024 * 1024 * 1024,
+    "file_size_bytes": 64 * 1024 * 1024,
+    "wall_seconds": 60,
+}
 
 # --- Feature Flags ---
 ENABLE_S4_DAEMON_SCANNING = True
 ENABLE_S5_DAEMON_ADAPTATION = True
+ENABLE_PROJECT_ARCHIVAL = True
+ENABLE_STATE_HOT_RELOAD = True
+ENABLE_FORK_SERVER = True  # Run generated Python in warm forked interpreters where os.fork exists
+ENABLE_ALGEDONIC_LOG = True  # Persist signals and restore the metrics windows on startup
+ENABLE_SYMBOL_INDEX = True  # Index project code and give agents the parts a task refers to
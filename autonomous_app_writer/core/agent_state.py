@@ -1,15 +1,67 @@
 """
 Manages the global state of the agent.
 This includes S5 Policies, S4 Knowledge, and S1 Capabilities.
+
+S5 policies and S4 knowledge are published as immutable, versioned snapshots.
+Readers take the current snapshot without locking and always see a consistent
+pair; writers build a new snapshot under a lock and swap it in atomically.
 """
 
 import json
 import os
+import threading
+from collections import namedtuple
 from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.knowledge_store import KnowledgeStore
 
 logger = get_logger(__name__)
 
+# An immutable view of the shared state. 'version' changes on every write,
+# the per-part versions only when that part changes.
+StateSnapshot = namedtuple(
+    "StateSnapshot",
+    ["version", "policy_version", "knowledge_version", "s5_policies", "s4_knowledge"]
+)
+
+class FrozenDict(dict):
+    """A dict that rejects mutation. Prints and serializes like a plain dict."""
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("AgentState snapshots are read-only; use the AgentState update methods.")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+class FrozenList(list):
+    """A list that rejects mutation. Prints and serializes like a plain list."""
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("AgentState snapshots are read-only; use the AgentState update methods.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+def freeze(obj):
+    """Returns a deeply read-only copy of a JSON-like structure."""
+    if isinstance(obj, dict):
+        return FrozenDict({key: freeze(value) for key, value in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(freeze(value) for value in obj)
+    return obj
+
+def thaw(obj):
+    """Returns a deeply mutable copy of a (possibly frozen) JSON-like structure."""
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    return obj
+
 class AgentState:
     """
     A singleton class to manage the agent's state.
@@ -25,17 +77,162 @@ class AgentState:
     def __init__(self):
         if self._initialized:
             return
-        self._initialized = True
-        
-        self.s5_policies = {}
-        self.s4_knowledge = {}
+
+        self._write_lock = threading.RLock()
+        self._snapshot = StateSnapshot(0, 0, 0, FrozenDict(), FrozenDict())
+        self._written_stats = {}  # file path -> (mtime_ns, size) of our last save
+        self.knowledge_store = KnowledgeStore()
         self.s1_capabilities = {}
         
         self._ensure_knowledge_base_dir()
         self.load_s5_policies()
         self.load_s4_knowledge()
+        # Set last: get_agent_state() hands out the instance without locking once this is True.
+        self._initialized = True
         logger.info("AgentState initialized.")
 
+    # --- Snapshot access ---
+
+    def snapshot(self):
+        """
+        Returns the current immutable StateSnapshot.
+
+        Callers that read both policies and knowledge should take one snapshot
+        and read from it, rather than reading the properties separately.
+        """
+        return self._snapshot
+
+    @property
+    def s5_policies(self):
+        """The current S5 policies (read-only)."""
+        return self._snapshot.s5_policies
+
+    @s5_policies.setter
+    def s5_policies(self, policies):
+        self.set_s5_policies(policies, persist=False)
+
+    @property
+    def s4_knowledge(self):
+        """The current S4 knowledge (read-only)."""
+        return self._snapshot.s4_knowledge
+
+    @s4_knowledge.setter
+    def s4_knowledge(self, knowledge):
+        self.set_s4_knowledge(knowledge, persist=False)
+
+    @property
+    def version(self):
+        """The version of the current snapshot."""
+        return self._snapshot.version
+
+    @property
+    def policy_version(self):
+        """Incremented whenever the S5 policies change; usable as a cache key."""
+        return self._snapshot.policy_version
+
+    @property
+    def knowledge_version(self):
+        """Incremented whenever the S4 knowledge changes; usable as a cache key."""
+        return self._snapshot.knowledge_version
+
+    # --- Writers ---
+
+    def set_s5_policies(self, policies, persist=True):
+        """
+        Publishes a new version of the S5 policies.
+
+        Args:
+            policies (dict): The complete new policy document.
+            persist (bool): If True, also saves the policies to disk.
+
+        Returns:
+            StateSnapshot: The newly published snapshot.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            self._snapshot = current._replace(
+                version=current.version + 1,
+                policy_version=current.policy_version + 1,
+                s5_policies=freeze(policies)
+            )
+            if persist:
+                self.save_s5_policies()
+            return self._snapshot
+
+    def set_s4_knowledge(self, knowledge, persist=True):
+        """
+        Publishes a new version of the S4 knowledge base.
+
+        Args:
+            knowledge (dict): The complete new knowledge base.
+            persist (bool): If True, also rewrites the knowledge file. The change
+                is journaled by the knowledge store either way.
+
+        Returns:
+            StateSnapshot: The newly published snapshot.
+        """
+        with self._write_lock:
+            self.knowledge_store.replace(knowledge)
+            if persist:
+                self.save_s4_knowledge()
+            return self._publish_s4_knowledge()
+
+    def ingest_s4_knowledge(self, new_knowledge):
+        """
+        Merges newly discovered knowledge into the S4 knowledge base.
+
+        Items already known are deduplicated and refreshed, stale items age out
+        and each category stays within its capacity. Only the changed entries
+        are written to disk.
+
+        Args:
+            new_knowledge (dict): category -> list of new items.
+
+        Returns:
+            dict: Counts of 'added', 'refreshed' and 'evicted' entries.
+        """
+        with self._write_lock:
+            summary = self.knowledge_store.ingest(new_knowledge)
+            self._publish_s4_knowledge()
+            return summary
+
+    def apply_s4_knowledge_edit(self, edited_knowledge, persist=False):
+        """
+        Applies an operator's edit of the S4 knowledge file (used by hot reload).
+
+        Returns:
+            StateSnapshot: The newly published snapshot.
+        """
+        with self._write_lock:
+            self.knowledge_store.apply_edit(edited_knowledge)
+            if persist:
+                self.save_s4_knowledge()
+            return self._publish_s4_knowledge()
+
+    def _publish_s4_knowledge(self):
+        """Publishes the knowledge store's current view as a new snapshot. Caller holds the write lock."""
+        current = self._snapshot
+        self._snapshot = current._replace(
+            version=current.version + 1,
+            knowledge_version=current.knowledge_version + 1,
+            s4_knowledge=freeze(self.knowledge_store.view())
+        )
+        return self._snapshot
+
+    def update_s4_knowledge(self, changes, persist=True):
+        """
+        Publishes a new S4 knowledge version with the given top-level keys replaced.
+
+        Equivalent to dict.update() on the knowledge base, but builds a new
+        version instead of mutating the one readers may be holding.
+        """
+        with self._write_lock:
+            knowledge = thaw(self._snapshot.s4_knowledge)
+            knowledge.update(changes)
+            return self.set_s4_knowledge(knowledge, persist=persist)
+
+    # --- Persistence ---
+
     def _ensure_knowledge_base_dir(self):
         """Ensures the knowledge base directory exists."""
         os.makedirs(config.KNOWLEDGE_BASE_DIR, exist_ok=True)
@@ -44,44 +241,70 @@ class AgentState:
         """Loads S5 policies from a JSON file."""
         try:
             with open(file_path, 'r') as f:
-                self.s5_policies = json.load(f)
+                self.set_s5_policies(json.load(f), persist=False)
             logger.info(f"S5 policies loaded from {file_path}")
         except FileNotFoundError:
             logger.warning(f"S5 policy file not found at {file_path}. Using default policies.")
-            self.s5_policies = self._get_default_policies()
-            self.save_s5_policies()
+            self.set_s5_policies(self._get_default_policies())
 
     def save_s5_policies(self, file_path=config.S5_POLICY_FILE):
         """Saves S5 policies to a JSON file."""
-        with open(file_path, 'w') as f:
-            json.dump(self.s5_policies, f, indent=4)
+        self._write_json_atomically(file_path, self._snapshot.s5_policies)
         logger.info(f"S5 policies saved to {file_path}")
 
     def load_s4_knowledge(self, file_path=config.S4_KNOWLEDGE_FILE):
-        """Loads S4 knowledge from a JSON file."""
-        try:
-            with open(file_path, 'r') as f:
-                self.s4_knowledge = json.load(f)
-            logger.info(f"S4 knowledge loaded from {file_path}")
-        except FileNotFoundError:
-            logger.warning(f"S4 knowledge file not found at {file_path}. Initializing empty knowledge base.")
-            self.s4_knowledge = {"tech_trends": [], "security_threats": [], "ux_ui_trends": []}
-            self.save_s4_knowledge()
+        """
+        Loads S4 knowledge through the knowledge store.
+
+        The store replays its journal if there is one, and otherwise seeds
+        itself from the JSON file (or an empty knowledge base).
+        """
+        with self._write_lock:
+            self.knowledge_store.load(file_path)
+            self._publish_s4_knowledge()
+        logger.info(f"S4 knowledge loaded from {file_path}")
 
     def save_s4_knowledge(self, file_path=config.S4_KNOWLEDGE_FILE):
-        """Saves S4 knowledge to a JSON file."""
-        with open(file_path, 'w') as f:
-            json.dump(self.s4_knowledge, f, indent=4)
+        """Saves the full S4 knowledge to its JSON file and compacts the journal."""
+        with self._write_lock:
+            self.knowledge_store.view_path = file_path
+            self.knowledge_store.compact()
         logger.info(f"S4 knowledge saved to {file_path}")
 
+    def _write_json_atomically(self, file_path, data):
+        """Writes JSON to a temporary file and renames it over file_path."""
+        tmp_path = f"{file_path}.tmp"
+        with self._write_lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, file_path)
+            st = os.stat(file_path)
+            self._written_stats[file_path] = (st.st_mtime_ns, st.st_size)
+
+    def last_written_stat(self, file_path):
+        """Returns (mtime_ns, size) of this process's last save to file_path, or None."""
+        if file_path == self.knowledge_store.view_path:
+            return self.knowledge_store.last_written_stat
+        return self._written_stats.get(file_path)
+
+    # --- S1 capabilities ---
+
     def register_s1_capability(self, agent_name, agent_instance):
         """Registers an S1 agent's capabilities."""
-        self.s1_capabilities[agent_name] = agent_instance
+        with self._write_lock:
+            self.s1_capabilities[agent_name] = agent_instance
         logger.info(f"Registered S1 capability: {agent_name}")
 
     def get_s1_agent(self, agent_name):
-        """Retrieves a registered S1 agent."""
-        return self.s1_capabilities.get(agent_name)
+        """
+        Retrieves an S1 agent, creating it on first use if it is declared in the agent registry.
+        """
+        agent = self.s1_capabilities.get(agent_name)
+        if agent is None:
+            # Imported here: the registry imports agent modules, which import this one.
+            from autonomous_app_writer.vsm_system1_operational_agents.registry import get_agent_registry
+            agent = get_agent_registry().get_agent(agent_name)
+        return agent
 
     def _get_default_policies(self):
         """Returns a set of default S5 policies."""
@@ -100,9 +323,18 @@ class AgentState:
             "success_criteria": "Deliver functional, tested, and documented applications that meet user requirements."
         }
 
-# Singleton instance
-agent_state = AgentState()
+_agent_state_lock = threading.Lock()
 
 def get_agent_state():
-    """Returns the singleton AgentState instance."""
-    return agent_state
+    """
+    Returns the singleton AgentState instance.
+
+    The state (and the policy/knowledge files behind it) is loaded on the
+    first call rather than at import.
+    """
+    instance = AgentState._instance
+    if instance is None or not instance._initialized:
+        with _agent_state_lock:
+            # AgentState() re-checks _initialized under the lock.
+            return AgentState()
+    return instance
@@ -3,7 +3,15 @@ Central system for handling Algedonic Signals (pain/pleasure).
 This is crucial for the agent's learning and adaptation mechanisms.
 """
 
+import logging
+import threading
+import time
+from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.signal_bus import SignalBus
+from autonomous_app_writer.core.signal_metrics import SignalAggregator
+from autonomous_app_writer.core.signal_log import SignalLog
+from autonomous_app_writer.core.signal_router import SignalRouter
 
 logger = get_logger(__name__)
 
@@ -11,79 +19,161 @@ class AlgedonicManager:
     """
     Manages the routing and processing of algedonic signals.
     """
-    def __init__(self):
-        self.signal_queue = []
+    def __init__(self, bus=None, signal_log=None):
+        self.bus = bus or SignalBus()
+        self.metrics = SignalAggregator()
+        self.signal_log = signal_log
+        self.router = SignalRouter()
+        if self.signal_log is None and config.ENABLE_ALGEDONIC_LOG:
+            self.signal_log = SignalLog()
+        if self.signal_log is not None:
+            self._restore_metrics()
         logger.info("Algedonic Manager initialized.")
 
-    def handle_signal(self, signal_type, event_category, details, target_systems=None):
+    def handle_signal(self, signal_type, event_category, details, target_systems=None, severity=None):
         """
         Logs and routes a signal to the appropriate systems.
 
         Args:
             signal_type (str): "PAIN" or "PLEASURE".
             event_category (str): A descriptor for the event (e.g., "S1_Task_Failure").
-            details (dict): A dictionary containing details about the event.
+            details (dict): A dictionary containing details about the event. A
+                "project_id" key scopes the signal to that project's handlers.
             target_systems (list, optional): A list of VSM systems to notify (e.g., ["S3", "S4"]).
+            severity (float, optional): 0 (informational) to 1 (critical). Defaults
+                to config.ALGEDONIC_DEFAULT_SEVERITY for the signal type.
         """
-        log_level = "ERROR" if signal_type == "PAIN" else "INFO"
+        if severity is None:
+            severity = config.ALGEDONIC_DEFAULT_SEVERITY.get(signal_type, 0.0)
+        log_level = logging.ERROR if signal_type == "PAIN" else logging.INFO
         
         logger.log(
-            getattr(logger, log_level.lower()),
+            log_level,
             f"ALGEDONIC SIGNAL ({signal_type}): Category='{event_category}', "
             f"Details={details}, Targets={target_systems or 'All'}"
         )
 
-        # Here, you would add logic to route the signal to the actual system components.
-        # For example, a critical PAIN signal might trigger a notification to a human overseer,
-        # update a metric in a monitoring system, or directly influence the state of a
-        # running workflow in S3 or S4.
-
-        if target_systems:
-            for system in target_systems:
-                self._route_to_system(system, signal_type, event_category, details)
-        
-        # Add signal to the queue
-        self.signal_queue.append({
+        signal = {
             "type": signal_type,
             "category": event_category,
             "details": details,
-            "target_systems": target_systems
-        })
+            "target_systems": target_systems,
+            "severity": severity,
+            "project_id": details.get("project_id") if isinstance(details, dict) else None,
+            "timestamp": time.time()
+        }
+
+        # Deliver to the targeted systems first, so a running workflow can react
+        # before the signal is persisted and published.
+        if target_systems:
+            for system in target_systems:
+                self._route_to_system(system, signal)
+
+        self.metrics.record(signal)
+        if self.signal_log is not None:
+            try:
+                self.signal_log.append(signal)
+            except OSError as e:
+                logger.error(f"Failed to persist algedonic signal: {e}")
+
+        # Publish the signal on the bus; this never blocks on consumers.
+        self.bus.publish(signal)
 
-    def get_signals(self, clear_queue=True):
+    def get_signals(self, clear_queue=True, subscriber="default"):
         """
-        Retrieves all signals from the queue.
+        Retrieves the signals a subscriber has not consumed yet.
+
+        Each subscriber has its own cursor on the signal bus, so consuming
+        signals does not remove them for other subscribers.
         
         Args:
-            clear_queue (bool): If True, clears the queue after retrieving signals.
+            clear_queue (bool): If True, marks the returned signals as consumed
+                for this subscriber.
+            subscriber (str): The name of the consumer (e.g. "S5").
 
         Returns:
             list: A list of signal dictionaries.
         """
-        signals = list(self.signal_queue)
-        if clear_queue:
-            self.signal_queue.clear()
-        return signals
+        return self.bus.read(subscriber, advance=clear_queue)
+
+    def get_performance_summary(self, window="day", top_k=5):
+        """
+        Returns signal counts, hourly rates and the top-k failure and success
+        categories over a sliding window ("hour", "day" or "week").
+
+        The summary is read from running totals, not computed from the signals.
+        """
+        return self.metrics.summary(window, top_k)
+
+    def get_metrics(self, top_k=5):
+        """
+        Returns the performance summary of every configured window, keyed by
+        window name, e.g. for a monitoring endpoint.
+        """
+        return self.metrics.metrics(top_k)
+
+    def get_bus_stats(self):
+        """
+        Returns the signal bus's capacity, backlog and overflow counts.
+        """
+        return self.bus.stats()
+
+    def replay_signals(self, start=None, end=None):
+        """
+        Returns the persisted signals with timestamps in [start, end].
+        """
+        if self.signal_log is None:
+            return []
+        return list(self.signal_log.replay(start, end))
+
+    def _restore_metrics(self):
+        """Rebuilds the metrics windows from the signal log after a restart."""
+        longest = max((w.span_seconds for w in self.metrics.windows.values()), default=0)
+        start = time.time() - longest
+        replayed = self.signal_log.replay_into(self.metrics, start=start)
+        if replayed:
+            logger.info(f"Restored algedonic metrics from {replayed} logged signals.")
+
+    def register_handler(self, system_tag, handler, project_id=None):
+        """
+        Registers a callable that receives the signals targeted at a system.
+
+        Args:
+            system_tag (str): The VSM system, e.g. "S3".
+            handler (callable): Called with the signal dictionary. It runs in the
+                thread that raised the signal and should return quickly.
+            project_id (str, optional): Only receive signals about this project.
+
+        Returns:
+            int: A handler ID for unregister_handler().
+        """
+        return self.router.register(system_tag, handler, project_id)
+
+    def unregister_handler(self, handler_id):
+        """
+        Removes a handler registered with register_handler().
+        """
+        self.router.unregister(handler_id)
 
-    def _route_to_system(self, system_tag, signal_type, event_category, details):
+    def _route_to_system(self, system_tag, signal):
         """
-        Placeholder for routing logic to a specific VSM system.
+        Delivers a signal to the handlers registered for a specific VSM system,
+        subject to debouncing and rate limiting.
         """
-        logger.debug(f"Routing signal to {system_tag}...")
-        # In a real implementation, this would interact with the state or message
-        # bus of the target system.
-        # For example, for S4:
-        # if system_tag == "S4":
-        #     agent_state = get_agent_state()
-        #     agent_state.s4_knowledge.add_learning_from_signal(signal_type, event_category, details)
-        #     agent_state.save_s4_knowledge()
-        pass
+        delivered = self.router.route(system_tag, signal)
+        logger.debug(f"Routed signal '{signal['category']}' to {delivered} {system_tag} handler(s).")
 
-# Singleton instance
-algedonic_manager = AlgedonicManager()
+# Singleton instance, created on first use
+_algedonic_manager = None
+_algedonic_manager_lock = threading.Lock()
 
 def get_algedonic_manager():
     """
     Returns the singleton AlgedonicManager instance.
     """
-    return algedonic_manager
+    global _algedonic_manager
+    if _algedonic_manager is None:
+        with _algedonic_manager_lock:
+            if _algedonic_manager is None:
+                _algedonic_manager = AlgedonicManager()
+    return _algedonic_manager
@@ -0,0 +1,401 @@
+"""
+Warm Python fork servers for running generated Python code.
+
+Starting a fresh interpreter and re-importing test frameworks for every
+snippet dominates the cost of short validation runs. Instead, a small pool
+of long-lived server processes imports the common modules once; every job
+is run in a child forked from a server, with resource limits applied, so
+jobs start warm and cannot affect the server or each other.
+
+Protocol (JSON lines; the server is started with
+`python -m autonomous_app_writer.core.fork_server --preload json,unittest`):
+
+    request  -> {"id": 1, "code": "...", "script": null, "args": [], "cwd": null, "limits": {...}}
+    frames   <- {"id": 1, "event": "started", "pid": 1234}
+                {"id": 1, "event": "output", "stream": "stdout", "data": "..."}   (repeated)
+                {"id": 1, "event": "exit", "return_code": 0, "timed_out": false, "usage": {...}}
+
+Output is streamed back as it is produced. Where os.fork is unavailable the
+pool falls back to running a fresh interpreter per job.
+"""
+
+import argparse
+import codecs
+import importlib
+import itertools
+import json
+import os
+import queue
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.output_capture import StreamCapture
+from autonomous_app_writer.core.resource_limits import apply_resource_limits, usage_from_rusage
+
+logger = get_logger(__name__)
+
+# Seconds the client waits beyond a job's wall limit before giving up on its server.
+CLIENT_GRACE_SECONDS = 5
+
+# Seconds a caller waiting for a busy pool sleeps before checking whether a
+# dead server's slot can be refilled.
+ACQUIRE_POLL_SECONDS = 0.5
+
+# The directory containing the autonomous_app_writer package, so servers can
+# import it whatever the current working directory.
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Server side ---
+
+def _run_child(request, protocol_fd, out_w, err_w):
+    """Runs one job in the forked child. Never returns."""
+    code = 1
+    try:
+        os.setsid()
+        os.close(protocol_fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        apply_resource_limits(request.get("limits"))
+        script = request.get("script")
+        sys.argv = [script or "-c"] + list(request.get("args") or [])
+        try:
+            if script:
+                import runpy
+                runpy.run_path(script, run_name="__main__")
+            else:
+                exec(compile(request.get("code") or "", "<job>", "exec"), {"__name__": "__main__"})
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code is not None and not isinstance(e.code, int):
+                print(e.code, file=sys.stderr)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+def _serve_job(request, emit):
+    """Forks a child for one request and streams its output and exit status through emit()."""
+    job_id = request.get("id")
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        _run_child(request, emit.fd, out_w, err_w)
+    os.close(out_w)
+    os.close(err_w)
+    emit({"id": job_id, "event": "started", "pid": pid})
+
+    wall = (request.get("limits") or {}).get("wall_seconds")
+    deadline = time.monotonic() + wall if wall else None
+    timed_out = False
+    selector = selectors.DefaultSelector()
+    selector.register(out_r, selectors.EVENT_READ, "stdout")
+    selector.register(err_r, selectors.EVENT_READ, "stderr")
+    # Incremental decoders keep a multibyte character split across two reads intact.
+    decoders = {name: codecs.getincrementaldecoder('utf-8')('replace') for name in ("stdout", "stderr")}
+    open_streams = 2
+    while open_streams:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            timed_out = True
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            break
+        for key, _ in selector.select(remaining):
+            data = os.read(key.fd, 65536)
+            text = decoders[key.data].decode(data, final=not data)
+            if text:
+                emit({"id": job_id, "event": "output", "stream": key.data, "data": text})
+            if not data:
+                selector.unregister(key.fd)
+                open_streams -= 1
+    selector.close()
+    os.close(out_r)
+    os.close(err_r)
+
+    _, status, rusage = os.wait4(pid, 0)
+    return_code = os.waitstatus_to_exitcode(status)
+    emit({"id": job_id, "event": "exit", "return_code": return_code, "timed_out": timed_out,
+          "usage": usage_from_rusage(rusage)})
+
+class _Emitter:
+    """Writes protocol frames to a private copy of the original stdout."""
+    def __init__(self):
+        self.fd = os.dup(1)
+        # Anything else printed by preloaded modules goes to stderr, not the protocol.
+        os.dup2(2, 1)
+        self._file = os.fdopen(self.fd, 'w', buffering=1)
+
+    def __call__(self, frame):
+        self._file.write(json.dumps(frame) + "\n")
+        self._file.flush()
+
+def serve(preload=()):
+    """Imports `preload` and then serves requests from stdin until EOF."""
+    emit = _Emitter()
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"fork server: could not preload {module_name}: {e}", file=sys.stderr)
+    emit({"event": "ready", "pid": os.getpid()})
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        try:
+            _serve_job(request, emit)
+        except Exception as e:
+            emit({"id": request.get("id"), "event": "exit", "return_code": -1, "timed_out": False,
+                  "usage": None, "error": str(e)})
+
+# --- Client side ---
+
+class _FrameReader:
+    """Reads JSON-line frames from a pipe with a deadline."""
+    def __init__(self, fd):
+        self.fd = fd
+        self._buffer = b""
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(fd, selectors.EVENT_READ)
+
+    def read(self, deadline=None):
+        """Returns the next frame, or None on EOF or when the deadline passes."""
+        while b"\n" not in self._buffer:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if not self._selector.select(remaining):
+                continue
+            data = os.read(self.fd, 65536)
+            if not data:
+                return None
+            self._buffer += data
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def close(self):
+        self._selector.close()
+
+class ForkServer:
+    """
+    Client handle for one fork-server process; runs one job at a time.
+    """
+    def __init__(self, preload):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "autonomous_app_writer.core.fork_server", "--preload", ",".join(preload)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, start_new_session=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_PACKAGE_PARENT, os.environ.get("PYTHONPATH")]))),
+        )
+        self._reader = _FrameReader(self.process.stdout.fileno())
+        ready = self._reader.read(time.monotonic() + 30)
+        if not ready or ready.get("event") != "ready":
+            self.close()
+            raise RuntimeError("Fork server did not start.")
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, request, on_frame, wall_seconds):
+        """
+        Sends one request and passes every frame to on_frame until the exit frame.
+
+        Returns:
+            dict: The exit frame, or None if the server stopped responding (it is then killed).
+        """
+        deadline = time.monotonic() + wall_seconds + CLIENT_GRACE_SECONDS if wall_seconds else None
+        self.process.stdin.write((json.dumps(request) + "\n").encode('utf-8'))
+        self.process.stdin.flush()
+        child_pid = None
+        while True:
+            frame = self._reader.read(deadline)
+            if frame is None:
+                if child_pid:
+                    try:
+                        os.killpg(child_pid, signal.SIGKILL)
+                    except (ProcessLookupError, PermissionError):
+                        pass
+                self.close()
+                return None
+            if frame.get("event") == "started":
+                child_pid = frame.get("pid")
+            elif frame.get("event") == "exit":
+                return frame
+            else:
+                on_frame(frame)
+
+    def close(self):
+        try:
+            self.process.kill()
+            self.process.wait()
+        except OSError:
+            pass
+        self._reader.close()
+
+class ForkServerPool:
+    """
+    A pool of warm fork servers. Servers are started on first use and replaced if they die.
+    """
+    def __init__(self, size=config.FORK_SERVER_POOL_SIZE, preload=config.FORK_SERVER_PRELOAD):
+        self.size = size
+        self.preload = list(preload)
+        self._idle = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def available():
+        """Returns True if jobs can be run in forked children on this platform."""
+        return hasattr(os, "fork") and hasattr(os, "wait4")
+
+    def run_python(self, code=None, script=None, args=(), cwd=None, limits=None, on_output=None):
+        """
+        Runs Python code or a script in a warm forked child.
+
+        Args:
+            code (str, optional): Source code to execute as __main__.
+            script (str, optional): Path of a script to run instead of `code`.
+            args (list): sys.argv[1:] for the job.
+            cwd (str, optional): The job's working directory.
+            limits (dict, optional): Resource limits (see core.resource_limits),
+                overriding the defaults in config.PYTHON_JOB_LIMITS key by key.
+            on_output (callable, optional): Called as on_output(stream, text) as output arrives.
+
+        Returns:
+            dict: 'stdout', 'stderr', 'return_code', 'duration', 'output_bytes',
+            'timed_out' and 'resource_usage' (CPU seconds and max RSS of the job).
+        """
+        limits = {**config.PYTHON_JOB_LIMITS, **(limits or {})}
+        if not self.available():
+            return self._run_unforked(code, script, args, cwd, limits, on_output)
+
+        request = {"id": next(self._ids), "code": code, "script": script, "args": list(args),
+                   "cwd": cwd, "limits": limits}
+        captures = {name: StreamCapture(name, on_line=on_output) for name in ("stdout", "stderr")}
+        start = time.monotonic()
+        server = self._acquire()
+        exit_frame = None
+        try:
+            exit_frame = server.run(
+                request, lambda f: captures[f["stream"]].feed(f["data"].encode('utf-8')), limits.get("wall_seconds")
+            )
+        finally:
+            self._release(server)
+
+        result = {
+            "stdout": captures["stdout"].text(),
+            "stderr": captures["stderr"].text(),
+            "duration": time.monotonic() - start,
+            "output_bytes": {name: c.total_bytes for name, c in captures.items()},
+        }
+        if exit_frame is None:
+            return {**result, "return_code": -1, "timed_out": True, "resource_usage": None,
+                    "stderr": result["stderr"] + "Fork server stopped responding; job killed."}
+        if exit_frame.get("timed_out"):
+            result["stderr"] += f"TimeoutExpired: Job exceeded {limits.get('wall_seconds')} seconds."
+        if exit_frame.get("error"):
+            result["stderr"] += exit_frame["error"]
+        return {**result, "return_code": exit_frame["return_code"], "timed_out": exit_frame["timed_out"],
+                "resource_usage": exit_frame.get("usage")}
+
+    def close(self):
+        """Stops every idle server."""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            server.close()
+            with self._lock:
+                self._started -= 1
+
+    def _acquire(self):
+        """
+        Returns an idle server, starting one if the pool is not full yet.
+
+        A caller waiting for a busy pool re-checks the pool size periodically:
+        a server that died is released without going back to the idle queue,
+        and its slot is refilled by starting a new one.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start_new = self._started < self.size
+                if start_new:
+                    self._started += 1
+            if start_new:
+                try:
+                    return ForkServer(self.preload)
+                except Exception:
+                    with self._lock:
+                        self._started -= 1
+                    raise
+            try:
+                return self._idle.get(timeout=ACQUIRE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _release(self, server):
+        if server.alive:
+            self._idle.put(server)
+            return
+        with self._lock:
+            self._started -= 1
+
+    @staticmethod
+    def _run_unforked(code, script, args, cwd, limits, on_output):
+        """Fallback for platforms without fork: a fresh interpreter per job, without rlimits."""
+        from autonomous_app_writer.core.tool_interface import get_tool_interface
+        argv = [sys.executable] + ([script] if script else ["-c", code or ""]) + list(args)
+        result = get_tool_interface().run_command(
+            argv, cwd=cwd, timeout=limits.get("wall_seconds") or config.TOOL_DEFAULT_TIMEOUT, on_output=on_output
+        )
+        return {**result, "timed_out": "TimeoutExpired" in result["stderr"], "resource_usage": None}
+
+# Singleton instance, created on first use
+_fork_server_pool = None
+_fork_server_pool_lock = threading.Lock()
+
+def get_fork_server_pool():
+    """
+    Returns the singleton ForkServerPool instance.
+    """
+    global _fork_server_pool
+    if _fork_server_pool is None:
+        with _fork_server_pool_lock:
+            if _fork_server_pool is None:
+                _fork_server_pool = ForkServerPool()
+    return _fork_server_pool
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Python jobs from a warm, pre-imported interpreter.")
+    parser.add_argument("--preload", default="", help="comma-separated modules to import up front")
+    serve([name for name in parser.parse_args().preload.split(",") if name])
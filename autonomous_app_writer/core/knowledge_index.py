@@ -0,0 +1,184 @@
+"""
+Retrieval index over S4 knowledge entries.
+
+Agents use it to put only the knowledge relevant to their task into a
+prompt instead of the whole knowledge base. Ranking is BM25 over the entry
+text; when NumPy is installed, a vectorized cosine similarity over hashed
+term embeddings is blended in to reward partial vocabulary overlap.
+"""
+
+import json
+import math
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.agent_state import get_agent_state
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: BM25 alone is used without it.
+    np = None
+
+logger = get_logger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to was were will with".split()
+)
+
+def tokenize(text):
+    """Lowercases text and splits it into terms, dropping common stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+def entry_text(entry):
+    """Returns the searchable text of a knowledge entry (a string or a JSON object)."""
+    if isinstance(entry, str):
+        return entry
+    if isinstance(entry, dict) and isinstance(entry.get("content"), str):
+        return entry["content"]
+    return json.dumps(entry, sort_keys=True)
+
+class KnowledgeIndex:
+    """
+    An immutable BM25 index built from one version of the S4 knowledge base.
+    """
+    def __init__(self, knowledge, version=None, k1=1.5, b=0.75,
+                 embedding_dim=config.S4_EMBEDDING_DIM, embedding_weight=config.S4_EMBEDDING_WEIGHT):
+        self.version = version
+        self.k1 = k1
+        self.b = b
+        self.categories = list(knowledge.keys())
+        self.entries = []  # (category, entry) in knowledge-base order
+        self._postings = defaultdict(list)  # term -> [(entry index, term frequency)]
+        self._doc_lengths = []
+
+        for category, items in knowledge.items():
+            for item in items or []:
+                index = len(self.entries)
+                self.entries.append((category, item))
+                terms = tokenize(f"{category.replace('_', ' ')} {entry_text(item)}")
+                self._doc_lengths.append(len(terms))
+                for term, freq in Counter(terms).items():
+                    self._postings[term].append((index, freq))
+
+        self._avg_doc_length = (sum(self._doc_lengths) / len(self._doc_lengths)) if self._doc_lengths else 0.0
+        self.embedding_dim = embedding_dim
+        self.embedding_weight = embedding_weight if np is not None else 0.0
+        self._embeddings = self._embed_entries() if self.embedding_weight and self.entries else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, top_k=config.S4_CONTEXT_TOP_K):
+        """
+        Ranks knowledge entries against a query.
+
+        Args:
+            query (str): Free text describing the task.
+            top_k (int): The maximum number of entries to return.
+
+        Returns:
+            list: (score, category, entry) tuples, best first. Entries that
+            share no terms with the query are not returned.
+        """
+        return [(score, *self.entries[index]) for index, score in self._rank(query, top_k)]
+
+    def select(self, query, top_k=config.S4_CONTEXT_TOP_K):
+        """
+        Returns the top-k relevant entries in the knowledge base's own shape.
+
+        Every category is present as a key, so callers can keep using
+        knowledge.get('<category>'); entries keep their original order.
+        """
+        if len(self.entries) <= top_k:
+            selected = range(len(self.entries))
+        else:
+            selected = [index for index, _ in self._rank(query, top_k)]
+        result = {category: [] for category in self.categories}
+        for index in sorted(selected):
+            category, entry = self.entries[index]
+            result[category].append(entry)
+        return result
+
+    def _rank(self, query, top_k):
+        """Returns [(entry index, score)] for the best top_k matches."""
+        terms = tokenize(query or "")
+        if not terms or not self.entries:
+            return []
+
+        scores = self._bm25_scores(terms)
+        if self._embeddings is not None and scores:
+            max_score = max(scores.values()) or 1.0
+            similarities = self._embeddings @ self._embed(terms)
+            for index in scores:
+                scores[index] = scores[index] / max_score + self.embedding_weight * float(similarities[index])
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def _bm25_scores(self, terms):
+        """Returns {entry index: BM25 score} for entries containing any query term."""
+        n = len(self.entries)
+        scores = defaultdict(float)
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[index] / (self._avg_doc_length or 1.0))
+                scores[index] += idf * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+    def _embed(self, terms):
+        """Embeds a term list as an L2-normalised hashed term-frequency vector."""
+        vector = np.zeros(self.embedding_dim, dtype=np.float32)
+        for term in terms:
+            vector[zlib.crc32(term.encode('utf-8')) % self.embedding_dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed_entries(self):
+        """Returns the (entries x dim) embedding matrix."""
+        return np.vstack([
+            self._embed(tokenize(f"{category.replace('_', ' ')} {entry_text(entry)}"))
+            for category, entry in self.entries
+        ])
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_knowledge_index(snapshot=None):
+    """
+    Returns a KnowledgeIndex for the S4 knowledge of a StateSnapshot.
+
+    Args:
+        snapshot (StateSnapshot, optional): The snapshot to index, so a caller
+            that also reads policies from it gets knowledge of the same version.
+            Defaults to the current one.
+
+    The shared index is rebuilt only when AgentState publishes a new knowledge
+    version; an index for an older snapshot is built for that call alone.
+    """
+    global _index
+    snapshot = snapshot or get_agent_state().snapshot()
+    index = _index
+    if index is not None and index.version == snapshot.knowledge_version:
+        return index
+    with _index_lock:
+        if _index is not None and _index.version == snapshot.knowledge_version:
+            return _index
+        index = KnowledgeIndex(snapshot.s4_knowledge, version=snapshot.knowledge_version)
+        if _index is None or _index.version < index.version:
+            _index = index
+            logger.debug(f"Rebuilt S4 knowledge index (version {index.version}, {len(index)} entries).")
+        return index
+
+def select_relevant_knowledge(query, top_k=config.S4_CONTEXT_TOP_K, snapshot=None):
+    """
+    Returns only the S4 knowledge entries most relevant to query, grouped by
+    category, from `snapshot` (see get_knowledge_index) or the current one.
+    """
+    return get_knowledge_index(snapshot).select(query, top_k)
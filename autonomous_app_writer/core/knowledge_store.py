@@ -0,0 +1,341 @@
+"""
+Entry-level, incrementally persisted store behind the S4 knowledge base.
+
+Every knowledge item is kept as an entry with a content hash, first/last
+seen timestamps and a hit count. Re-reported items are deduplicated by hash
+and refreshed instead of being appended again; stale entries age out; each
+category is capped, evicting the entries with the lowest recency-weighted
+relevance first.
+
+Changes are appended to a JSONL journal. The journal is compacted, and the
+human-readable knowledge file (category -> list of items) is rewritten, only
+once more records have been appended than the store holds live entries (and
+at least compact_threshold), so compaction cost stays proportional to the
+appends it saves. If the knowledge file was edited while the process was not
+running, the edit is applied on the next load.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CATEGORIES = ("tech_trends", "security_threats", "ux_ui_trends")
+
+def content_hash(item):
+    """Returns a stable ID for a knowledge item, ignoring case and whitespace differences."""
+    if isinstance(item, str):
+        normalized = " ".join(item.lower().split())
+    else:
+        normalized = json.dumps(item, sort_keys=True)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+class KnowledgeStore:
+    """
+    Holds S4 knowledge entries and persists changes to them incrementally.
+    """
+    def __init__(self, view_path=config.S4_KNOWLEDGE_FILE, journal_path=config.S4_KNOWLEDGE_JOURNAL_FILE,
+                 default_capacity=config.S4_CATEGORY_CAPACITY, capacities=None,
+                 max_age_seconds=config.S4_KNOWLEDGE_MAX_AGE_SECONDS,
+                 half_life_seconds=config.S4_RELEVANCE_HALF_LIFE_SECONDS,
+                 compact_threshold=config.S4_JOURNAL_COMPACT_THRESHOLD):
+        self.view_path = view_path
+        self.journal_path = journal_path
+        self.default_capacity = default_capacity
+        self.capacities = capacities if capacities is not None else dict(config.S4_CATEGORY_CAPACITIES)
+        self.max_age_seconds = max_age_seconds
+        self.half_life_seconds = half_life_seconds
+        self.compact_threshold = compact_threshold
+        self.last_written_stat = None  # (mtime_ns, size) of our last write to view_path
+        self._entries = {}  # category -> {entry id: entry}
+        self._live_records = 0  # records written by the last compaction
+        self._appended_records = 0  # records appended since then
+        self._disk_view = {}  # the view as last written to, or read from, view_path
+        self._lock = threading.RLock()
+
+    # --- Loading and views ---
+
+    def load(self, view_path=None):
+        """
+        Loads the store from the journal, or bootstraps it from the knowledge file.
+
+        Returns:
+            dict: The knowledge view (category -> list of items).
+        """
+        with self._lock:
+            if view_path:
+                self.view_path = view_path
+            self._entries = {}
+            self._disk_view = self._read_view_file()
+            if os.path.exists(self.journal_path):
+                compacted_view, view_stat = self._replay_journal()
+                logger.info(f"S4 knowledge store replayed "
+                            f"{self._live_records + self._appended_records} journal records.")
+                if self._disk_view is not None and view_stat is not None and self._view_stat() != view_stat:
+                    # The knowledge file changed since we last wrote it: an offline edit.
+                    logger.info(f"S4 knowledge file {self.view_path} was edited offline; applying the edit.")
+                    edited_view, self._disk_view = self._disk_view, compacted_view
+                    self.apply_edit(edited_view)
+                    self.compact()
+                else:
+                    self.last_written_stat = view_stat
+            else:
+                # First run, or a knowledge file from before the journal existed.
+                seed = self._disk_view if self._disk_view is not None else {c: [] for c in DEFAULT_CATEGORIES}
+                now = time.time()
+                for category, items in seed.items():
+                    self._entries.setdefault(category, {})
+                    for item in items:
+                        self._put(category, item, now)
+                self.compact()
+            self._append_journal(self._expire(time.time()))
+            return self.view()
+
+    def view(self):
+        """Returns category -> list of items, oldest first, without entry metadata."""
+        with self._lock:
+            return {
+                category: [e["content"] for e in sorted(entries.values(), key=lambda e: e["first_seen"])]
+                for category, entries in self._entries.items()
+            }
+
+    def entries(self, category):
+        """Returns the full entries (with metadata) of one category."""
+        with self._lock:
+            return [dict(e) for e in self._entries.get(category, {}).values()]
+
+    # --- Mutations ---
+
+    def ingest(self, new_knowledge, now=None):
+        """
+        Merges newly discovered knowledge into the store.
+
+        Args:
+            new_knowledge (dict): category -> list of items (a single item is also accepted).
+            now (float, optional): The timestamp to record; defaults to the current time.
+
+        Returns:
+            dict: Counts of 'added', 'refreshed' and 'evicted' entries.
+        """
+        now = now or time.time()
+        summary = {"added": 0, "refreshed": 0, "evicted": 0}
+        with self._lock:
+            records = []
+            for category, items in new_knowledge.items():
+                if not isinstance(items, list):
+                    items = [items]
+                entries = self._entries.setdefault(category, {})
+                for item in items:
+                    entry_id = content_hash(item)
+                    summary["refreshed" if entry_id in entries else "added"] += 1
+                    records.append(self._put(category, item, now))
+            evicted = self._expire(now) + self._enforce_capacity(now)
+            summary["evicted"] = len(evicted)
+            self._append_journal(records + evicted)
+        logger.info(f"S4 knowledge store ingest: {summary}")
+        return summary
+
+    def replace(self, knowledge, now=None):
+        """Makes the store hold exactly the given knowledge, keeping metadata of unchanged items."""
+        now = now or time.time()
+        with self._lock:
+            records = []
+            for category in list(self._entries):
+                if category not in knowledge:
+                    del self._entries[category]
+                    records.append({"op": "drop_category", "category": category})
+            for category, items in knowledge.items():
+                wanted = {content_hash(item): item for item in items}
+                entries = self._entries.setdefault(category, {})
+                for entry_id in [i for i in entries if i not in wanted]:
+                    records.append(self._delete(category, entry_id))
+                for entry_id, item in wanted.items():
+                    if entry_id not in entries:
+                        records.append(self._put(category, item, now))
+            records += self._enforce_capacity(now)
+            self._append_journal(records)
+
+    def apply_edit(self, edited_view, now=None):
+        """
+        Applies an operator's edit of the knowledge file.
+
+        Only the difference between the file as we last wrote it and the edited
+        file is applied, so entries ingested since the last compaction are not
+        lost just because the file did not list them yet.
+        """
+        now = now or time.time()
+        with self._lock:
+            before = self._disk_view or {}
+            records = []
+            for category, items in edited_view.items():
+                old_ids = {content_hash(item) for item in before.get(category, [])}
+                new_items = {content_hash(item): item for item in items}
+                entries = self._entries.setdefault(category, {})
+                for entry_id in old_ids - set(new_items):
+                    if entry_id in entries:
+                        records.append(self._delete(category, entry_id))
+                for entry_id, item in new_items.items():
+                    if entry_id not in old_ids and entry_id not in entries:
+                        records.append(self._put(category, item, now))
+            for category in set(before) - set(edited_view):
+                if category in self._entries:
+                    del self._entries[category]
+                    records.append({"op": "drop_category", "category": category})
+            self._disk_view = edited_view
+            records += self._enforce_capacity(now)
+            self._append_journal(records)
+
+    # --- Persistence ---
+
+    def compact(self):
+        """Refreshes the knowledge file and rewrites the journal with only the live entries."""
+        with self._lock:
+            # The knowledge file goes first so the journal can record its stat;
+            # load() compares it with the file to detect offline edits.
+            view = self.view()
+            self._write_atomically(self.view_path, json.dumps(view, indent=4))
+            self.last_written_stat = self._view_stat()
+            self._disk_view = view
+
+            records = [
+                {"op": "put", "category": category, "entry": entry}
+                for category, entries in self._entries.items()
+                for entry in entries.values()
+            ]
+            # Keep empty categories across restarts.
+            records += [{"op": "category", "category": c} for c, entries in self._entries.items() if not entries]
+            records.append({"op": "compacted", "view_stat": list(self.last_written_stat)})
+            self._write_atomically(self.journal_path, "".join(json.dumps(r) + "\n" for r in records))
+            self._live_records = len(records)
+            self._appended_records = 0
+        logger.info(f"S4 knowledge store compacted ({len(records)} live records).")
+
+    def _append_journal(self, records):
+        """
+        Appends change records to the journal and compacts it once more records
+        were appended since the last compaction than it left live (and at least
+        compact_threshold).
+        """
+        if not records:
+            return
+        with open(self.journal_path, 'a') as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+        self._appended_records += len(records)
+        if self._appended_records > max(self.compact_threshold, self._live_records):
+            self.compact()
+
+    def _replay_journal(self):
+        """
+        Rebuilds the entries from the journal and sets the record counts.
+
+        Returns:
+            tuple: (the view as of the last compaction, the knowledge file's
+            (mtime_ns, size) as that compaction wrote it); (None, None) for a
+            journal without a compaction marker.
+        """
+        count = 0
+        compacted_view, view_stat = None, None
+        self._live_records = 0
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append; everything before it is intact.
+                    logger.warning(f"Skipping unreadable S4 journal record: {line[:80]}")
+                    continue
+                count += 1
+                op, category = record.get("op"), record.get("category")
+                if op == "put":
+                    self._entries.setdefault(category, {})[record["entry"]["id"]] = record["entry"]
+                elif op == "del":
+                    self._entries.get(category, {}).pop(record["id"], None)
+                elif op == "drop_category":
+                    self._entries.pop(category, None)
+                elif op == "category":
+                    self._entries.setdefault(category, {})
+                elif op == "compacted":
+                    compacted_view, view_stat = self.view(), tuple(record["view_stat"])
+                    self._live_records = count
+        self._appended_records = count - self._live_records
+        return compacted_view, view_stat
+
+    def _read_view_file(self):
+        """Returns the knowledge file's content, or None if it does not exist."""
+        try:
+            with open(self.view_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _view_stat(self):
+        """Returns (mtime_ns, size) of the knowledge file, or None if it does not exist."""
+        try:
+            st = os.stat(self.view_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _write_atomically(path, text):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    # --- Entry bookkeeping ---
+
+    def _put(self, category, item, now):
+        """Adds or refreshes one entry and returns its journal record."""
+        entries = self._entries.setdefault(category, {})
+        entry_id = content_hash(item)
+        entry = entries.get(entry_id)
+        if entry:
+            entry["last_seen"] = now
+            entry["hits"] += 1
+        else:
+            entry = {"id": entry_id, "content": item, "first_seen": now, "last_seen": now, "hits": 1}
+            entries[entry_id] = entry
+        return {"op": "put", "category": category, "entry": entry}
+
+    def _delete(self, category, entry_id):
+        """Removes one entry and returns its journal record."""
+        self._entries.get(category, {}).pop(entry_id, None)
+        return {"op": "del", "category": category, "id": entry_id}
+
+    def _relevance(self, entry, now):
+        """Hit count decayed by time since the entry was last seen."""
+        age = max(0.0, now - entry["last_seen"])
+        return entry["hits"] * 0.5 ** (age / self.half_life_seconds)
+
+    def _expire(self, now):
+        """Drops entries not seen within max_age_seconds. Returns the journal records."""
+        records = []
+        if not self.max_age_seconds:
+            return records
+        cutoff = now - self.max_age_seconds
+        for category, entries in self._entries.items():
+            for entry_id in [i for i, e in entries.items() if e["last_seen"] < cutoff]:
+                records.append(self._delete(category, entry_id))
+        return records
+
+    def _enforce_capacity(self, now):
+        """Evicts the least relevant entries of over-full categories. Returns the journal records."""
+        records = []
+        for category, entries in self._entries.items():
+            capacity = self.capacities.get(category, self.default_capacity)
+            overflow = len(entries) - capacity
+            if overflow <= 0:
+                continue
+            victims = sorted(entries.values(), key=lambda e: (self._relevance(e, now), e["last_seen"]))[:overflow]
+            for entry in victims:
+                records.append(self._delete(category, entry["id"]))
+        return records
@@ -4,8 +4,8 @@ Utilities and wrappers for defining and running LangGraph workflows.
 
 # This file will depend on the 'langgraph' library.
 # Ensure it is installed: pip install langgraph
+# It is imported when the first orchestrator is created, not at module import.
 
-from langgraph.graph import StateGraph, END
 from autonomous_app_writer.core.logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -21,6 +21,8 @@ class LangGraphOrchestrator:
         Args:
             state_class (TypedDict): A TypedDict class defining the graph's state.
         """
+        from langgraph.graph import StateGraph
+
         self.workflow = StateGraph(state_class)
         self.state_class = state_class
         logger.info(f"LangGraph orchestrator initialized with state: {state_class.__name__}")
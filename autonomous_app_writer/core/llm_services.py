@@ -4,6 +4,7 @@ Abstracts away the specific API calls for different providers.
 """
 
 import json
+import threading
 from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
 
@@ -93,11 +94,17 @@ class LLMService:
             logger.error(f"Failed to parse JSON response: {e}\nResponse was: {response_str}")
             raise
 
-# A default instance to be used across the application
-default_llm_service = LLMService()
+# A default instance to be used across the application, created on first use
+_default_llm_service = None
+_default_llm_service_lock = threading.Lock()
 
 def get_llm_service():
     """
     Returns the default LLM service instance.
     """
-    return default_llm_service
+    global _default_llm_service
+    if _default_llm_service is None:
+        with _default_llm_service_lock:
+            if _default_llm_service is None:
+                _default_llm_service = LLMService()
+    return _default_llm_service
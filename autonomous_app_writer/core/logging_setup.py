@@ -1,5 +1,9 @@
 """
 Centralized logging setup for the agent.
+
+Importing this module has no side effects; entry points call setup_logging()
+explicitly, so library users and short-lived workers do not get handlers or
+a log file they did not ask for.
 """
 
 import logging
@@ -11,6 +15,14 @@ def setup_logging():
     Configures the root logger for the application.
     """
     log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
+
+    # Get the root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+
+    # Already configured; don't open the log file again.
+    if root_logger.handlers:
+        return
     
     # Create formatter
     formatter = logging.Formatter(
@@ -24,20 +36,12 @@ def setup_logging():
     file_handler = logging.FileHandler(config.LOG_FILE)
     file_handler.setFormatter(formatter)
     
-    # Get the root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    
     # Add handlers to the root logger
-    if not root_logger.handlers:
-        root_logger.addHandler(stream_handler)
-        root_logger.addHandler(file_handler)
+    root_logger.addHandler(stream_handler)
+    root_logger.addHandler(file_handler)
 
 def get_logger(name):
     """
     Returns a logger with the specified name.
     """
     return logging.getLogger(name)
-
-# Setup logging on import
-setup_logging()
@@ -0,0 +1,161 @@
+"""
+Bounded, streaming capture of a child process's output.
+
+Each stream is read incrementally on its own thread. Only the first
+`head_bytes` and the last `tail_bytes` are kept in memory, so a chatty tool
+cannot exhaust memory; lines are handed to an optional callback as they
+arrive. As soon as a stream outgrows the in-memory caps its complete output
+is spilled to a log file, before anything is discarded. Only the newest
+config.TOOL_OUTPUT_LOG_MAX_FILES log files are kept.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+READ_SIZE = 64 * 1024  # Longest line handed to a callback in one piece
+
+class StreamCapture:
+    """
+    Keeps the head and tail of one output stream and spills the full stream to a file if needed.
+    """
+    def __init__(self, name, head_bytes=config.TOOL_OUTPUT_HEAD_BYTES, tail_bytes=config.TOOL_OUTPUT_TAIL_BYTES,
+                 spill_path=None, on_line=None):
+        self.name = name
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.on_line = on_line
+        self.total_bytes = 0
+        self.spilled_to = None  # the log file, once the stream outgrew the caps
+        self._head = bytearray()
+        self._tail = deque()
+        self._tail_size = 0
+        self._spill_file = None
+
+    @property
+    def truncated(self):
+        return self.total_bytes > len(self._head) + self._tail_size
+
+    def feed(self, data):
+        """Accounts for a chunk of output (normally one line)."""
+        self.total_bytes += len(data)
+        if self._spill_file is not None:
+            self._spill_file.write(data)
+        if self.on_line is not None:
+            try:
+                self.on_line(self.name, data.decode('utf-8', 'replace'))
+            except Exception as e:
+                logger.error(f"Output callback failed for {self.name}: {e}")
+
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+        self._tail.append(data)
+        self._tail_size += len(data)
+        while self._tail and self._tail_size - len(self._tail[0]) >= self.tail_bytes:
+            if self._spill_file is None and self.spill_path is not None:
+                self._start_spill()  # Save the full stream before dropping any of it.
+            self._tail_size -= len(self._tail.popleft())
+
+    def text(self):
+        """Returns the captured output, with a marker where bytes were left out."""
+        head = bytes(self._head)
+        tail = b"".join(self._tail)
+        if len(tail) > self.tail_bytes:
+            tail = tail[-self.tail_bytes:]
+        omitted = self.total_bytes - len(head) - len(tail)
+        if omitted <= 0:
+            return (head + tail).decode('utf-8', 'replace')
+        where = f"; full output in {self.spilled_to}" if self.spilled_to else ""
+        marker = f"\n... [{omitted} bytes omitted{where}] ...\n"
+        return head.decode('utf-8', 'replace') + marker + tail.decode('utf-8', 'replace')
+
+    def close(self):
+        """Closes the spill file. Called by the thread feeding the capture once its stream ends."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _start_spill(self):
+        """Opens the spill file and writes everything received so far."""
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            self._spill_file = open(self.spill_path, 'wb')
+            self._spill_file.write(bytes(self._head))
+            for chunk in self._tail:
+                self._spill_file.write(chunk)
+        except OSError as e:
+            logger.error(f"Could not spill {self.name} to {self.spill_path}: {e}")
+            self.spill_path = None
+            return
+        self.spilled_to = self.spill_path
+        prune_output_logs(os.path.dirname(self.spill_path) or ".")
+
+def prune_output_logs(log_dir, max_files=config.TOOL_OUTPUT_LOG_MAX_FILES):
+    """Deletes the oldest log files in log_dir beyond max_files."""
+    if not max_files:
+        return
+    try:
+        paths = [os.path.join(log_dir, name) for name in os.listdir(log_dir) if name.endswith(".log")]
+        paths.sort(key=os.path.getmtime)
+    except OSError:
+        return  # A file was removed meanwhile, e.g. by a concurrent prune; try again next time.
+    for path in paths[:-max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _pump(stream, capture):
+    """Reads a pipe line by line into a StreamCapture until EOF, then closes it."""
+    try:
+        for chunk in iter(lambda: stream.readline(READ_SIZE), b""):
+            capture.feed(chunk)
+    except (OSError, ValueError):
+        pass  # Pipe closed under us, e.g. after the process was killed.
+    finally:
+        stream.close()
+        # Closed here rather than in join(): after a join timeout the pump may still be feeding.
+        capture.close()
+
+def start_capture(process, spill_prefix=None, on_output=None):
+    """
+    Starts reading a process's stdout and stderr pipes in the background.
+
+    Args:
+        process (subprocess.Popen): Started with stdout/stderr=PIPE in binary mode.
+        spill_prefix (str, optional): Path prefix for the full-output log files,
+            e.g. ".tool_logs/1700000000-1234"; None disables spilling.
+        on_output (callable, optional): Called as on_output(stream_name, line)
+            for every line as it is produced.
+
+    Returns:
+        tuple: ({stream name: StreamCapture}, join) where join(timeout=None)
+        waits, in total at most `timeout` seconds, for both pipes to reach EOF.
+        A pipe still open after the timeout (e.g. held by a background child)
+        keeps being read, and its log file written, until it closes.
+    """
+    captures, threads = {}, []
+    for name, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
+        capture = StreamCapture(name, spill_path=f"{spill_prefix}.{name}.log" if spill_prefix else None,
+                                on_line=on_output)
+        thread = threading.Thread(target=_pump, args=(stream, capture), daemon=True)
+        thread.start()
+        captures[name] = capture
+        threads.append(thread)
+
+    def join(timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    return captures, join
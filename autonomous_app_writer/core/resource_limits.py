@@ -0,0 +1,92 @@
+"""
+Resource limits for processes that run generated code.
+
+Limits are given as a dictionary so they can be passed through config and
+over process boundaries as JSON:
+
+    {"cpu_seconds": 30, "memory_bytes": 512 * 1024 * 1024,
+     "file_size_bytes": 64 * 1024 * 1024, "open_files": 256, "wall_seconds": 60}
+
+'wall_seconds' cannot be enforced with an rlimit; it is enforced by whoever
+waits for the process. On platforms without the `resource` module the limits
+are ignored.
+"""
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+_RLIMITS = {
+    "cpu_seconds": "RLIMIT_CPU",
+    "memory_bytes": "RLIMIT_AS",
+    "file_size_bytes": "RLIMIT_FSIZE",
+    "open_files": "RLIMIT_NOFILE",
+    "processes": "RLIMIT_NPROC",
+}
+
+def supported():
+    """Returns True if rlimits can be applied on this platform."""
+    return resource is not None
+
+def apply_resource_limits(limits):
+    """
+    Applies rlimits to the current process. Meant to run in a freshly forked child.
+
+    A limit is only ever lowered: a value above the current hard limit is
+    capped to it rather than failing.
+
+    Args:
+        limits (dict): See the module docstring; unknown keys and None values are ignored.
+    """
+    for rlimit, values in resolve_rlimits(limits):
+        resource.setrlimit(rlimit, values)
+
+def limits_preexec(limits):
+    """
+    Returns a subprocess preexec_fn that applies `limits`, or None if there is nothing to apply.
+
+    The (soft, hard) values are computed up front, so the function run between
+    fork and exec only makes setrlimit system calls and takes no locks.
+    """
+    resolved = resolve_rlimits(limits)
+    if not resolved:
+        return None
+    setrlimit = resource.setrlimit
+
+    def preexec():
+        for rlimit, values in resolved:
+            setrlimit(rlimit, values)
+    return preexec
+
+def resolve_rlimits(limits):
+    """Returns [(resource constant, (soft, hard))] for the given limits dictionary."""
+    resolved = []
+    if resource is None or not limits:
+        return resolved
+    for key, name in _RLIMITS.items():
+        value = limits.get(key)
+        rlimit = getattr(resource, name, None)
+        if value is None or rlimit is None:
+            continue
+        _, hard = resource.getrlimit(rlimit)
+        value = int(value)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        if key == "cpu_seconds":
+            # SIGXCPU at the soft limit, SIGKILL one second later if it is ignored.
+            hard_value = value + 1 if hard == resource.RLIM_INFINITY else min(value + 1, hard)
+            resolved.append((rlimit, (value, hard_value)))
+        else:
+            resolved.append((rlimit, (value, value)))
+    return resolved
+
+def usage_from_rusage(rusage):
+    """Converts a struct_rusage (e.g. from os.wait4) into a JSON-friendly dictionary."""
+    if rusage is None:
+        return None
+    return {
+        "user_cpu_seconds": rusage.ru_utime,
+        "system_cpu_seconds": rusage.ru_stime,
+        "max_rss_kb": rusage.ru_maxrss,
+    }
@@ -0,0 +1,133 @@
+"""
+Bounded, multi-subscriber ring buffer for algedonic signals.
+
+Signals are written into a fixed number of slots; once the buffer is full
+the oldest signal is overwritten, so publishing never blocks on, or waits
+for, slow consumers and memory stays bounded. Every subscriber reads through
+its own cursor, so one consumer draining its signals does not hide them from
+the others. Signals a subscriber missed because they were overwritten before
+it read them are counted as dropped for that subscriber.
+"""
+
+import threading
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class SignalBus:
+    """
+    A fixed-capacity ring buffer with independent per-subscriber cursors.
+
+    Positions are global sequence numbers: the signal with sequence number n
+    lives in slot n % capacity until sequence number n + capacity overwrites it.
+    """
+    def __init__(self, capacity=config.ALGEDONIC_BUS_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("SignalBus capacity must be positive.")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next_seq = 0  # sequence number of the next published signal
+        self._cursors = {}  # subscriber -> next sequence number to read
+        self._dropped = {}  # subscriber -> signals overwritten before it read them
+        self._lock = threading.Lock()
+
+    def publish(self, signal):
+        """
+        Appends a signal, overwriting the oldest one if the buffer is full.
+
+        Returns:
+            int: The signal's sequence number.
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._slots[seq % self.capacity] = signal
+            self._next_seq = seq + 1
+        return seq
+
+    def subscribe(self, subscriber, from_latest=False):
+        """
+        Registers a subscriber cursor; a no-op if it already exists.
+
+        Args:
+            subscriber (str): The consumer's name.
+            from_latest (bool): Start after the newest signal instead of at the
+                oldest one still buffered.
+        """
+        with self._lock:
+            if subscriber not in self._cursors:
+                self._cursors[subscriber] = self._next_seq if from_latest else self._oldest_seq()
+                self._dropped[subscriber] = 0
+
+    def unsubscribe(self, subscriber):
+        """Removes a subscriber cursor."""
+        with self._lock:
+            self._cursors.pop(subscriber, None)
+            self._dropped.pop(subscriber, None)
+
+    def read(self, subscriber, max_items=None, advance=True):
+        """
+        Returns the signals the subscriber has not read yet, oldest first.
+
+        Unknown subscribers are subscribed from the oldest buffered signal.
+
+        Args:
+            subscriber (str): The consumer's name.
+            max_items (int, optional): Return at most this many signals.
+            advance (bool): Move the cursor past the returned signals. With
+                False the call only peeks.
+
+        Returns:
+            list: The signals.
+        """
+        with self._lock:
+            if subscriber not in self._cursors:
+                self._cursors[subscriber] = self._oldest_seq()
+                self._dropped[subscriber] = 0
+            cursor = self._cursors[subscriber]
+            oldest = self._oldest_seq()
+            if cursor < oldest:
+                self._dropped[subscriber] += oldest - cursor
+                logger.warning(
+                    f"Signal bus subscriber '{subscriber}' fell behind; {oldest - cursor} signals were overwritten."
+                )
+                cursor = oldest
+                self._cursors[subscriber] = cursor
+            end = self._next_seq if max_items is None else min(self._next_seq, cursor + max_items)
+            signals = [self._slots[seq % self.capacity] for seq in range(cursor, end)]
+            if advance:
+                self._cursors[subscriber] = end
+            return signals
+
+    def snapshot(self):
+        """Returns every buffered signal, oldest first, without moving any cursor."""
+        with self._lock:
+            return [self._slots[seq % self.capacity] for seq in range(self._oldest_seq(), self._next_seq)]
+
+    def stats(self):
+        """
+        Returns overflow accounting for the bus.
+
+        Returns:
+            dict: 'capacity', 'published' (all time), 'buffered', 'overwritten'
+            (all time) and, per subscriber, its 'lag' and 'dropped' counts.
+        """
+        with self._lock:
+            oldest = self._oldest_seq()
+            return {
+                "capacity": self.capacity,
+                "published": self._next_seq,
+                "buffered": self._next_seq - oldest,
+                "overwritten": oldest,
+                "subscribers": {
+                    name: {
+                        "lag": self._next_seq - max(cursor, oldest),
+                        "dropped": self._dropped[name] + max(0, oldest - cursor),
+                    }
+                    for name, cursor in self._cursors.items()
+                },
+            }
+
+    def _oldest_seq(self):
+        """Sequence number of the oldest signal still buffered. Call with the lock held."""
+        return max(0, self._next_seq - self.capacity)
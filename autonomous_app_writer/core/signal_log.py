@@ -0,0 +1,239 @@
+"""
+Persistent, append-only log of algedonic signals.
+
+Signals are appended as JSON lines to numbered segment files. When the
+active segment reaches its size limit it is sealed: a small time index is
+written next to it and a new segment is started. Old segments beyond the
+retention limit are deleted whole, so the log never needs rewriting.
+
+The time index of a segment holds its time range and a sparse list of
+(timestamp, byte offset) checkpoints, so replaying a time range opens only
+the overlapping segments and seeks close to the first matching record.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+_SEGMENT_RE = re.compile(r"^signals-(\d{8})\.jsonl$")
+
+class SegmentIndex:
+    """
+    Time index of one segment.
+
+    Each checkpoint is (max timestamp of all earlier records, byte offset), so
+    every record before a checkpoint whose timestamp is below a range start
+    can be skipped, even if timestamps are slightly out of order.
+    """
+    def __init__(self, min_ts=None, max_ts=None, count=0, checkpoints=None):
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.count = count
+        self.checkpoints = checkpoints or []
+
+    def add(self, timestamp, offset, interval):
+        """Accounts for a record written at `offset`."""
+        if self.count % interval == 0:
+            self.checkpoints.append((self.max_ts if self.max_ts is not None else float("-inf"), offset))
+        self.min_ts = timestamp if self.min_ts is None else min(self.min_ts, timestamp)
+        self.max_ts = timestamp if self.max_ts is None else max(self.max_ts, timestamp)
+        self.count += 1
+
+    def overlaps(self, start, end):
+        """Returns True if the segment may hold records in [start, end]."""
+        if not self.count:
+            return False
+        return (start is None or self.max_ts >= start) and (end is None or self.min_ts <= end)
+
+    def seek_offset(self, start):
+        """Returns the byte offset to start reading from for records at or after `start`."""
+        offset = 0
+        if start is None:
+            return offset
+        for max_before, checkpoint_offset in self.checkpoints:
+            if max_before >= start:
+                break
+            offset = checkpoint_offset
+        return offset
+
+    def to_dict(self):
+        return {"min_ts": self.min_ts, "max_ts": self.max_ts, "count": self.count,
+                "checkpoints": self.checkpoints}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["min_ts"], data["max_ts"], data["count"], [tuple(c) for c in data["checkpoints"]])
+
+class SignalLog:
+    """
+    Segment-rotated JSONL log of signals with a per-segment time index.
+    """
+    def __init__(self, log_dir=config.ALGEDONIC_LOG_DIR, segment_max_bytes=config.ALGEDONIC_LOG_SEGMENT_BYTES,
+                 max_segments=config.ALGEDONIC_LOG_MAX_SEGMENTS, index_interval=config.ALGEDONIC_LOG_INDEX_INTERVAL):
+        self.log_dir = log_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.index_interval = index_interval
+        self._lock = threading.Lock()
+        self._indexes = {}  # segment number -> SegmentIndex
+        self._active = None  # segment number being appended to
+        self._file = None
+        os.makedirs(log_dir, exist_ok=True)
+        self._open()
+
+    # --- Writing ---
+
+    def append(self, signal):
+        """Appends one signal (a JSON-serializable dictionary with a 'timestamp')."""
+        line = (json.dumps(signal, default=str) + "\n").encode('utf-8')
+        timestamp = signal.get("timestamp") or time.time()
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._indexes[self._active].add(timestamp, offset, self.index_interval)
+            if offset + len(line) >= self.segment_max_bytes:
+                self._rotate()
+
+    def close(self):
+        """Seals the active segment's index and closes it."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+                self._write_index(self._active)
+
+    # --- Reading ---
+
+    def replay(self, start=None, end=None):
+        """
+        Yields the logged signals with start <= timestamp <= end, segment by segment.
+
+        Args:
+            start (float, optional): Earliest timestamp; None for the beginning of the log.
+            end (float, optional): Latest timestamp; None for the end of the log.
+        """
+        with self._lock:
+            if self._file:
+                self._file.flush()
+            segments = [(n, self._indexes[n].seek_offset(start))
+                        for n in sorted(self._indexes) if self._indexes[n].overlaps(start, end)]
+        for number, offset in segments:
+            try:
+                f = open(self._segment_path(number), 'rb')
+            except FileNotFoundError:
+                continue  # Removed by retention since we listed it.
+            with f:
+                f.seek(offset)
+                for raw in f:
+                    try:
+                        signal = json.loads(raw)
+                    except ValueError:
+                        continue  # A torn final line from a crash mid-append.
+                    timestamp = signal.get("timestamp", 0)
+                    if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                        yield signal
+
+    def replay_into(self, aggregator, start=None, end=None):
+        """
+        Feeds a time range of the log into a SignalAggregator.
+
+        Returns:
+            int: The number of signals replayed.
+        """
+        count = 0
+        for signal in self.replay(start, end):
+            aggregator.record(signal)
+            count += 1
+        return count
+
+    def segments(self):
+        """Returns {segment path: index summary} for every segment, oldest first."""
+        with self._lock:
+            return {
+                self._segment_path(n): {k: v for k, v in self._indexes[n].to_dict().items() if k != "checkpoints"}
+                for n in sorted(self._indexes)
+            }
+
+    # --- Segments ---
+
+    def _open(self):
+        """Loads the segment indexes and reopens the newest segment for appending."""
+        numbers = sorted(int(m.group(1)) for m in map(_SEGMENT_RE.match, os.listdir(self.log_dir)) if m)
+        for number in numbers:
+            # The newest segment may have grown after its index was last written.
+            self._indexes[number] = self._load_index(number, rescan=number == numbers[-1])
+        self._active = numbers[-1] if numbers else 1
+        self._indexes.setdefault(self._active, SegmentIndex())
+        self._file = open(self._segment_path(self._active), 'ab')
+        if self._file.tell() >= self.segment_max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Seals the active segment and starts the next one. Call with the lock held."""
+        self._file.close()
+        self._write_index(self._active)
+        self._active += 1
+        self._indexes[self._active] = SegmentIndex()
+        self._file = open(self._segment_path(self._active), 'ab')
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        """Deletes the oldest sealed segments beyond max_segments. Call with the lock held."""
+        while self.max_segments and len(self._indexes) > self.max_segments:
+            oldest = min(self._indexes)
+            del self._indexes[oldest]
+            for path in (self._segment_path(oldest), self._index_path(oldest)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            logger.info(f"Signal log: Removed expired segment {self._segment_path(oldest)}.")
+
+    def _load_index(self, number, rescan=False):
+        """
+        Reads a sealed segment's index, or rebuilds it by scanning the segment.
+
+        A rescan also truncates a torn final line left by a crash mid-append,
+        so the next record appended starts on a line of its own.
+        """
+        if not rescan:
+            try:
+                with open(self._index_path(number), 'r') as f:
+                    return SegmentIndex.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                pass
+        index = SegmentIndex()
+        with open(self._segment_path(number), 'rb') as f:
+            offset = 0
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final line
+                try:
+                    index.add(json.loads(raw).get("timestamp", 0), offset, self.index_interval)
+                except ValueError:
+                    pass
+                offset += len(raw)
+            torn = f.tell() > offset
+        if rescan and torn:
+            logger.warning(f"Signal log: Truncating a torn final record in {self._segment_path(number)}.")
+            os.truncate(self._segment_path(number), offset)
+        return index
+
+    def _write_index(self, number):
+        tmp_path = f"{self._index_path(number)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._indexes[number].to_dict(), f)
+        os.replace(tmp_path, self._index_path(number))
+
+    def _segment_path(self, number):
+        return os.path.join(self.log_dir, f"signals-{number:08d}.jsonl")
+
+    def _index_path(self, number):
+        return os.path.join(self.log_dir, f"signals-{number:08d}.index.json")
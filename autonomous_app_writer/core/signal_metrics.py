@@ -0,0 +1,136 @@
+"""
+Sliding-window aggregation of algedonic signals.
+
+Every signal increments a counter in the current time bucket of each window
+(e.g. one-minute buckets for the last hour, hourly buckets for the last day).
+Each window also keeps running totals, which are adjusted as signals are
+recorded and as buckets slide out of the window, so a summary never rescans
+the signal history: counts and rates are read directly from the totals, and
+top-k failure categories are selected from the per-category totals.
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from collections import Counter
+from autonomous_app_writer import config
+
+class SlidingWindow:
+    """
+    Bucketed counters of (signal type, category) over the last `span_seconds`.
+
+    The window slides one bucket at a time, so it is accurate to within
+    `bucket_seconds`.
+    """
+    def __init__(self, span_seconds, bucket_seconds):
+        self.span_seconds = span_seconds
+        self.bucket_seconds = bucket_seconds
+        self._starts = []  # bucket start times, ascending
+        self._buckets = {}  # bucket start -> Counter of (type, category)
+        self.totals = Counter()  # (type, category) -> count within the window
+        self.type_totals = Counter()  # type -> count within the window
+        self._latest = 0.0  # newest timestamp recorded
+
+    def add(self, signal_type, category, timestamp):
+        """Counts one signal. Signals that are already outside the window are ignored."""
+        self._latest = max(self._latest, timestamp)
+        self.expire(self._latest)
+        start = timestamp - timestamp % self.bucket_seconds
+        if start <= self._cutoff(self._latest):
+            return
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = Counter()
+            bisect.insort(self._starts, start)
+        key = (signal_type, category)
+        bucket[key] += 1
+        self.totals[key] += 1
+        self.type_totals[signal_type] += 1
+
+    def expire(self, now):
+        """Drops the buckets that have slid out of the window ending at `now`."""
+        cutoff = self._cutoff(now)
+        while self._starts and self._starts[0] <= cutoff:
+            for key, count in self._buckets.pop(self._starts.pop(0)).items():
+                self._decrement(self.totals, key, count)
+                self._decrement(self.type_totals, key[0], count)
+
+    def _cutoff(self, now):
+        """Buckets starting at or before this time are outside the window."""
+        return now - self.span_seconds
+
+    @staticmethod
+    def _decrement(counter, key, count):
+        counter[key] -= count
+        if counter[key] <= 0:
+            del counter[key]
+
+class SignalAggregator:
+    """
+    Maintains per-category signal counts and rates over several sliding windows.
+    """
+    def __init__(self, windows=None):
+        windows = windows if windows is not None else config.ALGEDONIC_METRIC_WINDOWS
+        self.windows = {name: SlidingWindow(span, bucket) for name, (span, bucket) in windows.items()}
+        self._lock = threading.Lock()
+
+    def record(self, signal):
+        """Counts one signal dictionary (as published by the AlgedonicManager) in every window."""
+        timestamp = signal.get("timestamp") or time.time()
+        with self._lock:
+            for window in self.windows.values():
+                window.add(signal["type"], signal["category"], timestamp)
+
+    def summary(self, window="day", top_k=5, now=None):
+        """
+        Summarizes one window.
+
+        Args:
+            window (str): A configured window name, e.g. "hour", "day" or "week".
+            top_k (int): The number of top failure/success categories to return.
+            now (float, optional): The end of the window; defaults to the current time.
+
+        Returns:
+            dict: Pain/pleasure counts and hourly rates, plus the top-k failure
+            and success categories as [category, count] pairs, most frequent first.
+        """
+        now = now or time.time()
+        with self._lock:
+            w = self.windows[window]
+            w.expire(now)
+            hours = w.span_seconds / 3600
+            pain = w.type_totals.get("PAIN", 0)
+            pleasure = w.type_totals.get("PLEASURE", 0)
+            return {
+                "window": window,
+                "window_seconds": w.span_seconds,
+                "failure_count": pain,
+                "success_count": pleasure,
+                "failures_per_hour": pain / hours,
+                "successes_per_hour": pleasure / hours,
+                "top_failure_categories": self._top(w, "PAIN", top_k),
+                "top_success_categories": self._top(w, "PLEASURE", top_k),
+            }
+
+    def metrics(self, top_k=5, now=None):
+        """Returns the summary of every configured window, keyed by window name."""
+        now = now or time.time()
+        return {name: self.summary(name, top_k, now) for name in self.windows}
+
+    def category_counts(self, window="day", now=None):
+        """Returns {category: {signal type: count}} for one window."""
+        now = now or time.time()
+        with self._lock:
+            w = self.windows[window]
+            w.expire(now)
+            counts = {}
+            for (signal_type, category), count in w.totals.items():
+                counts.setdefault(category, {})[signal_type] = count
+            return counts
+
+    @staticmethod
+    def _top(window, signal_type, top_k):
+        """Returns the top_k categories of one signal type as [category, count] pairs."""
+        candidates = ((category, count) for (t, category), count in window.totals.items() if t == signal_type)
+        return [[category, count] for category, count in heapq.nlargest(top_k, candidates, key=lambda c: c[1])]
@@ -0,0 +1,129 @@
+"""
+Direct delivery of algedonic signals to the VSM systems that handle them.
+
+Components register a handler for a system tag (e.g. "S3"), optionally scoped
+to one project. Routing calls the matching handlers synchronously in the
+publishing thread, so a running workflow sees a signal as soon as it is
+raised. Handlers should only record the signal and return; the workflow acts
+on it at its next decision point.
+
+To keep a burst of signals from thrashing a workflow, repeats of the same
+category for the same project are debounced and deliveries per handler are
+rate limited. Signals at or above the bypass severity are always delivered.
+"""
+
+import itertools
+import threading
+import time
+from collections import Counter
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class SignalRouter:
+    """
+    Routes signals to per-system, per-project handlers with debouncing and rate limiting.
+    """
+    def __init__(self, debounce_seconds=config.ALGEDONIC_DEBOUNCE_SECONDS,
+                 rate_limit=config.ALGEDONIC_RATE_LIMIT, rate_period=config.ALGEDONIC_RATE_PERIOD_SECONDS,
+                 bypass_severity=config.ALGEDONIC_ROUTING_BYPASS_SEVERITY):
+        self.debounce_seconds = debounce_seconds
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.bypass_severity = bypass_severity
+        self._handlers = {}  # (system, project_id or None) -> {handler_id: handler}
+        self._handler_keys = {}  # handler_id -> (system, project_id)
+        self._last_delivered = {}  # (system, project_id, category) -> (time, severity)
+        self._buckets = {}  # handler_id -> [tokens, last refill time]
+        self._ids = itertools.count(1)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def register(self, system_tag, handler, project_id=None):
+        """
+        Registers a handler for signals targeted at a system.
+
+        Args:
+            system_tag (str): The VSM system, e.g. "S3".
+            handler (callable): Called with the signal dictionary.
+            project_id (str, optional): Only receive signals about this project.
+                Handlers without a project receive every signal for the system.
+
+        Returns:
+            int: A handler ID for unregister().
+        """
+        with self._lock:
+            handler_id = next(self._ids)
+            self._handlers.setdefault((system_tag, project_id), {})[handler_id] = handler
+            self._handler_keys[handler_id] = (system_tag, project_id)
+            self._buckets[handler_id] = [float(self.rate_limit), time.monotonic()]
+        logger.debug(f"Registered {system_tag} signal handler {handler_id} (project={project_id}).")
+        return handler_id
+
+    def unregister(self, handler_id):
+        """Removes a handler. Unknown IDs are ignored."""
+        with self._lock:
+            key = self._handler_keys.pop(handler_id, None)
+            self._buckets.pop(handler_id, None)
+            if key is None:
+                return
+            handlers = self._handlers.get(key, {})
+            handlers.pop(handler_id, None)
+            if not handlers:
+                self._handlers.pop(key, None)
+            if key[1] is not None:
+                for debounce_key in [k for k in self._last_delivered if k[:2] == key]:
+                    del self._last_delivered[debounce_key]
+
+    def route(self, system_tag, signal):
+        """
+        Delivers a signal to the handlers registered for a system.
+
+        Returns:
+            int: The number of handlers the signal was delivered to.
+        """
+        project_id = signal.get("project_id")
+        severity = signal.get("severity", 0.0)
+        now = time.monotonic()
+        with self._lock:
+            targets = dict(self._handlers.get((system_tag, None), {}))
+            if project_id is not None:
+                targets.update(self._handlers.get((system_tag, project_id), {}))
+            if not targets:
+                self.stats["unhandled"] += 1
+                return 0
+            bypass = severity >= self.bypass_severity
+            if not bypass and self._debounced(system_tag, project_id, signal["category"], severity, now):
+                self.stats["debounced"] += 1
+                return 0
+            self._last_delivered[(system_tag, project_id, signal["category"])] = (now, severity)
+            deliver = []
+            for handler_id, handler in targets.items():
+                if bypass or self._take_token(handler_id, now):
+                    deliver.append(handler)
+                else:
+                    self.stats["rate_limited"] += 1
+            self.stats["delivered"] += len(deliver)
+
+        for handler in deliver:
+            try:
+                handler(signal)
+            except Exception as e:
+                logger.error(f"{system_tag} signal handler failed for '{signal['category']}': {e}", exc_info=True)
+        return len(deliver)
+
+    def _debounced(self, system_tag, project_id, category, severity, now):
+        """True if the same category was delivered recently at the same or a higher severity."""
+        last = self._last_delivered.get((system_tag, project_id, category))
+        return last is not None and now - last[0] < self.debounce_seconds and severity <= last[1]
+
+    def _take_token(self, handler_id, now):
+        """Token-bucket rate limit: rate_limit deliveries per rate_period per handler."""
+        bucket = self._buckets[handler_id]
+        bucket[0] = min(float(self.rate_limit), bucket[0] + (now - bucket[1]) * self.rate_limit / self.rate_period)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
@@ -0,0 +1,121 @@
+"""
+Hot reload of the S5 policy and S4 knowledge files.
+
+Polls the files' (mtime, size) and, when an operator edits one, loads,
+validates and atomically publishes the new content through AgentState.
+Writes made by AgentState itself are recognised and not reloaded.
+"""
+
+import json
+import os
+import time
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.agent_state import get_agent_state
+
+logger = get_logger(__name__)
+
+REQUIRED_POLICY_KEYS = ("agent_mission", "development_philosophy")
+
+def validate_s5_policies(policies):
+    """
+    Checks that a policy document is usable by the agents.
+
+    Raises:
+        ValueError: If the document is malformed.
+    """
+    if not isinstance(policies, dict):
+        raise ValueError("S5 policies must be a JSON object.")
+    missing = [key for key in REQUIRED_POLICY_KEYS if key not in policies]
+    if missing:
+        raise ValueError(f"S5 policies are missing required keys: {missing}")
+    if not isinstance(policies["development_philosophy"], dict):
+        raise ValueError("'development_philosophy' must be a JSON object.")
+
+def validate_s4_knowledge(knowledge):
+    """
+    Checks that a knowledge base maps category names to lists.
+
+    Raises:
+        ValueError: If the document is malformed.
+    """
+    if not isinstance(knowledge, dict):
+        raise ValueError("S4 knowledge must be a JSON object.")
+    for category, entries in knowledge.items():
+        if not isinstance(entries, list):
+            raise ValueError(f"S4 knowledge category '{category}' must be a list.")
+
+class StateFileWatcher:
+    """
+    Watches the S5 policy and S4 knowledge files and hot-reloads them into AgentState.
+
+    A poll costs one stat() per file. Invalid edits are logged and ignored, so
+    the running agent keeps the last good version.
+    """
+    def __init__(self, poll_interval=config.STATE_RELOAD_POLL_INTERVAL):
+        self.agent_state = get_agent_state()
+        self.poll_interval = poll_interval
+        self._watched = {
+            config.S5_POLICY_FILE: (validate_s5_policies, self.agent_state.set_s5_policies),
+            config.S4_KNOWLEDGE_FILE: (validate_s4_knowledge, self.agent_state.apply_s4_knowledge_edit),
+        }
+        self._last_seen = {path: self._stat(path) for path in self._watched}
+        logger.info("State file watcher initialized.")
+
+    def run(self):
+        """
+        The main loop for the watcher.
+        """
+        logger.info("State file watcher starting its run loop.")
+        while True:
+            if config.ENABLE_STATE_HOT_RELOAD:
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"State watcher: An error occurred while polling: {e}", exc_info=True)
+            time.sleep(self.poll_interval)
+
+    def poll(self):
+        """
+        Checks every watched file once and reloads those that changed.
+
+        Returns:
+            list: The paths that were reloaded.
+        """
+        reloaded = []
+        for path, (validate, publish) in self._watched.items():
+            current = self._stat(path)
+            if current is None or current == self._last_seen.get(path):
+                continue
+            self._last_seen[path] = current
+            if current == self.agent_state.last_written_stat(path):
+                # Our own save, already published in memory.
+                continue
+            if self._reload(path, validate, publish):
+                reloaded.append(path)
+        return reloaded
+
+    def _reload(self, path, validate, publish):
+        """Loads, validates and publishes one file. Returns True on success."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            validate(data)
+        except (OSError, ValueError) as e:
+            logger.error(f"State watcher: Ignoring invalid edit to {path}: {e}")
+            return False
+        snapshot = publish(data, persist=False)
+        logger.info(
+            f"State watcher: Reloaded {path} (policy_version={snapshot.policy_version}, "
+            f"knowledge_version={snapshot.knowledge_version})"
+        )
+        return True
+
+    @staticmethod
+    def _stat(path):
+        """Returns (mtime_ns, size) for a file, or None if it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
@@ -0,0 +1,189 @@
+"""
+Content-addressed on-disk cache for tool results.
+
+An entry is keyed by a SHA-256 over everything its result depends on (file
+contents, tool, tool version, configuration), so an entry never goes stale:
+changing any input simply yields a different key. Entries are JSON files under
+config.TOOL_CACHE_DIR/<namespace>/, written atomically, so the cache can be
+shared by concurrent agents and processes and survives restarts.
+
+An entry can carry a file (e.g. a compiled binary) stored next to it. A
+namespace with a size limit evicts its least recently used entries once it
+grows past the limit; every hit refreshes an entry's modification time.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+def hash_bytes(data):
+    """Returns the SHA-256 hex digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """Returns the SHA-256 hex digest of a file's contents, or None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def make_key(*parts):
+    """Combines the inputs a result depends on into one cache key."""
+    return hash_bytes(json.dumps(parts, default=str).encode('utf-8'))
+
+class ToolCache:
+    """
+    A namespace of JSON entries in the tool cache.
+    """
+    def __init__(self, namespace, cache_dir=config.TOOL_CACHE_DIR, max_bytes=None):
+        self.directory = os.path.join(cache_dir, namespace)
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self._size = None  # bytes on disk, counted on the first write
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the entry stored under `key`, or None."""
+        try:
+            with open(self._entry_path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        if self.max_bytes:
+            self._touch(key)
+        return entry
+
+    def get_file(self, key, dest_path):
+        """
+        Copies the file stored with an entry to `dest_path`, keeping its permission bits.
+
+        Returns:
+            bool: True if the file was restored.
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+            shutil.copy2(self._file_path(key), dest_path)
+        except OSError:
+            return False
+        return True
+
+    def put(self, key, entry, file_path=None):
+        """
+        Stores a JSON-serializable entry under `key`.
+
+        Args:
+            key (str): The cache key, see make_key().
+            entry: The JSON-serializable value.
+            file_path (str, optional): A file to store with the entry; see get_file().
+        """
+        path = self._entry_path(key)
+        written = []
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if file_path is not None:
+                # The file goes first: an entry is never visible without it.
+                self._write_atomic(self._file_path(key), lambda tmp: shutil.copy2(file_path, tmp))
+                written.append(self._file_path(key))
+            self._write_atomic(path, lambda tmp: self._dump(entry, tmp))
+            written.append(path)
+        except OSError as e:
+            logger.warning(f"Tool cache: Could not store entry {key}: {e}")
+            return
+        if self.max_bytes:
+            self._account(sum(os.path.getsize(p) for p in written))
+
+    @staticmethod
+    def _dump(entry, path):
+        with open(path, 'w') as f:
+            json.dump(entry, f)
+
+    @staticmethod
+    def _write_atomic(path, write):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # --- Size limit ---
+
+    def _touch(self, key):
+        """Marks an entry as recently used."""
+        now = time.time()
+        for path in (self._entry_path(key), self._file_path(key)):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+
+    def _account(self, added_bytes):
+        """Adds newly written bytes to the size and evicts if over the limit."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size in self._scan().values())
+            else:
+                self._size += added_bytes
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Returns {key: (last used, total bytes)} for every entry on disk."""
+        entries = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                key = name.split(".", 1)[0]
+                used, size = entries.get(key, (0.0, 0))
+                entries[key] = (max(used, stat.st_mtime), size + stat.st_size)
+        return entries
+
+    def _evict(self):
+        """Removes least recently used entries down to 90% of max_bytes. Call with the lock held."""
+        entries = self._scan()
+        self._size = sum(size for _, size in entries.values())
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if self._size <= target:
+                break
+            for path in (self._entry_path(key), self._file_path(key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+        logger.info(f"Tool cache: Evicted {evicted} entries from {self.directory}.")
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _file_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.data")
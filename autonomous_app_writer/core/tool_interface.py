@@ -3,98 +3,742 @@ Interface for S1 agents to interact with external tools.
 (e.g., compilers, linters, APIs, shell commands).
 """
 
+import ast
+import hashlib
+import os
+import re
+import shlex
+import shutil
+import signal
 import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.output_capture import start_capture
+from autonomous_app_writer.core.resource_limits import limits_preexec, usage_from_rusage
+from autonomous_app_writer.core.tool_cache import ToolCache, hash_file, make_key
 
 logger = get_logger(__name__)
 
+# Seconds to keep reading output after the process exits; background children
+# it left behind may hold the pipes open indefinitely.
+PIPE_DRAIN_TIMEOUT = 5
+
+# Prefix that runs a command in a new, empty network namespace (loopback only)
+# without needing root, via an unprivileged user namespace.
+UNSHARE_NET = ["unshare", "--net", "--map-root-user", "--"]
+
+_network_isolation = None
+_network_isolation_lock = threading.Lock()
+
+def network_isolation_available():
+    """Returns True if `unshare --net` works for this user. Probed once."""
+    global _network_isolation
+    if _network_isolation is None:
+        with _network_isolation_lock:
+            if _network_isolation is None:
+                available = False
+                if os.name == "posix" and shutil.which("unshare"):
+                    try:
+                        available = subprocess.run(
+                            UNSHARE_NET + ["true"], capture_output=True, timeout=10
+                        ).returncode == 0
+                    except (OSError, subprocess.SubprocessError):
+                        pass
+                if not available:
+                    logger.info("Network namespaces are unavailable; sandboxed commands keep network access.")
+                _network_isolation = available
+    return _network_isolation
+
+class ToolJob:
+    """
+    A command submitted to the ToolInterface's execution pool.
+
+    result() waits for the command's result dictionary; cancel() withdraws a
+    queued command or kills a running one.
+    """
+    def __init__(self, command, timeout):
+        self.command = command_label(command)
+        self.timeout = timeout
+        self.future = None
+        self._process = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        """Returns True once the command has finished, failed or been cancelled."""
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        Waits for the command and returns its result dictionary.
+
+        Raises:
+            concurrent.futures.TimeoutError: If `timeout` seconds pass first.
+        """
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            return _cancelled_result(self.command)
+
+    def cancel(self):
+        """Cancels the command: a queued command never starts, a running one is killed."""
+        self._cancelled.set()
+        if self.future is not None and self.future.cancel():
+            return
+        with self._lock:
+            process = self._process
+        # Don't poll() here: the running job reaps the process itself with os.wait4.
+        if process is not None and process.returncode is None:
+            logger.warning(f"Cancelling command '{self.command}'.")
+            kill_process_tree(process)
+
+    def _attach(self, process):
+        """Records the running process; kills it at once if the job was cancelled meanwhile."""
+        with self._lock:
+            self._process = process
+        if self.cancelled:
+            kill_process_tree(process)
+
+def kill_process_tree(process):
+    """
+    Kills a process started by the ToolInterface together with its children.
+
+    Commands run through a shell in their own session, so killing only the
+    shell would leave e.g. a long-running child holding the output pipes open.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass  # Already exited.
+
+def start_reaper(process):
+    """
+    Starts reaping a process and returns a function that waits for it.
+
+    Where os.wait4 exists the process is reaped with it in one background
+    thread, so the CPU time and peak memory of this run (and its waited-for
+    children) are known exactly, even with other commands running
+    concurrently. The returned wait(timeout) can be called again after a
+    timeout, e.g. once the process has been killed; it waits on the same
+    thread rather than starting a second reaper.
+
+    wait(timeout) returns the resource usage (see
+    core.resource_limits.usage_from_rusage), or None if unavailable, and
+    raises subprocess.TimeoutExpired if the process is still running after
+    `timeout` seconds.
+    """
+    if not hasattr(os, "wait4"):
+        def wait_unreaped(timeout=None):
+            process.wait(timeout=timeout)
+            return None
+        return wait_unreaped
+    usage = {}
+    exited = threading.Event()
+
+    def reap():
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            usage["rusage"] = rusage
+        except ChildProcessError:
+            process.wait()  # Already reaped elsewhere.
+        finally:
+            exited.set()
+
+    def wait(timeout=None):
+        if not exited.wait(timeout):
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        return usage_from_rusage(usage.get("rusage"))
+
+    threading.Thread(target=reap, daemon=True).start()
+    return wait
+
+# "path:line:..." as printed by pylint, flake8, ruff, mypy and most other linters.
+_LINT_LINE_RE = re.compile(r"^(?P<path>.+?):(?P<rest>\d+:.*)$")
+
+# Preprocessor line markers, '# 12 "path/to/file.h" 2'.
+_LINE_MARKER_RE = re.compile(rb'^# \d+ ".*$')
+
+def parse_lint_output(output, file_paths, cwd=None):
+    """
+    Splits the output of one linter run over several files into per-file messages.
+
+    Lines that don't start with one of the linted paths (headers, scores,
+    summaries) are dropped.
+
+    Returns:
+        dict: {file path as given: [message text after the "path:" prefix]}.
+    """
+    cwd = cwd or os.getcwd()
+    normalize = lambda path: os.path.normcase(os.path.abspath(os.path.join(cwd, path)))
+    by_normalized = {normalize(path): path for path in file_paths}
+    messages = {path: [] for path in file_paths}
+    for line in output.splitlines():
+        match = _LINT_LINE_RE.match(line)
+        if match:
+            path = by_normalized.get(normalize(match.group("path")))
+            if path is not None:
+                messages[path].append(match.group("rest"))
+    return messages
+
+def _resolve_local_module(module, cwd, package_dir):
+    """Returns the path of a project module relative to cwd, or None if it is not one."""
+    for base in ([package_dir] if package_dir is not None else []) + [""]:
+        stem = os.path.join(base, *module.split("."))
+        for candidate in (stem + ".py", os.path.join(stem, "__init__.py")):
+            if os.path.isfile(os.path.join(cwd, candidate)):
+                return os.path.normpath(candidate)
+    return None
+
+def _local_imports(path, cwd):
+    """Returns the project modules a Python file imports, as paths relative to cwd."""
+    try:
+        with open(os.path.join(cwd, path), 'rb') as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return []
+    file_dir = os.path.dirname(path)
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules += [(alias.name, None) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package_dir = os.path.normpath(os.path.join(file_dir, *[".."] * (node.level - 1)))
+                base = node.module or ""
+                # "from . import x" may name submodules as well as attributes.
+                modules += [(base, package_dir)] + [(f"{base}.{a.name}".lstrip("."), package_dir) for a in node.names]
+            elif node.module:
+                modules += [(node.module, None)] + [(f"{node.module}.{a.name}", None) for a in node.names]
+    resolved = []
+    for module, package_dir in modules:
+        if module:
+            local = _resolve_local_module(module, cwd, package_dir)
+        else:
+            local = _resolve_local_module("__init__", cwd, package_dir)
+        if local:
+            resolved.append(local)
+    return resolved
+
+def local_import_hashes(path, cwd):
+    """
+    Returns [(path, content hash)] of the project modules a Python file
+    imports, directly or indirectly; empty for other files.
+    """
+    if not path.endswith(".py"):
+        return []
+    hashes, seen, stack = [], {os.path.normpath(path)}, [path]
+    while stack:
+        for module_path in _local_imports(stack.pop(), cwd):
+            if module_path not in seen:
+                seen.add(module_path)
+                hashes.append((module_path, hash_file(os.path.join(cwd, module_path))))
+                stack.append(module_path)
+    return sorted(hashes)
+
+def command_label(command):
+    """Returns a printable form of a shell command string or an argv list."""
+    return command if isinstance(command, str) else shlex.join(command)
+
+def _cancelled_result(command):
+    return {
+        "stdout": "",
+        "stderr": f"Cancelled: Command '{command}' was cancelled.",
+        "return_code": -1,
+        "cancelled": True
+    }
+
 class ToolInterface:
     """
     Provides methods for agents to execute external tools.
+
+    Commands are either argv lists, executed directly without a shell
+    (run_command), or shell command strings (execute_shell_command). Both can
+    also be submitted to a bounded thread pool (submit, run_many); the pool
+    runs up to `max_concurrency` commands at once.
     """
-    def __init__(self):
+    def __init__(self, max_concurrency=config.TOOL_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._jobs = set()
+        self._lint_cache = ToolCache("lint")
+        self._compile_cache = ToolCache("compile", max_bytes=config.COMPILE_CACHE_MAX_BYTES)
+        self._tool_versions = {}
         logger.info("Tool Interface initialized.")
 
-    def execute_shell_command(self, command, timeout=60):
+    def execute_shell_command(self, command, timeout=config.TOOL_DEFAULT_TIMEOUT, on_output=None):
         """
         Executes a shell command and returns its output.
 
+        Only the first TOOL_OUTPUT_HEAD_BYTES and last TOOL_OUTPUT_TAIL_BYTES of
+        each stream are returned; longer output is saved in full under
+        TOOL_OUTPUT_LOG_DIR and listed in 'output_logs'.
+
         Args:
             command (str): The command to execute.
             timeout (int): The timeout in seconds.
+            on_output (callable, optional): Called as on_output(stream, line) for
+                each line of stdout/stderr as it is produced.
+
+        Returns:
+            dict: A dictionary containing 'stdout', 'stderr', 'return_code',
+            'duration' and 'output_bytes' (total bytes per stream).
+        """
+        return self._run(command, timeout, on_output=on_output)
+
+    def run_command(self, argv, cwd=None, env=None, timeout=config.TOOL_DEFAULT_TIMEOUT, on_output=None):
+        """
+        Executes a program directly, without a shell, and returns its output.
+
+        Arguments are passed to the program as-is, so file names and messages
+        need no quoting and cannot inject shell syntax.
+
+        Args:
+            argv (list): The program and its arguments, e.g. ["git", "status"].
+            cwd (str, optional): The working directory; defaults to the current one.
+            env (dict, optional): The complete environment for the program;
+                defaults to this process's environment.
+            timeout (int): The timeout in seconds.
+            on_output (callable, optional): As for execute_shell_command.
+
+        Returns:
+            dict: The same result dictionary as execute_shell_command.
+        """
+        return self._run(list(argv), timeout, on_output=on_output, cwd=cwd, env=env)
+
+    def run_python(self, code=None, script=None, args=(), cwd=None, limits=None, on_output=None):
+        """
+        Runs Python source code or a script under resource limits.
+
+        Jobs run in children forked from a warm, pre-imported fork server
+        (core/fork_server.py), or in a fresh interpreter where that is not
+        available or ENABLE_FORK_SERVER is off.
+
+        Args:
+            code (str, optional): Source code to run as __main__.
+            script (str, optional): Path of a script to run instead.
+            args (list): Arguments for the job's sys.argv.
+            cwd (str, optional): The job's working directory.
+            limits (dict, optional): Resource limits overriding config.PYTHON_JOB_LIMITS.
+            on_output (callable, optional): As for execute_shell_command.
 
         Returns:
-            dict: A dictionary containing 'stdout', 'stderr', and 'return_code'.
+            dict: The usual result dictionary plus 'timed_out' and 'resource_usage'.
         """
-        logger.info(f"Executing shell command: {command}")
+        from autonomous_app_writer.core.fork_server import ForkServerPool, get_fork_server_pool
+        if config.ENABLE_FORK_SERVER and ForkServerPool.available():
+            return get_fork_server_pool().run_python(code, script, args, cwd, limits, on_output)
+        limits = {**config.PYTHON_JOB_LIMITS, **(limits or {})}
+        return ForkServerPool._run_unforked(code, script, args, cwd, limits, on_output)
+
+    def submit(self, command, timeout=config.TOOL_DEFAULT_TIMEOUT, on_output=None, cwd=None, env=None):
+        """
+        Queues a command on the execution pool without waiting for it.
+
+        Args:
+            command (str or list): A shell command string, or an argv list to
+                run without a shell.
+            timeout (int): The timeout in seconds, counted from when the command starts.
+            on_output (callable, optional): As for execute_shell_command; called
+                from a pool thread.
+            cwd (str, optional): The working directory.
+            env (dict, optional): The complete environment for the command.
+
+        Returns:
+            ToolJob: A handle to wait for or cancel the command.
+        """
+        if not isinstance(command, str):
+            command = list(command)
+        job = ToolJob(command, timeout)
+        job.future = self._get_executor().submit(self._run, command, timeout, job, on_output, cwd, env)
+        self._jobs.add(job)
+        job.future.add_done_callback(lambda _: self._jobs.discard(job))
+        return job
+
+    def run_many(self, commands, timeout=config.TOOL_DEFAULT_TIMEOUT):
+        """
+        Runs several commands concurrently on the execution pool.
+
+        Args:
+            commands (list): The commands to execute, each a shell command
+                string or an argv list.
+            timeout (int): The timeout in seconds for each command.
+
+        Returns:
+            list: The result dictionaries, in the order of `commands`.
+        """
+        jobs = [self.submit(command, timeout) for command in commands]
+        return [job.result() for job in jobs]
+
+    def cancel_all(self):
+        """Cancels every queued and running command submitted to the pool."""
+        for job in list(self._jobs):
+            job.cancel()
+
+    def shutdown(self, cancel=True):
+        """Stops the execution pool, cancelling outstanding commands unless cancel=False."""
+        if cancel:
+            self.cancel_all()
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self):
+        """Creates the thread pool on first use."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix="tool"
+                    )
+        return self._executor
+
+    def run_sandboxed(self, command, files=None, limits=None, allow_network=False,
+                      timeout=config.TOOL_DEFAULT_TIMEOUT, on_output=None, keep_dir=False):
+        """
+        Runs an untrusted command in a sandbox.
+
+        The command runs in a private temporary directory (also its HOME and
+        TMPDIR) with a minimal environment, under rlimits, and, where
+        `unshare --net` works for this user, without network access. On timeout
+        its whole process group is killed. The configured process-count limit
+        only applies with network isolation (see config.SANDBOX_LIMITS).
+
+        Args:
+            command (str or list): A shell command string or an argv list.
+            files (dict, optional): {relative path: text} to create in the sandbox first.
+            limits (dict, optional): Resource limits overriding config.SANDBOX_LIMITS.
+            allow_network (bool): Skip network isolation.
+            timeout (int): The wall-clock timeout in seconds.
+            on_output (callable, optional): As for execute_shell_command.
+            keep_dir (bool): Keep the sandbox directory and return it as 'sandbox_dir'.
+
+        Returns:
+            dict: The usual result dictionary plus 'resource_usage' and 'network_isolated'.
+        """
+        sandbox_dir = tempfile.mkdtemp(prefix="sandbox-", dir=config.SANDBOX_ROOT)
         try:
-            result = subprocess.run(
+            for rel_path, content in (files or {}).items():
+                path = os.path.normpath(os.path.join(sandbox_dir, rel_path))
+                if os.path.commonpath([sandbox_dir, path]) != sandbox_dir:
+                    raise ValueError(f"Sandbox file path escapes the sandbox: {rel_path}")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(content)
+
+            argv = ["/bin/sh", "-c", command] if isinstance(command, str) else list(command)
+            isolate = config.SANDBOX_ISOLATE_NETWORK and not allow_network and network_isolation_available()
+            if isolate:
+                argv = UNSHARE_NET + argv
+            env = {
+                "PATH": os.environ.get("PATH", os.defpath),
+                "HOME": sandbox_dir,
+                "TMPDIR": sandbox_dir,
+                "LANG": os.environ.get("LANG", "C.UTF-8"),
+            }
+            sandbox_limits = dict(config.SANDBOX_LIMITS)
+            if not isolate:
+                # Outside a user namespace RLIMIT_NPROC counts all of the agent user's processes.
+                sandbox_limits.pop("processes", None)
+            preexec = limits_preexec({**sandbox_limits, **(limits or {})})
+            result = self._run(argv, timeout, on_output=on_output, cwd=sandbox_dir, env=env, preexec_fn=preexec)
+            result["network_isolated"] = isolate
+            if keep_dir:
+                result["sandbox_dir"] = sandbox_dir
+            return result
+        finally:
+            if not keep_dir:
+                shutil.rmtree(sandbox_dir, ignore_errors=True)
+
+    def _run(self, command, timeout, job=None, on_output=None, cwd=None, env=None, preexec_fn=None):
+        """
+        Runs one command to completion, timeout or cancellation.
+
+        A string is run through the shell; an argv list is executed directly,
+        which spares the /bin/sh start-up.
+        """
+        shell = isinstance(command, str)
+        label = command_label(command)
+        if job is not None and job.cancelled:
+            return _cancelled_result(label)
+        logger.info(f"Executing {'shell command' if shell else 'command'}: {label}" + (f" (cwd={cwd})" if cwd else ""))
+        start = time.monotonic()
+        try:
+            process = subprocess.Popen(
                 command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                check=False  # Do not raise exception on non-zero exit codes
+                shell=shell,
+                cwd=cwd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                preexec_fn=preexec_fn,
+                start_new_session=(os.name == "posix")  # own process group, see kill_process_tree()
             )
-            
-            if result.returncode != 0:
-                logger.warning(f"Command '{command}' exited with code {result.returncode}")
-                logger.warning(f"Stderr: {result.stderr}")
-
-            return {
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode
+            if job is not None:
+                job._attach(process)
+            captures, join = start_capture(process, self._spill_prefix(process), on_output)
+            wait = start_reaper(process)
+            try:
+                usage = wait(timeout)
+                timed_out = False
+            except subprocess.TimeoutExpired:
+                kill_process_tree(process)
+                usage = wait()
+                timed_out = True
+            join(PIPE_DRAIN_TIMEOUT)
+            stdout, stderr = captures["stdout"].text(), captures["stderr"].text()
+            output = {
+                "duration": time.monotonic() - start,
+                "output_bytes": {name: c.total_bytes for name, c in captures.items()},
+                "resource_usage": usage,
             }
-        except subprocess.TimeoutExpired:
-            logger.error(f"Command '{command}' timed out after {timeout} seconds.")
+            output_logs = {name: c.spilled_to for name, c in captures.items() if c.spilled_to}
+            if output_logs:
+                output["output_logs"] = output_logs
+
+            if timed_out:
+                logger.error(f"Command '{label}' timed out after {timeout} seconds.")
+                return {
+                    "stdout": stdout,
+                    "stderr": f"{stderr}TimeoutExpired: Command timed out after {timeout} seconds.",
+                    "return_code": -1,
+                    **output
+                }
+
+            if job is not None and job.cancelled:
+                return {**_cancelled_result(label), "stdout": stdout, **output}
+
+            if process.returncode != 0:
+                logger.warning(f"Command '{label}' exited with code {process.returncode}")
+                logger.warning(f"Stderr: {stderr}")
+
             return {
-                "stdout": "",
-                "stderr": f"TimeoutExpired: Command timed out after {timeout} seconds.",
-                "return_code": -1
+                "stdout": stdout,
+                "stderr": stderr,
+                "return_code": process.returncode,
+                **output
             }
         except Exception as e:
-            logger.error(f"An error occurred while executing command '{command}': {e}")
+            logger.error(f"An error occurred while executing command '{label}': {e}")
             return {
                 "stdout": "",
                 "stderr": str(e),
-                "return_code": -1
+                "return_code": -1,
+                "duration": time.monotonic() - start
             }
 
-    def run_linter(self, file_path, linter_command="pylint"):
+    @staticmethod
+    def _spill_prefix(process):
+        """Path prefix for a process's full-output logs, or None if spilling is disabled."""
+        if not config.TOOL_OUTPUT_LOG_DIR:
+            return None
+        return os.path.join(config.TOOL_OUTPUT_LOG_DIR, f"{int(time.time() * 1000)}-{process.pid}")
+
+    def run_linter(self, file_path, linter_command="pylint", use_cache=True):
         """
         Runs a linter on a specific file.
 
+        Results are cached by file content, linter, linter version and linter
+        configuration (see lint_files), so an unchanged file is not re-linted.
+
         Args:
             file_path (str): The path to the file to lint.
-            linter_command (str): The linter command to use.
+            linter_command (str): The linter command to use, optionally with
+                flags (e.g. "pylint --disable=C").
+            use_cache (bool): Set to False to always run the linter.
 
         Returns:
-            dict: The output from execute_shell_command.
+            dict: 'stdout' holds the linter's messages for the file; also 'stderr',
+            'return_code', and 'cached' when the cache was consulted.
         """
-        command = f"{linter_command} {file_path}"
-        return self.execute_shell_command(command)
+        if not use_cache:
+            return self.run_command(shlex.split(linter_command) + [file_path])
+        result = self.lint_files([file_path], linter_command)[file_path]
+        return {
+            "stdout": "\n".join(result["messages"]),
+            "stderr": result.get("error", ""),
+            "return_code": result["return_code"],
+            "cached": result["cached"],
+        }
 
-    def run_compiler(self, source_file, output_file, compiler_command="gcc"):
+    def lint_files(self, file_paths, linter_command="pylint", cwd=None, timeout=config.TOOL_DEFAULT_TIMEOUT):
+        """
+        Lints several files, running the linter once for all files not in the lint cache.
+
+        Cached results are keyed by (file content hash, linter command and
+        version, hash of the linter config files in `cwd`), so only files that
+        changed since they were last linted are passed to the linter. For a
+        Python file the key also covers the project modules it imports,
+        directly or indirectly (resolved from `cwd` and the file's package),
+        since messages such as no-member depend on them. Their
+        messages are split per file from the combined output. A run that failed
+        without reporting any messages (e.g. the linter is not installed) is
+        not cached.
+
+        Args:
+            file_paths (list): Paths of the files to lint, relative to `cwd`.
+            linter_command (str): The linter command, optionally with flags.
+                It must report messages as "path:line:...".
+            cwd (str, optional): The directory to run the linter in.
+            timeout (int): The timeout in seconds per linter run.
+
+        Returns:
+            dict: {file path: {'messages': ["path:line:...: message", ...],
+            'return_code': 0 if the file is clean, 'cached': bool}}; failed runs
+            also report 'error'.
+        """
+        linter_argv = shlex.split(linter_command)
+        cwd = cwd or os.getcwd()
+        base_key = (linter_argv, self._tool_version(linter_argv[0]), self._lint_config_hash(cwd))
+        results, pending = {}, {}
+        for path in dict.fromkeys(file_paths):
+            content_hash = hash_file(os.path.join(cwd, path))
+            key = make_key("lint", *base_key, content_hash, local_import_hashes(path, cwd)) if content_hash else None
+            entry = self._lint_cache.get(key) if key else None
+            if entry is not None:
+                results[path] = self._lint_result(path, entry, cached=True)
+            else:
+                pending[path] = key
+
+        batch_size = config.LINT_BATCH_MAX_FILES
+        paths = list(pending)
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            run = self.run_command(linter_argv + batch, cwd=cwd, timeout=timeout)
+            per_file = parse_lint_output(run["stdout"], batch, cwd)
+            reported = run["return_code"] == 0 or any(per_file.values())
+            for path in batch:
+                entry = {"messages": per_file[path], "return_code": run["return_code"] if per_file[path] else 0}
+                if reported and run["return_code"] >= 0 and not run.get("cancelled"):
+                    if pending[path]:
+                        self._lint_cache.put(pending[path], entry)
+                else:
+                    entry["return_code"] = run["return_code"] or 1
+                    entry["error"] = run["stderr"] or run["stdout"]
+                results[path] = self._lint_result(path, entry, cached=False)
+        if paths:
+            logger.info(f"Linted {len(paths)} file(s) with '{linter_argv[0]}'; {len(results) - len(paths)} cached.")
+        return {path: results[path] for path in dict.fromkeys(file_paths)}
+
+    @staticmethod
+    def _lint_result(path, entry, cached):
+        result = dict(entry, cached=cached)
+        result["messages"] = [f"{path}:{message}" for message in entry["messages"]]
+        return result
+
+    def _lint_config_hash(self, cwd):
+        """Hashes the linter configuration files present in `cwd`."""
+        return make_key(*[(name, hash_file(os.path.join(cwd, name)))
+                          for name in config.LINT_CONFIG_FILES if os.path.isfile(os.path.join(cwd, name))])
+
+    def _tool_version(self, program):
+        """Returns the output of `program --version`, queried once per program."""
+        if program not in self._tool_versions:
+            result = self.run_command([program, "--version"], timeout=30)
+            self._tool_versions[program] = (result["stdout"] or result["stderr"]).strip()
+        return self._tool_versions[program]
+
+    def run_compiler(self, source_file, output_file, compiler_command="gcc", use_cache=True):
         """
         Runs a compiler on a source file.
 
+        Successful compilations are cached, ccache-style, by the hash of the
+        preprocessed source, compiler version and flags; on a hit the cached
+        output is copied to `output_file` and the compiler is not run. Since
+        every included header is part of the preprocessed source, a changed
+        header is never served a stale binary.
+
         Args:
             source_file (str): The path to the source code file.
             output_file (str): The path for the output binary.
-            compiler_command (str): The compiler command to use.
+            compiler_command (str): The compiler command to use, optionally
+                with flags (e.g. "gcc -O2").
+            use_cache (bool): Set to False to always run the compiler.
 
         Returns:
-            dict: The output from execute_shell_command.
+            dict: The output from run_command, plus 'cached' when the cache was consulted.
+        """
+        argv = shlex.split(compiler_command)
+        if not use_cache:
+            return self.run_command(argv + [source_file, "-o", output_file])
+        start = time.monotonic()
+        key = self._compile_cache_key(argv, source_file)
+        entry = self._compile_cache.get(key) if key else None
+        if entry is not None and self._compile_cache.get_file(key, output_file):
+            logger.info(f"Compile cache hit for {source_file}.")
+            return {**entry, "duration": time.monotonic() - start, "cached": True}
+
+        result = self.run_command(argv + [source_file, "-o", output_file])
+        if key and result["return_code"] == 0 and os.path.isfile(output_file):
+            self._compile_cache.put(key, {"stdout": result["stdout"], "stderr": result["stderr"], "return_code": 0},
+                                    file_path=output_file)
+        return {**result, "cached": False}
+
+    def _compile_cache_key(self, argv, source_file):
         """
-        command = f"{compiler_command} {source_file} -o {output_file}"
-        return self.execute_shell_command(command)
+        Returns the compile cache key for a source file, or None if it can't be
+        preprocessed (the file is then compiled without caching).
+
+        The key always covers the preprocessed source, as in ccache's
+        preprocessor mode: spotting includes in the raw text misses spellings
+        like '# include', '<...>' headers found through -I, and macro includes.
+        """
+        source_hash = self._preprocessed_hash(argv, source_file)
+        if source_hash is None:
+            return None
+        return make_key("compile", argv, self._tool_version(argv[0]), source_hash,
+                        os.path.splitext(source_file)[1])
+
+    def _preprocessed_hash(self, argv, source_file):
+        """
+        Hashes the complete preprocessor output of a source file, or returns None on failure.
+
+        The output goes to a temporary file rather than through the captured
+        stdout, which is cut down for large outputs and would leave most of a
+        big header out of the key.
+        """
+        fd, preprocessed_path = tempfile.mkstemp(suffix=".i")
+        os.close(fd)
+        try:
+            result = self.run_command(argv + ["-E", source_file, "-o", preprocessed_path])
+            if result["return_code"] != 0:
+                return None
+            digest = hashlib.sha256()
+            with open(preprocessed_path, 'rb') as f:
+                for line in f:
+                    # Line markers name the source path; compilation output doesn't depend on it.
+                    if not _LINE_MARKER_RE.match(line):
+                        digest.update(line)
+            return digest.hexdigest()
+        except OSError:
+            return None
+        finally:
+            os.remove(preprocessed_path)
 
-# Singleton instance
-tool_interface = ToolInterface()
+# Singleton instance, created on first use
+_tool_interface = None
+_tool_interface_lock = threading.Lock()
 
 def get_tool_interface():
     """
     Returns the singleton ToolInterface instance.
     """
-    return tool_interface
+    global _tool_interface
+    if _tool_interface is None:
+        with _tool_interface_lock:
+            if _tool_interface is None:
+                _tool_interface = ToolInterface()
+    return _tool_interface
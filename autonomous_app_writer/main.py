@@ -3,10 +3,14 @@ Main entry point for the Autonomous App-Writing Agent.
 """
 
 import threading
+from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import setup_logging, get_logger
+from autonomous_app_writer.vsm_system1_operational_agents.registry import get_agent_registry
 from autonomous_app_writer.vsm_daemons.system4_intelligence_daemon import System4IntelligenceDaemon
 from autonomous_app_writer.vsm_daemons.system5_policy_daemon import System5PolicyDaemon
 from autonomous_app_writer.vsm_system3_operations.project_lifecycle_manager import ProjectLifecycleManager
+from autonomous_app_writer.project_tracker.project_archive import ProjectArchiver
+from autonomous_app_writer.core.state_watcher import StateFileWatcher
 
 # --- Agent Initialization ---
 
@@ -18,25 +22,12 @@ def initialize_agent():
     logger = get_logger(__name__)
     logger.info("--- AUTONOMOUS APP-WRITING AGENT INITIALIZING ---")
 
-    # Initialize all S1 agents so they register with the AgentState
-    # In a real app, this might be done more dynamically.
-    from autonomous_app_writer.vsm_system1_operational_agents import (
-        RequirementsAgent, ArchitectureAgent, UiUxAgent, FrontendCoderAgent,
-        BackendCoderAgent, DatabaseAgent, UnitTesterAgent, IntegrationTesterAgent,
-        E2ETesterAgent, DeploymentAgent, DocumentationAgent, VersionControlAgent
-    )
-    RequirementsAgent()
-    ArchitectureAgent()
-    UiUxAgent()
-    FrontendCoderAgent()
-    BackendCoderAgent()
-    DatabaseAgent()
-    UnitTesterAgent()
-    IntegrationTesterAgent()
-    E2ETesterAgent()
-    DeploymentAgent()
-    DocumentationAgent()
-    VersionControlAgent()
+    # S1 agents are declared in the agent registry and created on first use.
+    # Agents listed in PRELOAD_S1_AGENTS are created up front instead.
+    registry = get_agent_registry()
+    for agent_name in config.PRELOAD_S1_AGENTS:
+        registry.get_agent(agent_name)
+    logger.info(f"S1 agents available: {', '.join(registry.names())}")
 
     # Start background daemons
     s4_daemon = System4IntelligenceDaemon()
@@ -47,6 +38,16 @@ def initialize_agent():
 
     s4_thread.start()
     s5_thread.start()
+
+    # Hot reload of operator edits to the S5 policy and S4 knowledge files
+    state_watcher = StateFileWatcher()
+    watcher_thread = threading.Thread(target=state_watcher.run, daemon=True)
+    watcher_thread.start()
+
+    # Background compaction of completed projects into the archive tier
+    archiver = ProjectArchiver()
+    archiver_thread = threading.Thread(target=archiver.run, daemon=True)
+    archiver_thread.start()
     
     logger.info("--- AGENT INITIALIZATION COMPLETE. READY FOR REQUESTS. ---")
 
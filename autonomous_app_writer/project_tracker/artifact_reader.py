@@ -0,0 +1,162 @@
+"""
+Cached, memory-mapped reading of generated project artifacts.
+"""
+
+import os
+import mmap
+import codecs
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class ArtifactReader:
+    """
+    Reads artifact files through a content cache shared by all projects.
+
+    Each path remembers the (mtime, size) it was last read at and the SHA-256
+    of its content. A read whose stat still matches is served from memory;
+    anything else re-reads the file. Contents are stored by hash, so identical
+    files are kept only once. Files at or above the mmap threshold are
+    memory-mapped instead of being read through a buffered file object.
+    """
+    def __init__(self, max_cache_bytes=config.ARTIFACT_CACHE_MAX_BYTES,
+                 mmap_threshold=config.ARTIFACT_MMAP_THRESHOLD):
+        self.max_cache_bytes = max_cache_bytes
+        self.mmap_threshold = mmap_threshold
+        self._stat_index = {}           # path -> (mtime_ns, size, sha256)
+        self._contents = OrderedDict()  # sha256 -> (text, size), in LRU order
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read_text(self, file_path):
+        """
+        Returns the content of a file, served from cache when it is unchanged.
+
+        Args:
+            file_path (str): The path of the artifact file.
+
+        Returns:
+            str: The file content.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        st = os.stat(file_path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            indexed = self._stat_index.get(file_path)
+            if indexed and indexed[:2] == key and indexed[2] in self._contents:
+                self._contents.move_to_end(indexed[2])
+                self.hits += 1
+                return self._contents[indexed[2]][0]
+            self.misses += 1
+
+        text, digest = self._read_and_hash(file_path, st.st_size)
+        with self._lock:
+            self._stat_index[file_path] = (st.st_mtime_ns, st.st_size, digest)
+            self._store(digest, text, st.st_size)
+        return text
+
+    def get_digest(self, file_path):
+        """Returns the SHA-256 hex digest of a file's current content."""
+        st = os.stat(file_path)
+        with self._lock:
+            indexed = self._stat_index.get(file_path)
+            if indexed and indexed[:2] == (st.st_mtime_ns, st.st_size):
+                return indexed[2]
+        with self.open_mapped(file_path) as view:
+            digest = hashlib.sha256(view).hexdigest()
+        with self._lock:
+            self._stat_index[file_path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def iter_chunks(self, file_path, chunk_size=config.ARTIFACT_READ_CHUNK_SIZE):
+        """
+        Streams a file as decoded text chunks without loading it whole.
+
+        Multi-byte characters split across chunk boundaries are handled by an
+        incremental decoder, so each yielded chunk is valid text.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                text = decoder.decode(block)
+                if text:
+                    yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    @contextmanager
+    def open_mapped(self, file_path):
+        """
+        Yields a read-only memoryview over the file's bytes.
+
+        Large files are memory-mapped; small and empty files are read directly,
+        since mapping them costs more than it saves.
+        """
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.mmap_threshold or size == 0:
+                yield memoryview(f.read())
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def invalidate(self, file_path=None):
+        """Drops the cached entry for a path, or the whole cache if no path is given."""
+        with self._lock:
+            if file_path is None:
+                self._stat_index.clear()
+                self._contents.clear()
+                self._cached_bytes = 0
+            else:
+                self._stat_index.pop(file_path, None)
+
+    def _read_and_hash(self, file_path, size):
+        """Reads, hashes and decodes a file, decoding straight from the mapping for large files."""
+        with self.open_mapped(file_path) as view:
+            digest = hashlib.sha256(view).hexdigest()
+            with self._lock:
+                if digest in self._contents:
+                    # Same bytes as something already cached (e.g. a touched file).
+                    return self._contents[digest][0], digest
+            text = str(view, 'utf-8', 'replace')
+        logger.debug(f"Read artifact {file_path} ({size} bytes, mmap={size >= self.mmap_threshold})")
+        return text, digest
+
+    def _store(self, digest, text, size):
+        """Adds content to the cache and evicts least recently used entries. Caller holds the lock."""
+        if digest in self._contents:
+            self._contents.move_to_end(digest)
+            return
+        if size > self.max_cache_bytes:
+            return
+        self._contents[digest] = (text, size)
+        self._cached_bytes += size
+        while self._cached_bytes > self.max_cache_bytes and self._contents:
+            _, (_, evicted_size) = self._contents.popitem(last=False)
+            self._cached_bytes -= evicted_size
+
+# Singleton instance
+artifact_reader = ArtifactReader()
+
+def get_artifact_reader():
+    """
+    Returns the singleton ArtifactReader instance.
+    """
+    return artifact_reader
@@ -0,0 +1,206 @@
+"""
+Compressed archival tier for completed projects.
+
+A finished project's directory is packed into a single zip file with an
+index member, and the uncompressed tree is removed from PROJECTS_DIR.
+ProjectStateManager reads archived projects straight from the archive.
+"""
+
+import os
+import json
+import codecs
+import time
+import shutil
+import hashlib
+import zipfile
+import threading
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_MEMBER = "archive_index.json"
+STATE_MEMBER = "project_state.json"
+
+class ProjectArchive:
+    """
+    Packs projects into, and reads them back from, the archive directory.
+    """
+    def __init__(self, archive_dir=config.PROJECT_ARCHIVE_DIR, projects_dir=config.PROJECTS_DIR):
+        self.archive_dir = archive_dir
+        self.projects_dir = projects_dir
+        self._lock = threading.Lock()
+
+    def archive_path(self, project_id):
+        """Returns the path of a project's archive file."""
+        return os.path.join(self.archive_dir, f"{project_id}.zip")
+
+    def has_project(self, project_id):
+        """Returns True if the project is stored in the archive tier."""
+        return os.path.exists(self.archive_path(project_id))
+
+    def list_projects(self):
+        """Returns the IDs of all archived projects."""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return [name[:-len(".zip")] for name in os.listdir(self.archive_dir) if name.endswith(".zip")]
+
+    def archive_project(self, project_id):
+        """
+        Packs a project directory into one compressed archive and removes the directory.
+
+        The archive is written to a temporary file and renamed into place, so a
+        crash never leaves a half-written archive behind; the directory is only
+        removed once the archive exists.
+
+        Args:
+            project_id (str): The project to archive.
+
+        Returns:
+            str: The path of the archive, or None if the project directory does not exist.
+        """
+        project_dir = os.path.join(self.projects_dir, project_id)
+        if not os.path.isdir(project_dir):
+            logger.warning(f"Cannot archive project {project_id}: {project_dir} does not exist.")
+            return None
+
+        with self._lock:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            archive_path = self.archive_path(project_id)
+            tmp_path = f"{archive_path}.tmp"
+            index = {"project_id": project_id, "archived_at": time.time(), "files": {}}
+            with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+                for root, _, files in os.walk(project_dir):
+                    for name in files:
+                        full_path = os.path.join(root, name)
+                        rel_path = os.path.relpath(full_path, project_dir).replace(os.sep, "/")
+                        with open(full_path, 'rb') as f:
+                            data = f.read()
+                        zf.writestr(rel_path, data)
+                        index["files"][rel_path] = {
+                            "size": len(data),
+                            "sha256": hashlib.sha256(data).hexdigest(),
+                        }
+                zf.writestr(INDEX_MEMBER, json.dumps(index, indent=4))
+            os.replace(tmp_path, archive_path)
+            shutil.rmtree(project_dir)
+
+        logger.info(f"Archived project {project_id} to {archive_path} ({len(index['files'])} files).")
+        return archive_path
+
+    def read_index(self, project_id):
+        """Returns the index stored in a project's archive."""
+        with zipfile.ZipFile(self.archive_path(project_id)) as zf:
+            return json.loads(zf.read(INDEX_MEMBER))
+
+    def read_state(self, project_id):
+        """Returns the project state stored in a project's archive, or None."""
+        try:
+            return json.loads(self.read_text(project_id, STATE_MEMBER))
+        except KeyError:
+            return None
+
+    def read_text(self, project_id, rel_path):
+        """
+        Reads one file from a project's archive.
+
+        Raises:
+            KeyError: If the file is not in the archive.
+        """
+        with zipfile.ZipFile(self.archive_path(project_id)) as zf:
+            return zf.read(rel_path.replace(os.sep, "/")).decode('utf-8', 'replace')
+
+    def iter_chunks(self, project_id, rel_path, chunk_size=config.ARTIFACT_READ_CHUNK_SIZE):
+        """Streams one archived file as decoded text chunks without extracting it."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with zipfile.ZipFile(self.archive_path(project_id)) as zf:
+            with zf.open(rel_path.replace(os.sep, "/")) as f:
+                while True:
+                    block = f.read(chunk_size)
+                    if not block:
+                        break
+                    text = decoder.decode(block)
+                    if text:
+                        yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    def restore_project(self, project_id):
+        """
+        Unpacks an archived project back into PROJECTS_DIR and deletes the archive.
+
+        Returns:
+            str: The restored project directory.
+        """
+        project_dir = os.path.join(self.projects_dir, project_id)
+        with self._lock:
+            archive_path = self.archive_path(project_id)
+            with zipfile.ZipFile(archive_path) as zf:
+                members = [m for m in zf.namelist() if m != INDEX_MEMBER]
+                zf.extractall(project_dir, members=members)
+            os.remove(archive_path)
+        logger.info(f"Restored archived project {project_id} to {project_dir}.")
+        return project_dir
+
+class ProjectArchiver:
+    """
+    Background compaction job that moves old, completed projects into the archive tier.
+    """
+    def __init__(self, archive=None, min_age_seconds=config.ARCHIVE_MIN_AGE_SECONDS,
+                 compaction_interval=config.ARCHIVE_COMPACTION_INTERVAL):
+        self.archive = archive or get_project_archive()
+        self.min_age_seconds = min_age_seconds
+        self.compaction_interval = compaction_interval
+        logger.info("Project Archiver initialized.")
+
+    def run(self):
+        """
+        The main loop for the compaction job.
+        """
+        logger.info("Project Archiver starting its run loop.")
+        while True:
+            if config.ENABLE_PROJECT_ARCHIVAL:
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Archiver: An error occurred during compaction: {e}", exc_info=True)
+            time.sleep(self.compaction_interval)
+
+    def compact(self):
+        """
+        Archives every completed project that has not been touched for min_age_seconds.
+
+        Returns:
+            list: The IDs of the projects that were archived.
+        """
+        projects_dir = self.archive.projects_dir
+        if not os.path.isdir(projects_dir):
+            return []
+
+        archived = []
+        cutoff = time.time() - self.min_age_seconds
+        for project_id in os.listdir(projects_dir):
+            state_path = os.path.join(projects_dir, project_id, STATE_MEMBER)
+            try:
+                if os.path.getmtime(state_path) > cutoff:
+                    continue
+                with open(state_path, 'r') as f:
+                    status = json.load(f).get("status")
+            except (OSError, ValueError):
+                continue
+            if status == "COMPLETED" and self.archive.archive_project(project_id):
+                archived.append(project_id)
+
+        if archived:
+            logger.info(f"Archiver: Compacted {len(archived)} completed projects into the archive tier.")
+        return archived
+
+# Singleton instance
+project_archive = ProjectArchive()
+
+def get_project_archive():
+    """
+    Returns the singleton ProjectArchive instance.
+    """
+    return project_archive
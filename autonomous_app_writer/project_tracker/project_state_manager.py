@@ -5,11 +5,25 @@ Manages the state and artifacts for ongoing and completed projects.
 import os
 import json
 import uuid
+import hashlib
+import tempfile
 from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.project_tracker.artifact_reader import get_artifact_reader
+from autonomous_app_writer.project_tracker.project_archive import get_project_archive
+from autonomous_app_writer.project_tracker.symbol_index import SymbolIndex
 
 logger = get_logger(__name__)
 
+def _read_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Mode of newly created artifacts, as open(..., 'w') would create them; read
+# once at import, since reading the umask briefly changes it process-wide.
+_NEW_FILE_MODE = 0o666 & ~_read_umask()
+
 class ProjectStateManager:
     """
     Handles the persistence and retrieval of state for a single project.
@@ -22,8 +36,14 @@ class ProjectStateManager:
         
         self.project_dir = os.path.join(config.PROJECTS_DIR, self.project_id)
         self.state_file_path = os.path.join(self.project_dir, "project_state.json")
-        
-        os.makedirs(self.project_dir, exist_ok=True)
+        self.archive = get_project_archive()
+        self._symbol_index = None
+
+        # Archived projects are read straight from their archive and only
+        # unpacked again if something writes to them.
+        self.archived = not os.path.isdir(self.project_dir) and self.archive.has_project(self.project_id)
+        if not self.archived:
+            os.makedirs(self.project_dir, exist_ok=True)
         
         self.state = self._load_state()
         if not self.state:
@@ -50,6 +70,8 @@ class ProjectStateManager:
 
     def _load_state(self):
         """Loads the project state from its JSON file."""
+        if self.archived:
+            return self.archive.read_state(self.project_id)
         try:
             with open(self.state_file_path, 'r') as f:
                 return json.load(f)
@@ -58,6 +80,7 @@ class ProjectStateManager:
 
     def save_state(self):
         """Saves the current project state to its JSON file."""
+        self._ensure_unarchived()
         with open(self.state_file_path, 'w') as f:
             json.dump(self.state, f, indent=4)
         logger.debug(f"Project state saved for project: {self.project_id}")
@@ -72,15 +95,156 @@ class ProjectStateManager:
         return self.state
 
     def add_code_artifact(self, artifact_name, artifact_content):
-        """Saves a code artifact to the project directory."""
-        artifact_path = os.path.join(self.project_dir, artifact_name)
-        os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
-        with open(artifact_path, 'w') as f:
-            f.write(artifact_content)
-        
-        self.state['code_artifacts'][artifact_name] = {"path": artifact_path}
+        """
+        Saves a code artifact to the project directory.
+
+        Returns:
+            dict: A lightweight handle to the stored artifact (see get_artifact_handle).
+        """
+        return self.add_code_artifacts({artifact_name: artifact_content})[0]
+
+    def add_code_artifacts(self, files):
+        """
+        Saves a bundle of code artifacts to the project directory in one batch.
+
+        Every file is first written to a temporary file next to its target;
+        only when all of them are written are they moved into place with
+        os.replace, and the state is saved once. A failure while staging the
+        files leaves the project unchanged; each replace is atomic, but a
+        failure partway through the replaces (rare, e.g. a permission error)
+        leaves the files replaced so far in place. Files keep the mode of the
+        artifact they replace; new ones get the usual umask-based mode.
+
+        Args:
+            files (dict): {artifact name (relative path): content}.
+
+        Returns:
+            list: The handles of the stored artifacts, in the order of `files`.
+
+        Raises:
+            ValueError: If an artifact name points outside the project directory.
+        """
+        self._ensure_unarchived()
+        project_root = os.path.abspath(self.project_dir)
+        targets = {}
+        for artifact_name in files:
+            artifact_path = os.path.join(self.project_dir, artifact_name)
+            if os.path.commonpath([project_root, os.path.abspath(artifact_path)]) != project_root:
+                raise ValueError(f"Artifact path escapes the project directory: {artifact_name}")
+            targets[artifact_name] = artifact_path
+
+        staged = []
+        try:
+            for artifact_name, content in files.items():
+                directory = os.path.dirname(targets[artifact_name])
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".artifact-", suffix=".tmp")
+                staged.append(tmp_path)
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                # mkstemp creates the file owner-only (0600) and os.replace keeps that mode.
+                try:
+                    mode = os.stat(targets[artifact_name]).st_mode & 0o7777
+                except FileNotFoundError:
+                    mode = _NEW_FILE_MODE
+                os.chmod(tmp_path, mode)
+        except Exception:
+            # Also e.g. a UnicodeEncodeError: no staged file may be left behind.
+            for tmp_path in staged:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            raise
+        for tmp_path, artifact_name in zip(staged, files):
+            os.replace(tmp_path, targets[artifact_name])
+
+        for artifact_name, content in files.items():
+            encoded = content.encode('utf-8')
+            self.state['code_artifacts'][artifact_name] = {
+                "path": targets[artifact_name],
+                "sha256": hashlib.sha256(encoded).hexdigest(),
+                "size": len(encoded),
+            }
         self.save_state()
-        logger.info(f"Saved code artifact '{artifact_name}' for project {self.project_id}")
+        if config.ENABLE_SYMBOL_INDEX:
+            index = self.get_symbol_index()
+            changed = [index.update_file(name, content, self.state['code_artifacts'][name]["sha256"])
+                       for name, content in files.items()]
+            if any(changed):
+                index.save()
+        logger.info(f"Saved {len(files)} code artifact(s) for project {self.project_id}: {', '.join(files)}")
+        return [self.get_artifact_handle(artifact_name) for artifact_name in files]
+
+    def get_symbol_index(self):
+        """
+        Returns the project's symbol index (see symbol_index.py).
+
+        It is loaded on first use and brought up to date with the stored
+        artifacts, so projects created before the index existed get one too.
+        """
+        if self._symbol_index is None:
+            self._symbol_index = SymbolIndex.load(self.project_dir)
+            if not self.archived and self._symbol_index.sync(self.state['code_artifacts']):
+                self._symbol_index.save()
+        return self._symbol_index
+
+    def get_artifact_handle(self, artifact_name):
+        """
+        Returns a small reference to a stored artifact, or None if it does not exist.
+
+        Handles are what gets passed through workflow state and task details
+        instead of the artifact content; resolve them with resolve_artifact().
+        """
+        artifact_info = self.state['code_artifacts'].get(artifact_name)
+        if not artifact_info:
+            return None
+        return {
+            "artifact_ref": artifact_name,
+            "project_id": self.project_id,
+            "path": artifact_info["path"],
+            "sha256": artifact_info.get("sha256"),
+        }
+
+    def resolve_artifact(self, handle_or_name):
+        """Returns the content of an artifact given its handle or name."""
+        if isinstance(handle_or_name, str):
+            handle_or_name = self.get_artifact_handle(handle_or_name)
+        return resolve_artifact_handle(handle_or_name)
+
+    def read_artifact(self, artifact_name):
+        """
+        Returns the content of a stored artifact, or None if it is unknown.
+
+        Reads go through the shared ArtifactReader, so re-reading an unchanged
+        file during repeated reviews is served from memory.
+        """
+        artifact_info = self.state['code_artifacts'].get(artifact_name)
+        if not artifact_info:
+            return None
+        if self.archived:
+            return self.archive.read_text(self.project_id, artifact_name)
+        return get_artifact_reader().read_text(artifact_info["path"])
+
+    def iter_artifact_chunks(self, artifact_name, chunk_size=config.ARTIFACT_READ_CHUNK_SIZE):
+        """Streams a stored artifact as text chunks, for bundles too large to read at once."""
+        artifact_info = self.state['code_artifacts'].get(artifact_name)
+        if not artifact_info:
+            return iter(())
+        if self.archived:
+            return self.archive.iter_chunks(self.project_id, artifact_name, chunk_size)
+        return get_artifact_reader().iter_chunks(artifact_info["path"], chunk_size)
+
+    def archive_project(self):
+        """Moves this project into the compressed archive tier."""
+        if not self.archived and self.archive.archive_project(self.project_id):
+            self.archived = True
+
+    def _ensure_unarchived(self):
+        """Restores an archived project to PROJECTS_DIR before it is modified."""
+        if self.archived:
+            self.archive.restore_project(self.project_id)
+            self.archived = False
 
     def get_project_report(self):
         """Generates a final report for the project."""
@@ -92,3 +256,29 @@ class ProjectStateManager:
             "artifacts_generated": list(self.state.get('code_artifacts', {}).keys()),
             "test_summary": self.state.get("test_results", [])[-1] if self.state.get("test_results") else "No tests run."
         }
+
+def is_artifact_handle(obj):
+    """Returns True if obj is an artifact handle produced by ProjectStateManager."""
+    return isinstance(obj, dict) and "artifact_ref" in obj and "path" in obj
+
+def resolve_artifact_handle(handle):
+    """
+    Loads the content referenced by an artifact handle.
+
+    S1 agents only receive the project state dict, not the manager, so this is
+    available as a module-level function as well.
+
+    Returns:
+        str: The artifact content, or None if it cannot be read.
+    """
+    if not is_artifact_handle(handle):
+        return None
+    try:
+        if not os.path.exists(handle["path"]):
+            archive = get_project_archive()
+            if handle.get("project_id") and archive.has_project(handle["project_id"]):
+                return archive.read_text(handle["project_id"], handle["artifact_ref"])
+        return get_artifact_reader().read_text(handle["path"])
+    except (OSError, KeyError) as e:
+        logger.error(f"Could not resolve artifact '{handle['artifact_ref']}': {e}")
+        return None
@@ -0,0 +1,300 @@
+"""
+AST-based symbol index of a generated project.
+
+For every Python artifact the index records its module name, imports and the
+signature, location and first docstring line of each class, function, method
+and module-level constant. It is kept next to the project state as
+symbol_index.json and updated file by file as artifacts are added; a file
+whose hash is unchanged is not re-parsed.
+
+Agents use it to put only the parts of the existing code a task refers to
+into their prompts: signatures of the referenced modules and symbols, plus
+source snippets of the symbols named directly, within a size budget.
+"""
+
+import ast
+import json
+import os
+import re
+import threading
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.project_tracker.artifact_reader import get_artifact_reader
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "symbol_index.json"
+INDEX_VERSION = 1
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_MIN_NAME_LENGTH = 3
+
+def module_name(path):
+    """Returns the dotted module name of a .py path, e.g. 'app.models' for 'app/models.py'."""
+    parts = os.path.splitext(path.replace(os.sep, "/"))[0].split("/")
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts = parts[:-1]
+    return ".".join(parts)
+
+def _first_doc_line(node):
+    doc = ast.get_docstring(node)
+    return doc.strip().splitlines()[0] if doc and doc.strip() else None
+
+def _function_signature(node):
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+def _class_signature(node):
+    bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(k) for k in node.keywords]
+    return f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+
+def _symbol(node, kind, qualname, signature):
+    return {
+        "name": qualname.rsplit(".", 1)[-1],
+        "qualname": qualname,
+        "kind": kind,
+        "signature": signature,
+        "lineno": node.lineno,
+        "end_lineno": getattr(node, "end_lineno", node.lineno),
+        "doc": _first_doc_line(node) if kind in ("class", "function", "method") else None,
+    }
+
+def parse_module(source):
+    """
+    Extracts the imports and symbols of a Python source file.
+
+    Returns:
+        dict: {'doc', 'imports', 'symbols'}, or None if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    imports, symbols = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append("." * node.level + (node.module or ""))
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append(_symbol(node, "function", node.name, _function_signature(node)))
+        elif isinstance(node, ast.ClassDef):
+            symbols.append(_symbol(node, "class", node.name, _class_signature(node)))
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    symbols.append(_symbol(item, "method", f"{node.name}.{item.name}", _function_signature(item)))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id.isupper():
+                    symbols.append(_symbol(node, "constant", target.id, ast.unparse(node).splitlines()[0][:120]))
+    return {"doc": _first_doc_line(tree), "imports": sorted(set(imports)), "symbols": symbols}
+
+class SymbolIndex:
+    """
+    The symbol index of one project directory.
+    """
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, INDEX_FILENAME)
+        self.files = {}  # artifact path -> {'sha256', 'module', 'doc', 'imports', 'symbols'}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, project_dir):
+        """Loads a project's index; a missing or outdated index file yields an empty index."""
+        index = cls(project_dir)
+        try:
+            with open(index.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                index.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return index
+
+    def save(self):
+        """Writes the index atomically."""
+        with self._lock:
+            data = {"version": INDEX_VERSION, "files": self.files}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def update_file(self, path, content, sha256=None):
+        """
+        Indexes one artifact. Non-Python files are ignored. A file that does not
+        parse keeps its previous signatures, marked stale and without line
+        ranges, so no snippet is cut from the new source by the old ranges.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        if not path.endswith(".py"):
+            return False
+        with self._lock:
+            entry = self.files.get(path)
+            if entry is not None and sha256 is not None and entry.get("sha256") == sha256:
+                return False
+        parsed = parse_module(content)
+        with self._lock:
+            if parsed is not None:
+                self.files[path] = {"sha256": sha256, "module": module_name(path), **parsed}
+                return True
+            # Keep the signatures the last parseable version defined, but mark
+            # them stale: their line ranges no longer match the file on disk.
+            logger.debug(f"Symbol index: {path} does not parse; marking its entry stale.")
+            previous = self.files.get(path) or {"doc": None, "imports": [], "symbols": []}
+            symbols = [{**symbol, "lineno": None, "end_lineno": None} for symbol in previous["symbols"]]
+            self.files[path] = {**previous, "sha256": sha256, "module": module_name(path),
+                                "symbols": symbols, "stale": True}
+        return True
+
+    def sync(self, code_artifacts):
+        """
+        Brings the index up to date with a project's 'code_artifacts' state.
+
+        Only artifacts whose hash differs from the indexed one are read and
+        parsed; entries of artifacts that no longer exist are dropped.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        changed = False
+        with self._lock:
+            for path in [p for p in self.files if p not in code_artifacts]:
+                del self.files[path]
+                changed = True
+        for path, info in code_artifacts.items():
+            entry = self.files.get(path)
+            if not path.endswith(".py") or (entry and entry.get("sha256") == info.get("sha256")):
+                continue
+            try:
+                content = get_artifact_reader().read_text(info["path"])
+            except (OSError, KeyError):
+                continue
+            changed |= self.update_file(path, content, info.get("sha256"))
+        return changed
+
+    # --- Queries ---
+
+    def references(self, text, exclude=()):
+        """
+        Finds the modules and symbols a piece of text (e.g. a task description) refers to.
+
+        Names match case-insensitively and ignoring a plural 's', so "notes"
+        finds a class Note and a module notes.py.
+
+        Args:
+            text (str): The text to look for names in.
+            exclude (iterable): Artifact paths to leave out, e.g. the file the text is.
+
+        Returns:
+            tuple: ([referenced module paths], [(path, symbol)] named directly).
+        """
+        words = {word.lower() for word in _WORD_RE.findall(text or "")}
+        words |= {word[:-1] for word in words if word.endswith("s")}
+        modules, symbols = [], []
+        with self._lock:
+            for path, entry in self.files.items():
+                if path in exclude:
+                    continue
+                module_words = {entry["module"].rsplit(".", 1)[-1].lower(), entry["module"].lower()}
+                if module_words & words:
+                    modules.append(path)
+                for symbol in entry["symbols"]:
+                    if len(symbol["name"]) < _MIN_NAME_LENGTH:
+                        continue  # e.g. 'f' or 'db' would match too much prose
+                    if symbol["name"].lower() in words or symbol["qualname"].lower() in words:
+                        symbols.append((path, symbol))
+        return modules, symbols
+
+    def context_for(self, text, exclude=(), max_chars=config.SYMBOL_CONTEXT_MAX_CHARS,
+                    snippet_lines=config.SYMBOL_SNIPPET_MAX_LINES):
+        """
+        Renders the existing code a piece of text refers to, for a prompt.
+
+        Directly named symbols come first with a source snippet each; then the
+        signatures of the referenced modules and of the modules defining the
+        named symbols. Output stops at `max_chars`.
+
+        Returns:
+            str: The context, or "" if nothing is referenced.
+        """
+        modules, symbols = self.references(text, exclude)
+        parts, used = [], 0
+
+        def add(chunk):
+            nonlocal used
+            if used + len(chunk) > max_chars:
+                return False
+            parts.append(chunk)
+            used += len(chunk)
+            return True
+
+        for path, symbol in symbols:
+            if symbol["lineno"] is None:
+                chunk = (f"# {path} ({symbol['kind']} {symbol['qualname']}; stale, the file does not parse)\n"
+                         f"{symbol['signature']}\n")
+            else:
+                snippet = self._snippet(path, symbol, snippet_lines)
+                chunk = f"# {path}:{symbol['lineno']} ({symbol['kind']} {symbol['qualname']})\n{snippet or symbol['signature']}\n"
+            if not add(chunk):
+                break
+        for path in dict.fromkeys(modules + [path for path, _ in symbols]):
+            entry = self.files[path]
+            lines = [f"# module {entry['module']} ({path})" + (f": {entry['doc']}" if entry.get("doc") else "")
+                     + (" [stale: the file does not parse]" if entry.get("stale") else "")]
+            for symbol in entry["symbols"]:
+                indent = "    " if symbol["kind"] == "method" else ""
+                doc = f"  # {symbol['doc']}" if symbol.get("doc") else ""
+                lines.append(f"{indent}{symbol['signature']}{doc}")
+            if not add("\n".join(lines) + "\n"):
+                break
+        return "\n".join(parts)
+
+    def _snippet(self, path, symbol, max_lines):
+        """Returns the symbol's source lines, cut to max_lines, or None if the file can't be read."""
+        try:
+            source = get_artifact_reader().read_text(os.path.join(self.project_dir, path))
+        except OSError:
+            return None
+        lines = source.splitlines()[symbol["lineno"] - 1:symbol["end_lineno"]]
+        if len(lines) > max_lines:
+            lines = lines[:max_lines] + [f"    ... ({len(lines) - max_lines} more lines)"]
+        return "\n".join(lines)
+
+# Indexes loaded for reading, by project directory; reloaded when the file changes.
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+def load_symbol_index(project_dir):
+    """
+    Returns the saved symbol index of a project directory, cached until the index file changes.
+    """
+    path = os.path.join(project_dir, INDEX_FILENAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return SymbolIndex(project_dir)
+    with _loaded_lock:
+        cached = _loaded.get(project_dir)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    index = SymbolIndex.load(project_dir)
+    with _loaded_lock:
+        _loaded[project_dir] = (mtime, index)
+    return index
+
+def get_code_context(project_state, text, exclude=()):
+    """
+    Returns the existing code of a project that `text` refers to, for agents
+    that only hold the project state dict (see SymbolIndex.context_for).
+    """
+    project_id = project_state.get("project_id")
+    if not project_id or not text:
+        return ""
+    return load_symbol_index(os.path.join(config.PROJECTS_DIR, project_id)).context_for(text, exclude)
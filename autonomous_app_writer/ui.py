@@ -2,12 +2,8 @@
 A simple Gradio-based web UI for the Autonomous App-Writing Agent.
 """
 
-import gradio as gr
 from autonomous_app_writer.main import initialize_agent, handle_development_request
 
-# Initialize the agent once when the UI starts
-initialize_agent()
-
 def run_agent(user_prompt):
     """
     The function that Gradio will call to run the agent.
@@ -41,15 +37,26 @@ def run_agent(user_prompt):
     ```
     """
 
-# Create the Gradio interface
-iface = gr.Interface(
-    fn=run_agent,
-    inputs=gr.Textbox(lines=5, label="App Description", placeholder="e.g., A simple to-do list app for the web."),
-    outputs=gr.Markdown(label="Development Result"),
-    title="Autonomous App-Writing Agent",
-    description="Enter a description of the application you want to build, and the agent will attempt to create it.",
-    allow_flagging="never"
-)
+def build_interface():
+    """
+    Initializes the agent and creates the Gradio interface.
+
+    Gradio is imported here rather than at module import, so importing this
+    module (e.g. to reuse run_agent) stays cheap.
+    """
+    import gradio as gr
+
+    # Initialize the agent once when the UI starts
+    initialize_agent()
+
+    return gr.Interface(
+        fn=run_agent,
+        inputs=gr.Textbox(lines=5, label="App Description", placeholder="e.g., A simple to-do list app for the web."),
+        outputs=gr.Markdown(label="Development Result"),
+        title="Autonomous App-Writing Agent",
+        description="Enter a description of the application you want to build, and the agent will attempt to create it.",
+        allow_flagging="never"
+    )
 
 if __name__ == "__main__":
-    iface.launch()
+    build_interface().launch()
@@ -2,7 +2,6 @@
 General utility functions for network operations.
 """
 
-import requests
 from autonomous_app_writer.core.logging_setup import get_logger
 
 logger = get_logger(__name__)
@@ -18,6 +17,8 @@ def fetch_url_content(url, timeout=10):
     Returns:
         str: The content of the page, or None if an error occurs.
     """
+    import requests  # Deferred: only the S4 scanners need it.
+
     try:
         response = requests.get(url, timeout=timeout)
         response.raise_for_status()  # Raise an exception for bad status codes
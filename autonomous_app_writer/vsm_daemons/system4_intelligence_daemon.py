@@ -75,8 +75,8 @@ class System4IntelligenceDaemon:
             # This assumes the LLM returns a valid JSON string.
             # Robust error handling and parsing would be needed here.
             new_knowledge = self.llm_service.parse_json_response(insights_str) # Assumes such a method exists
-            self.agent_state.s4_knowledge.update(new_knowledge)
-            self.agent_state.save_s4_knowledge()
+            # Merged entry by entry: deduplicated, aged and capped per category.
+            self.agent_state.ingest_s4_knowledge(new_knowledge)
             logger.info("S4: Successfully updated environmental knowledge base.")
         except Exception as e:
             logger.error(f"S4: Failed to parse LLM response or update knowledge base: {e}")
@@ -46,8 +46,9 @@ class System5PolicyDaemon:
         """
         Reviews strategic inputs and performance feedback to adapt policies.
         """
-        current_policies = self.agent_state.s5_policies
-        s4_knowledge = self.agent_state.s4_knowledge
+        snapshot = self.agent_state.snapshot()
+        current_policies = snapshot.s5_policies
+        s4_knowledge = snapshot.s4_knowledge
         
         # In a real system, this would also pull high-level performance summaries
         # from S3, perhaps via the algedonic manager.
@@ -78,32 +79,27 @@ class System5PolicyDaemon:
             # This assumes the LLM returns a valid JSON string.
             # Robust error handling and parsing would be needed here.
             updated_policies = self.llm_service.parse_json_response(response_str) # Assumes such a method exists
-            self.agent_state.s5_policies = updated_policies
-            self.agent_state.save_s5_policies()
+            self.agent_state.set_s5_policies(updated_policies)
             logger.info("S5: Successfully reviewed and updated policies.")
         except Exception as e:
             logger.error(f"S5: Failed to parse LLM response or update policies: {e}")
 
     def _get_performance_summary(self):
         """
-        Gathers long-term performance data from the algedonic signal queue.
+        Gathers long-term performance data from the algedonic signal metrics.
         """
-        signals = self.algedonic_manager.get_signals() # Assumes this method exists
-        if not signals:
+        summary = self.algedonic_manager.get_performance_summary(window=config.S5_PERFORMANCE_WINDOW)
+        if not summary["failure_count"] and not summary["success_count"]:
             return {"summary": "No performance signals recorded recently."}
 
-        pain_signals = [s for s in signals if s['type'] == 'PAIN']
-        pleasure_signals = [s for s in signals if s['type'] == 'PLEASURE']
-
-        # Simple summary logic
-        failure_categories = [s['category'] for s in pain_signals]
-        success_categories = [s['category'] for s in pleasure_signals]
-
         return {
-            "recent_failure_count": len(failure_categories),
-            "recent_success_count": len(success_categories),
-            "common_failure_points": list(set(failure_categories)),
-            "common_success_points": list(set(success_categories)),
+            "window": summary["window"],
+            "recent_failure_count": summary["failure_count"],
+            "recent_success_count": summary["success_count"],
+            "failures_per_hour": round(summary["failures_per_hour"], 3),
+            "successes_per_hour": round(summary["successes_per_hour"], 3),
+            "common_failure_points": summary["top_failure_categories"],
+            "common_success_points": summary["top_success_categories"],
         }
 
 if __name__ == '__main__':
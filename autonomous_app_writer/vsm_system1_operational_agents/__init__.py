@@ -1,16 +1,12 @@
 """
 VSM System 1: Primary Operational Activities Agents
+
+Agent classes are imported lazily on first attribute access, so importing
+this package does not import every agent module.
 """
 
-from .requirements_agent import RequirementsAgent
-from .architecture_agent import ArchitectureAgent
-from .ui_ux_agent import UiUxAgent
-from .coding_agents.frontend_coder_agent import FrontendCoderAgent
-from .coding_agents.backend_coder_agent import BackendCoderAgent
-from .coding_agents.database_agent import DatabaseAgent
-from .testing_agents.unit_tester_agent import UnitTesterAgent
-from .testing_agents.integration_tester_agent import IntegrationTesterAgent
-from .testing_agents.e2e_tester_agent import E2ETesterAgent
-from .deployment_agent import DeploymentAgent
-from .documentation_agent import DocumentationAgent
-from .version_control_agent import VersionControlAgent
+def __getattr__(name):
+    from .registry import AGENT_MANIFEST, load_object
+    if name in AGENT_MANIFEST:
+        return load_object(AGENT_MANIFEST[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,10 +3,13 @@ Abstract Base Class for all VSM System 1 (S1) Operational Agents.
 """
 
 from abc import ABC, abstractmethod
+from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
 from autonomous_app_writer.core.llm_services import get_llm_service
 from autonomous_app_writer.core.tool_interface import get_tool_interface
 from autonomous_app_writer.core.agent_state import get_agent_state
+from autonomous_app_writer.core.knowledge_index import select_relevant_knowledge
+from autonomous_app_writer.project_tracker.symbol_index import get_code_context
 
 class BaseS1Agent(ABC):
     """
@@ -45,17 +48,31 @@ class BaseS1Agent(ABC):
         """
         pass
 
-    def get_relevant_context(self, project_state):
+    def get_relevant_context(self, project_state, query=None):
         """
         Helper method to extract relevant context for prompting the LLM.
         Can be overridden by subclasses for more specific context gathering.
+
+        Args:
+            project_state (dict): The current project state.
+            query (str, optional): Text describing the task, used to select the
+                S4 knowledge entries that go into the context. Defaults to the
+                project's structured requirements. With a query, the context also
+                holds the existing code it refers to under 'code_context'.
         """
+        # One snapshot, so policies and knowledge come from the same version.
+        snapshot = self.agent_state.snapshot()
+        requirements = project_state.get("structured_requirements")
+        s4_knowledge = snapshot.s4_knowledge
+        if config.ENABLE_S4_RETRIEVAL:
+            s4_knowledge = select_relevant_knowledge(query or str(requirements or ""), snapshot=snapshot)
         return {
-            "requirements": project_state.get("structured_requirements"),
+            "requirements": requirements,
             "architecture": project_state.get("architecture_design"),
             "ui_ux_design": project_state.get("ui_ux_design"),
-            "policies": self.agent_state.s5_policies,
-            "s4_knowledge": self.agent_state.s4_knowledge
+            "policies": snapshot.s5_policies,
+            "s4_knowledge": s4_knowledge,
+            "code_context": get_code_context(project_state, query) if config.ENABLE_SYMBOL_INDEX and query else "",
         }
 
     def _create_task_result(self, status, artifact=None, error_message=None):
@@ -64,6 +81,7 @@ class BaseS1Agent(ABC):
         """
         return {
             "status": status,
+            "agent_name": self.agent_name,
             "artifact": artifact,
             "error": error_message
         }
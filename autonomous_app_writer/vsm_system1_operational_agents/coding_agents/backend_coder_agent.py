@@ -13,13 +13,13 @@ class BackendCoderAgent(BaseCodingAgent):
     def __init__(self):
         super().__init__("BackendCoderAgent")
 
-    def _generate_code(self, task_details, project_state):
+    def _generate_code(self, task_details, project_state, temperature=0.7):
         """
         Generates the initial block of backend code.
         """
         self.logger.debug(f"Generating backend code for task: {task_details.get('description')}")
         
-        context = self.get_relevant_context(project_state)
+        context = self.get_relevant_context(project_state, query=task_details.get('description'))
         
         prompt = f"""
         You are the S1.BackendCoding Agent. Your task is to write backend code.
@@ -30,13 +30,16 @@ class BackendCoderAgent(BaseCodingAgent):
         - Architecture: {context.get('architecture')}
         - Technology Stack: {context.get('architecture', {}).get('technology_stack', {}).get('backend')}
         - API Contracts / Coordination Info: (Assume this would be passed in a real system)
+        - Existing Code it refers to (signatures and snippets):
+        {context.get('code_context') or 'None yet.'}
 
         Based on the context, write the code for the specified backend feature (e.g., API endpoint).
         Ensure the code is secure and performant.
         Your output should be only the code block for the specified file/module.
+        If the feature needs several files, give each its own code block opened with its path (e.g. ```app/models.py).
         """
         
-        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL)
+        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL, temperature=temperature)
         return generated_code
 
 # Example of how to instantiate and use the agent
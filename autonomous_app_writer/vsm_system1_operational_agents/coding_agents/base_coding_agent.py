@@ -2,7 +2,16 @@
 Base class for all S1 coding agents.
 """
 
+import difflib
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from ..base_s1_agent import BaseS1Agent
+from .code_bundle import parse_code_bundle, parse_fenced_blocks, render_code_bundle
+from .local_validator import STATIC_TIERS, LocalValidator, complexity_metrics
 from autonomous_app_writer import config
 
 class BaseCodingAgent(BaseS1Agent):
@@ -10,37 +19,61 @@ class BaseCodingAgent(BaseS1Agent):
     An abstract base class for agents that write code.
     Provides a common structure for code generation, self-critique, and testing.
     """
+    # Extension of a single-file answer; only ".py" files go through local validation.
+    output_extension = ".py"
+
     def __init__(self, agent_name):
         super().__init__(agent_name)
+        self.validator = LocalValidator(tool_interface=self.tool_interface)
+        # Self-critique rounds run versus the one round per task every task used to get.
+        self.critique_stats = Counter()
 
     def execute_task(self, task_details, project_state):
         """
         Main entry point for a coding task.
 
+        The LLM may deliver several files at once as fenced code blocks tagged
+        with their paths (see code_bundle.py); the code is handled as a bundle
+        {path: content} throughout.
+
         Args:
             task_details (dict): The specific coding task (e.g., "Implement login API endpoint").
+                An optional 'filename' names the file of a single-file answer.
             project_state (dict): The overall project state.
 
         Returns:
-            dict: A result dictionary with status and the generated code artifact.
+            dict: A result dictionary with status and the generated code artifact:
+            {'code', 'filename'} for a single file, {'files': {path: content}} for several.
         """
         self.logger.info(f"Executing coding task: {task_details.get('description')}")
 
-        # 1. Generate Code
-        generated_code = self._generate_code(task_details, project_state)
-        if not generated_code:
+        filename = self._default_filename(task_details)
+
+        # 1. Generate Code (best of CODE_CANDIDATES concurrent candidates)
+        files = self._generate_best_candidate(task_details, project_state, filename)
+        if not files:
             return self._create_task_result("FAILURE", error_message="Code generation failed.")
 
-        # 2. Self-Critique and Refine (could be a loop)
-        refined_code = self._self_critique_and_refine(generated_code, task_details, project_state)
-        if not refined_code:
+        # 2. Self-Critique and Refine, as many rounds as the code needs (possibly none)
+        files = self._self_critique_and_refine(files, task_details, project_state)
+        if not files:
             return self._create_task_result("FAILURE", error_message="Code refinement failed.")
 
-        # 3. Run Local Tests (e.g., linting, unit tests)
-        tests_passed = self._run_local_tests(refined_code, task_details)
-        if not tests_passed:
-            # In a more complex system, this could trigger a debugging loop.
-            return self._create_task_result("FAILURE", error_message="Local tests failed.")
+        # 3. Run Local Tests, cheapest first; a failure gets a quick targeted repair
+        # rather than a full rework cycle through S3.
+        validation = self._run_local_tests(files, task_details, project_state)
+        repairs = 0
+        while not validation["passed"] and repairs < config.LOCAL_VALIDATION_MAX_REPAIRS:
+            repairs += 1
+            self.logger.info(f"Local validation failed at '{validation['failed_tier']}'; repair attempt {repairs}.")
+            repaired = self._revise(files, self._repair_code(files, validation, task_details), validation["path"])
+            if not repaired:
+                break
+            files = repaired
+            validation = self._run_local_tests(files, task_details, project_state)
+        if not validation["passed"]:
+            return self._create_task_result(
+                "FAILURE", error_message=f"Local tests failed ({validation['failed_tier']}): {validation['error']}")
 
         self.logger.info("Coding task completed successfully.")
         
@@ -54,21 +87,172 @@ class BaseCodingAgent(BaseS1Agent):
             }
             vcs_agent.execute_task(commit_task, project_state)
 
-        return self._create_task_result("SUCCESS", artifact={"code": refined_code, "task": task_details, "filename": f"{self.agent_name.lower()}_output.py"})
+        # The task itself is already tracked by S3, so it is not echoed back in the artifact.
+        if len(files) == 1:
+            (path, code), = files.items()
+            return self._create_task_result("SUCCESS", artifact={"code": code, "filename": path})
+        return self._create_task_result("SUCCESS", artifact={"files": files})
+
+    def _default_filename(self, task_details):
+        """
+        Names the file of a single-file answer: the task's 'filename', or one
+        derived from the task description, so different tasks don't overwrite
+        each other's output while a rework of the same task replaces it.
+        """
+        if task_details.get("filename"):
+            return task_details["filename"]
+        slug = re.sub(r"\W+", "_", (task_details.get("description") or "").lower()).strip("_")
+        slug = slug[:48].rstrip("_") or self.agent_name.lower()
+        if slug[0].isdigit():
+            slug = f"{self.agent_name.lower()}_{slug}"
+        return f"{slug}{self.output_extension}"
 
-    def _generate_code(self, task_details, project_state):
+    @staticmethod
+    def _revise(files, response, default_path):
+        """
+        Merges an LLM revision into a bundle.
+
+        Files the response names replace or extend the bundle; an unnamed code
+        block replaces `default_path`. Returns None if the response holds no code.
+        """
+        if default_path:
+            revised = parse_code_bundle(response, default_path)
+        else:
+            revised = {path: content for path, content in parse_fenced_blocks(response) if path and content.strip()}
+        return {**files, **revised} if revised else None
+
+    def _generate_code(self, task_details, project_state, temperature=0.7):
         """
         Generates the initial block of code. To be implemented by subclasses.
         """
         raise NotImplementedError("Subclasses must implement _generate_code")
 
-    def _self_critique_and_refine(self, code, task_details, project_state):
+    def _generate_best_candidate(self, task_details, project_state, filename):
+        """
+        Generates config.CODE_CANDIDATES candidates concurrently and returns the first good one.
+
+        Each candidate is generated at its own temperature from
+        CODE_CANDIDATE_TEMPERATURES and validated with the CODE_CANDIDATE_TIERS
+        as soon as it arrives. The first candidate to pass is accepted and the
+        candidates not yet started are cancelled; calls already in flight are
+        abandoned, not waited for, and skip their validation. If none passes, the candidate that got
+        through the most tiers is returned for refinement.
+
+        Returns:
+            dict: The chosen candidate bundle, or None if no candidate held code.
+        """
+        count = max(1, config.CODE_CANDIDATES)
+        if count == 1:
+            return parse_code_bundle(self._generate_code(task_details, project_state), filename)
+
+        temperatures = config.CODE_CANDIDATE_TEMPERATURES
+        tiers = config.CODE_CANDIDATE_TIERS
+        executor = ThreadPoolExecutor(max_workers=count, thread_name_prefix=f"{self.agent_name}-candidate")
+        finished = threading.Event()  # set once a candidate is chosen
+        futures = {
+            executor.submit(self._generate_candidate, task_details, project_state, filename,
+                            temperatures[i % len(temperatures)], tiers, finished): i
+            for i in range(count)
+        }
+        best, best_progress = None, -1
+        try:
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        files, validation = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Candidate {futures[future]} failed: {e}")
+                        continue
+                    if not files:
+                        continue
+                    if validation["passed"]:
+                        self.logger.info(f"Accepted candidate {futures[future]} of {count}.")
+                        return files
+                    progress = tiers.index(validation["failed_tier"]) if validation["failed_tier"] in tiers else 0
+                    if progress > best_progress:
+                        best, best_progress = files, progress
+        finally:
+            finished.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.logger.info(f"No candidate of {count} passed validation; refining the best one.")
+        return best
+
+    def _generate_candidate(self, task_details, project_state, filename, temperature, tiers, finished):
         """
-        Uses an LLM to critique and refine the generated code.
+        Generates and validates one candidate. Runs on a candidate thread.
+
+        A candidate that arrives after `finished` is set is not validated, so
+        abandoned candidates don't take quick-test runs from live work.
+        """
+        files = parse_code_bundle(self._generate_code(task_details, project_state, temperature=temperature), filename)
+        if not files or finished.is_set():
+            return None, None
+        return files, self._run_local_tests(files, task_details, project_state, tiers=tiers)
+
+    def _self_critique_and_refine(self, files, task_details, project_state):
+        """
+        Uses an LLM to critique and refine the generated code, adapting the number of rounds.
+
+        Simple code that passes the static validation tiers is not reviewed at
+        all. Complex or unchecked code gets one review. Code that fails static validation is
+        reviewed, with the failure, until it passes, the refinements converge
+        (successive versions nearly identical) or SELF_CRITIQUE_MAX_ROUNDS is
+        reached. Rounds run versus the former one round per task are counted
+        in self.critique_stats.
+        """
+        start = time.monotonic()
+        validation = self._run_local_tests(files, task_details, project_state, tiers=STATIC_TIERS)
+        metrics = [complexity_metrics(code, path) for path, code in files.items()]
+        lines = sum(m["lines"] for m in metrics)
+        branches = sum(m["branches"] or 0 for m in metrics)
+        simple = lines <= config.SELF_CRITIQUE_SIMPLE_MAX_LINES and branches <= config.SELF_CRITIQUE_SIMPLE_MAX_BRANCHES
+        # Output no tier could check (e.g. not Python) keeps its single review.
+        checked = len(validation["skipped"]) < len(STATIC_TIERS)
+        if not validation["passed"]:
+            max_rounds = config.SELF_CRITIQUE_MAX_ROUNDS
+        else:
+            max_rounds = 0 if simple and checked else 1
+
+        rounds = 0
+        while rounds < max_rounds:
+            rounds += 1
+            response = self._critique(files, task_details, project_state, validation)
+            refined = self._revise(files, response, next(iter(files)) if len(files) == 1 else None)
+            if not refined:
+                return None
+            similarity = difflib.SequenceMatcher(None, render_code_bundle(files), render_code_bundle(refined),
+                                                 autojunk=False).ratio()
+            files = refined
+            if similarity >= config.SELF_CRITIQUE_CONVERGENCE_RATIO:
+                self.critique_stats["converged"] += 1
+                break
+            if not validation["passed"]:
+                validation = self._run_local_tests(files, task_details, project_state, tiers=STATIC_TIERS)
+                if validation["passed"]:
+                    break
+
+        self.critique_stats["tasks"] += 1
+        self.critique_stats["rounds"] += rounds
+        self.critique_stats["skipped"] += rounds == 0
+        self.critique_stats["rounds_saved"] += 1 - rounds
+        self.logger.info(f"Self-critique: {rounds} round(s) in {time.monotonic() - start:.1f}s "
+                         f"(files={len(files)}, lines={lines}, branches={branches}, "
+                         f"static validation {'passed' if validation['passed'] else 'failed'}); "
+                         f"{self.critique_stats['rounds_saved']} round(s) saved so far.")
+        return files
+
+    def _critique(self, files, task_details, project_state, validation):
+        """
+        Makes one self-critique round trip, including the static validation failure if there is one.
         """
         self.logger.debug("Performing self-critique on generated code.")
         context = self.get_relevant_context(project_state)
-        
+        failure = ""
+        if not validation["passed"]:
+            failure = f"The code currently fails this check ({validation['failed_tier']}):\n{validation['error']}\n"
+
         prompt = f"""
         You are a code reviewer. Critique the following code based on the task requirements,
         architectural design, and coding best practices from the agent's policies.
@@ -77,31 +261,62 @@ class BaseCodingAgent(BaseS1Agent):
         Architecture: {context.get('architecture')}
         Policies: {context.get('policies')['development_philosophy']}
         
+        {failure}
         Code to review:
-        ```
-        {code}
-        ```
+        {render_code_bundle(files)}
 
         Provide feedback and the refined code. If the code is good, return it as is.
-        Your output should be only the refined code block.
+        Your output should be only the refined code blocks, each opened with its file path (```path).
         """
         
         refined_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_FAST_MODEL)
         return refined_code
 
-    def _run_local_tests(self, code, task_details):
+    def _run_local_tests(self, files, task_details, project_state, tiers=None):
         """
-        Runs local tests like linters or unit tests.
-        This is a placeholder for more specific testing logic.
+        Runs the tiered local validation (syntax, imports, lint, quick tests) on each file of a bundle.
+
+        Task details may carry 'quick_tests': Python code run against the
+        bundle's first Python module. Pass `tiers` to run only some of the tiers.
+
+        Returns:
+            dict: The LocalValidator result of the first failing file, with its
+            'path' and the error prefixed by it; 'skipped' lists the tiers that
+            could not run for any file.
         """
         self.logger.debug("Running local tests on the code.")
-        # In a real implementation, you would save the code to a temporary file
-        # and then run a tool like a linter.
-        # For example:
-        # with open("temp_file.py", "w") as f:
-        #     f.write(code)
-        # result = self.tool_interface.run_linter("temp_file.py")
-        # return result['return_code'] == 0
-        
-        # Placeholder returns True
-        return True
+        project_id = project_state.get("project_id")
+        project_dir = os.path.join(config.PROJECTS_DIR, project_id) if project_id else None
+        first_module = next((path for path in files if path.endswith(".py")), None)
+        timings, skipped = Counter(), None
+        for path, code in files.items():
+            quick_tests = task_details.get("quick_tests") if path == first_module else None
+            result = self.validator.validate(code, path, project_dir, quick_tests=quick_tests, tiers=tiers,
+                                             bundle=files)
+            timings.update(result["timings"])
+            skipped = set(result["skipped"]) if skipped is None else skipped & set(result["skipped"])
+            if not result["passed"]:
+                error = result["error"] if len(files) == 1 else f"{path}: {result['error']}"
+                return {**result, "path": path, "error": error, "timings": dict(timings)}
+        return {"passed": True, "failed_tier": None, "error": None, "path": None,
+                "timings": dict(timings), "skipped": sorted(skipped or ())}
+
+    def _repair_code(self, files, validation, task_details):
+        """
+        Asks the fast model to fix one specific local validation failure.
+        """
+        prompt = f"""
+        The file {validation['path']} failed a local check ({validation['failed_tier']}).
+        Fix only what is needed to resolve the error, keeping everything else unchanged.
+
+        Task: {task_details.get('description')}
+
+        Error:
+        {validation['error']}
+
+        Code:
+        {render_code_bundle(files)}
+
+        Your output should be only the corrected code blocks, each opened with its file path (```path).
+        """
+        return self.llm_service.generate_text(prompt, model=config.DEFAULT_FAST_MODEL)
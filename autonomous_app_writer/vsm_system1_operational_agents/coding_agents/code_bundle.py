@@ -0,0 +1,132 @@
+"""
+Multi-file code bundles parsed from LLM output.
+
+A coding agent may answer with several fenced code blocks, each naming the
+file it belongs to, so that one LLM call can deliver a whole module. The path
+is taken from the first of:
+
+    ```python app/models.py             (info string, also path=/file=/title=)
+    **app/models.py** / File: app/models.py / ### app/models.py   (line before the fence)
+    # app/models.py                     (first line of the block, as a comment)
+
+A bundle is a dictionary {relative path: content}, in the order the files
+appeared. Output without any named block is a single file under a default name.
+Blocks naming a path outside the project, and blocks without code, are dropped.
+"""
+
+import posixpath
+import re
+from autonomous_app_writer.core.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+_FENCE_OPEN_RE = re.compile(r"^\s*(`{3,}|~{3,})\s*(.*?)\s*$")
+_PATH_RE = re.compile(r"^(?:[\w.\-]+/)*[\w\-][\w.\-]*\.[A-Za-z0-9]+$")
+_LABEL_RE = re.compile(r"^[#>*`\s]*(?:(?:file(?:name)?|path)\s*:\s*)?[*`]*(?P<path>[^*`\s]+?)[*`:\s]*$",
+                       re.IGNORECASE)
+_COMMENT_RE = re.compile(r"^\s*(?:#|//|--|/\*|<!--)\s*(?:(?:file(?:name)?|path)\s*:\s*)?(?P<path>\S+?)\s*(?:\*/|-->)?\s*$",
+                         re.IGNORECASE)
+_INFO_KEYS = ("path", "file", "filename", "title")
+
+def normalize_bundle_path(path):
+    """
+    Returns a clean relative POSIX path, or None if `path` is absolute or leaves the project.
+    """
+    if not path:
+        return None
+    path = path.strip().strip("'\"").replace("\\", "/")
+    if path.startswith("/") or re.match(r"^[A-Za-z]:", path):
+        return None
+    path = posixpath.normpath(path)
+    if path in (".", "") or path == ".." or path.startswith("../"):
+        return None
+    return path
+
+def _looks_like_path(text):
+    return bool(text) and bool(_PATH_RE.match(text))
+
+def _path_from_info(info):
+    """Finds a file path in a fence's info string, e.g. 'python app/models.py' or 'py path=app.py'."""
+    for token in info.split():
+        key, sep, value = token.partition("=")
+        if sep and key.lower() in _INFO_KEYS:
+            return value.strip("'\"")
+        if _looks_like_path(token):
+            return token
+    return None
+
+def _path_from_label(line):
+    match = _LABEL_RE.match(line or "")
+    if match and _looks_like_path(match.group("path")):
+        return match.group("path")
+    return None
+
+def _path_from_comment(line):
+    match = _COMMENT_RE.match(line or "")
+    if match and _looks_like_path(match.group("path")):
+        return match.group("path")
+    return None
+
+def parse_fenced_blocks(text):
+    """
+    Returns [(path or None, content)] for every fenced code block in `text`.
+
+    A block naming a path that is absolute or leaves the project is left out.
+    """
+    return [(path, content) for raw_path, path, content in _scan_blocks(text) if path or not raw_path]
+
+def _scan_blocks(text):
+    """Returns [(path as written or None, normalized path or None, content)] for every fenced block."""
+    blocks = []
+    lines = (text or "").splitlines()
+    previous = None  # last non-blank line outside a block
+    i = 0
+    while i < len(lines):
+        match = _FENCE_OPEN_RE.match(lines[i])
+        if not match:
+            if lines[i].strip():
+                previous = lines[i]
+            i += 1
+            continue
+        fence, info = match.groups()
+        body, i = [], i + 1
+        while i < len(lines) and not (lines[i].strip().startswith(fence[0] * len(fence))
+                                      and not lines[i].strip().strip(fence[0])):
+            body.append(lines[i])
+            i += 1
+        i += 1  # the closing fence
+        path = _path_from_info(info) or _path_from_label(previous) or (_path_from_comment(body[0]) if body else None)
+        normalized = normalize_bundle_path(path) if path else None
+        if path and normalized is None:
+            logger.warning(f"Dropping a code block for a path outside the project: {path}")
+        blocks.append((path, normalized, "\n".join(body) + "\n"))
+        previous = None
+    return blocks
+
+def parse_code_bundle(text, default_filename):
+    """
+    Parses an LLM response into a bundle.
+
+    If any fenced block names a file, every named block becomes a file (the
+    last one wins for a repeated path) and unnamed blocks are dropped.
+    Otherwise the response is a single file under `default_filename`: the
+    first unnamed fenced block, or the whole text if there is no fenced block.
+    Blocks for paths outside the project and blank blocks never become files.
+
+    Returns:
+        dict: {relative path: content}; empty if the response holds no code.
+    """
+    if not text or not text.strip():
+        return {}
+    blocks = _scan_blocks(text)
+    named = {path: content for _, path, content in blocks if path and content.strip()}
+    if named:
+        return named
+    if blocks:
+        unnamed = [content for raw_path, _, content in blocks if not raw_path and content.strip()]
+        return {default_filename: unnamed[0]} if unnamed else {}
+    return {default_filename: text.strip("\n") + "\n"}
+
+def render_code_bundle(files):
+    """Renders a bundle back into fenced blocks tagged with their paths, for prompts."""
+    return "\n".join(f"```{path}\n{content.rstrip()}\n```\n" for path, content in files.items())
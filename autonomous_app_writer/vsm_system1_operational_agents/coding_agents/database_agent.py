@@ -9,10 +9,12 @@ class DatabaseAgent(BaseCodingAgent):
     """
     Designs database schemas and generates/manages database migration scripts.
     """
+    output_extension = ".sql"
+
     def __init__(self):
         super().__init__("DatabaseAgent")
 
-    def _generate_code(self, task_details, project_state):
+    def _generate_code(self, task_details, project_state, temperature=0.7):
         """
         Generates a database schema or migration script.
         """
@@ -33,9 +35,10 @@ class DatabaseAgent(BaseCodingAgent):
 
         Based on the context, generate the appropriate SQL DDL, schema definition, or migration script.
         Your output should be only the code block.
+        If the feature needs several files, give each its own code block opened with its path (e.g. ```app/models.py).
         """
         
-        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL)
+        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL, temperature=temperature)
         return generated_code
 
 # Example of how to instantiate and use the agent
@@ -10,10 +10,12 @@ class FrontendCoderAgent(BaseCodingAgent):
     Takes UI/UX designs, architectural specs, and API contracts
     to write frontend code (e.g., HTML, CSS, JavaScript, React).
     """
+    output_extension = ".html"
+
     def __init__(self):
         super().__init__("FrontendCoderAgent")
 
-    def _generate_code(self, task_details, project_state):
+    def _generate_code(self, task_details, project_state, temperature=0.7):
         """
         Generates the initial block of frontend code.
         """
@@ -33,11 +35,12 @@ class FrontendCoderAgent(BaseCodingAgent):
 
         Based on the context, write the code for the specified frontend component or feature.
         Your output should be only the code block for the specified file/component.
+        If the feature needs several files, give each its own code block opened with its path (e.g. ```app/models.py).
         """
         
         # This is a simplified generation step. A real system would be more specific
         # about file names, dependencies, etc.
-        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL)
+        generated_code = self.llm_service.generate_text(prompt, model=config.DEFAULT_MAIN_MODEL, temperature=temperature)
         return generated_code
 
 # Example of how to instantiate and use the agent
@@ -0,0 +1,377 @@
+"""
+Tiered local validation of generated code.
+
+Checks run cheapest first and stop at the first failure, so a coding agent
+learns about a syntax error in microseconds instead of after unit-test
+generation and an S3* audit:
+
+1. syntax       - ast.parse/compile in-process.
+2. imports      - relative imports and imports of the project's own packages
+                  must resolve against the project tree.
+3. lint         - the cached, error-only linter run (ToolInterface.lint_files).
+4. quick_tests  - the module is executed, plus optional quick test code, in a
+                  sandbox (ToolInterface.run_sandboxed): a private copy of the
+                  project's Python files, resource limits and no network.
+
+Only Python sources are validated. Tiers whose tool is unavailable (e.g. the
+linter is not installed, or the code needs a third-party package that is not
+installed here) are skipped rather than failed.
+"""
+
+import ast
+import os
+import re
+import secrets
+import shlex
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from autonomous_app_writer import config
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.tool_interface import get_tool_interface
+
+logger = get_logger(__name__)
+
+TIERS = ("syntax", "imports", "lint", "quick_tests")
+STATIC_TIERS = ("syntax", "imports", "lint")  # The tiers that don't run the code
+
+# Nodes that add a decision point, for complexity_metrics().
+_BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.With,
+                 ast.AsyncWith, ast.BoolOp, ast.comprehension, ast.Assert)
+
+_FENCE_RE = re.compile(r"^```[^\n]*\n(.*?)^```", re.MULTILINE | re.DOTALL)
+
+# Lines of a quick-test traceback fed back for repair; the top frames are the harness.
+_ERROR_LINES = 12
+
+# Marker for a tier that could not run.
+_SKIPPED = object()
+
+# Exit code of the quick-test harness when the module needs a package that is
+# not installed. The harness also prints a per-run sentinel line to stderr, so a
+# module that exits with the same code itself is not mistaken for it.
+_MISSING_DEPENDENCY_EXIT = 3
+
+# File name of the quick-test harness in the sandbox.
+_HARNESS_FILENAME = "__local_validation__.py"
+
+# Runs the module as part of its package, so relative imports work. It runs
+# in the sandbox directory, which holds the project's Python files with the
+# new versions written over them.
+_QUICK_TEST_HARNESS = """
+import os, runpy, sys
+sys.path[:0] = [os.path.abspath(path) for path in {search_path!r}]
+try:
+    module = {module_name!r}
+    if module:
+        namespace = runpy.run_module(module, run_name="__local_validation__")
+    else:
+        namespace = runpy.run_path({module_path!r}, run_name="__local_validation__")
+except ModuleNotFoundError as e:
+    if e.name and e.name.split(".")[0] not in {local_names!r}:
+        print(f"{sentinel} missing dependency: {{e.name}}", file=sys.stderr)
+        sys.exit({missing_exit})
+    raise
+quick_tests = {quick_tests!r}
+if quick_tests:
+    exec(compile(quick_tests, "<quick_tests>", "exec"), namespace)
+"""
+
+def strip_code_fences(text):
+    """
+    Returns the code from an LLM response.
+
+    If the response contains a fenced block (```python ... ```), the first
+    block's content is returned; otherwise the text itself.
+    """
+    if text is None:
+        return None
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text.strip("\n") + "\n"
+
+def complexity_metrics(code, filename):
+    """
+    Returns rough complexity metrics of a source file.
+
+    Returns:
+        dict: 'lines' (non-blank lines), and for parseable Python 'branches'
+        (decision points, as counted for cyclomatic complexity) and 'functions';
+        these are None otherwise.
+    """
+    metrics = {"lines": sum(1 for line in code.splitlines() if line.strip()), "branches": None, "functions": None}
+    if filename.endswith(".py"):
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return metrics
+        nodes = list(ast.walk(tree))
+        metrics["branches"] = sum(isinstance(node, _BRANCH_NODES) for node in nodes)
+        metrics["functions"] = sum(isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda))
+                                   for node in nodes)
+    return metrics
+
+def _result(passed, tier=None, error=None, timings=None, skipped=None):
+    return {
+        "passed": passed,
+        "failed_tier": tier,
+        "error": error,
+        "timings": timings or {},
+        "skipped": skipped or [],
+    }
+
+class LocalValidator:
+    """
+    Runs the validation tiers over one generated source file.
+    """
+    def __init__(self, tiers=config.LOCAL_VALIDATION_TIERS, linter_command=config.LOCAL_VALIDATION_LINTER,
+                 limits=config.LOCAL_VALIDATION_LIMITS, tool_interface=None):
+        self.tiers = [tier for tier in TIERS if tier in tiers]
+        self.linter_command = linter_command
+        self.limits = limits
+        self.tool_interface = tool_interface or get_tool_interface()
+
+    def validate(self, code, filename, project_dir=None, quick_tests=None, tiers=None, bundle=None):
+        """
+        Validates generated code, stopping at the first failing tier.
+
+        Args:
+            code (str): The source code (without markdown fences).
+            filename (str): The file's path relative to the project root.
+            project_dir (str, optional): The project root the code will live in.
+            quick_tests (str, optional): Python code run after the module, in
+                its namespace; an exception or a failed assert fails the tier.
+            tiers (list, optional): Restrict this run to these tiers.
+            bundle (dict, optional): {path: content} of the files generated
+                together with this one; imports of them resolve, and they are
+                present when the module runs.
+
+        Returns:
+            dict: 'passed', 'failed_tier', 'error' (feedback for a repair
+            prompt), 'timings' ({tier: seconds}) and 'skipped' (tier names).
+        """
+        if not filename.endswith(".py"):
+            return _result(True, skipped=list(self.tiers))
+        timings, skipped = {}, []
+        tree = None
+        for tier in self.tiers:
+            if tiers is not None and tier not in tiers:
+                continue
+            start = time.perf_counter()
+            if tier == "syntax":
+                error, tree = self._check_syntax(code, filename)
+            elif tier == "imports":
+                error = self._check_imports(tree or ast.parse(code), filename, project_dir, bundle)
+            elif tier == "lint":
+                error = self._lint(code, filename)
+            else:
+                error = self._run_quick_tests(code, filename, project_dir, quick_tests, bundle)
+            timings[tier] = time.perf_counter() - start
+            if error is _SKIPPED:
+                skipped.append(tier)
+            elif error:
+                logger.info(f"Local validation of {filename} failed at tier '{tier}'.")
+                return _result(False, tier, error, timings, skipped)
+        return _result(True, timings=timings, skipped=skipped)
+
+    # --- Tiers ---
+
+    @staticmethod
+    def _check_syntax(code, filename):
+        try:
+            tree = ast.parse(code, filename)
+            compile(tree, filename, "exec", dont_inherit=True)
+        except SyntaxError as e:
+            return f"SyntaxError at line {e.lineno}: {e.msg}\n{(e.text or '').rstrip()}", None
+        except ValueError as e:  # e.g. null bytes
+            return f"Invalid source: {e}", None
+        return None, tree
+
+    def _check_imports(self, tree, filename, project_dir, bundle=None):
+        if not project_dir and not bundle:
+            return _SKIPPED
+        tree_view = _ProjectView(project_dir, bundle, filename)
+        local_names = tree_view.top_level_names()
+        package_parts = os.path.dirname(filename).replace(os.sep, "/").split("/")
+        package_parts = [part for part in package_parts if part]
+        unresolved = []
+        for node in _guarded_imports(tree):
+            if isinstance(node, ast.ImportFrom) and node.level:
+                # Relative imports always refer to the project.
+                if node.level - 1 > len(package_parts):
+                    unresolved.append((node.lineno, "." * node.level + (node.module or "")))
+                    continue
+                base = package_parts[:len(package_parts) - (node.level - 1)]
+                if node.module:
+                    modules = [".".join(base + [node.module])]
+                elif base and tree_view.is_package(base):
+                    modules = []  # from . import name: may be defined in the package's __init__
+                else:
+                    modules = [".".join(base + [alias.name]) for alias in node.names]
+                unresolved += [(node.lineno, m) for m in modules if not tree_view.module_exists(m)]
+                continue
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module]
+            # Anything else is the standard library or a third-party package of the
+            # generated app, which need not be installed here.
+            unresolved += [(node.lineno, m) for m in modules
+                           if m.split(".")[0] in local_names and not tree_view.module_exists(m)]
+        if not unresolved:
+            return None
+        return "Unresolved imports (no such module in the project):\n" + "\n".join(
+            f"line {lineno}: {module}" for lineno, module in unresolved)
+
+    def _lint(self, code, filename):
+        if not self.linter_command or not shutil.which(shlex.split(self.linter_command)[0]):
+            return _SKIPPED
+        work_dir = tempfile.mkdtemp(prefix="validate-")
+        try:
+            path = os.path.join(work_dir, os.path.basename(filename))
+            with open(path, 'w') as f:
+                f.write(code)
+            result = self.tool_interface.lint_files([os.path.basename(filename)], self.linter_command,
+                                                    cwd=work_dir)[os.path.basename(filename)]
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if "error" in result:
+            logger.debug(f"Linter unavailable, skipping lint tier: {result['error'][:200]}")
+            return _SKIPPED
+        if result["return_code"] == 0:
+            return None
+        base = os.path.basename(filename)
+        return "Linter errors:\n" + "\n".join(filename + message[len(base):] for message in result["messages"])
+
+    def _run_quick_tests(self, code, filename, project_dir, quick_tests, bundle=None):
+        # The generated code never sees the real project tree: it gets a copy
+        # of the project's Python sources with the new files written over them.
+        files = {**_project_sources(project_dir), **(bundle or {}), filename: code}
+        module_name = _dotted_name(filename)
+        search_path = ["."] if module_name else [os.path.dirname(filename) or ".", "."]
+        local_names = _ProjectView(project_dir, bundle, filename).top_level_names()
+        sentinel = f"[local-validation:{secrets.token_hex(8)}]"
+        harness = _QUICK_TEST_HARNESS.format(
+            search_path=search_path, module_name=module_name, module_path=filename,
+            local_names=sorted(local_names), quick_tests=quick_tests or "", missing_exit=_MISSING_DEPENDENCY_EXIT,
+            sentinel=sentinel,
+        )
+        files[_HARNESS_FILENAME] = harness
+        result = self.tool_interface.run_sandboxed(
+            [sys.executable, _HARNESS_FILENAME], files=files, limits=self.limits,
+            timeout=self.limits.get("wall_seconds") or config.TOOL_DEFAULT_TIMEOUT,
+        )
+        if result["return_code"] == 0:
+            return None
+        stderr_lines = result["stderr"].strip().splitlines()
+        if (result["return_code"] == _MISSING_DEPENDENCY_EXIT and stderr_lines
+                and stderr_lines[-1].startswith(sentinel + " ")):
+            logger.debug(f"Skipping quick tests of {filename}: {stderr_lines[-1][len(sentinel) + 1:]}")
+            return _SKIPPED
+        if result["return_code"] == -1:
+            # _run reports a timeout as -1; deaths by signal are below -1.
+            return f"Quick tests timed out after {self.limits.get('wall_seconds')} seconds."
+        traceback_tail = "\n".join(result["stderr"].strip().splitlines()[-_ERROR_LINES:])
+        status = f"exit code {result['return_code']}"
+        if result["return_code"] < -1:
+            # Killed by a signal, e.g. SIGXCPU at the CPU limit or SIGKILL past the memory limit.
+            try:
+                status += f", {signal.Signals(-result['return_code']).name}"
+            except ValueError:
+                pass
+        return f"Running the module failed ({status}):\n{traceback_tail}"
+
+def _guarded_imports(tree):
+    """Yields import nodes, except those inside a try that handles ImportError (optional imports)."""
+    handled = ("ImportError", "ModuleNotFoundError", "Exception")
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Try):
+            names = {getattr(h.type, "id", None) for h in node.handlers}
+            names |= {getattr(elt, "id", None) for h in node.handlers if isinstance(h.type, ast.Tuple)
+                      for elt in h.type.elts}
+            if any(h.type is None for h in node.handlers) or names & set(handled):
+                stack.extend(node.handlers + node.orelse + node.finalbody)
+                continue
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        stack.extend(ast.iter_child_nodes(node))
+
+def _dotted_name(path):
+    """Returns the module name of a .py path relative to the project root, or None if it isn't importable."""
+    parts = os.path.splitext(path)[0].replace(os.sep, "/").split("/")
+    return ".".join(parts) if all(part.isidentifier() for part in parts) else None
+
+def _project_sources(project_dir):
+    """Returns {relative path: text} of the Python files under project_dir, skipping hidden directories."""
+    sources = {}
+    if not project_dir:
+        return sources
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for name in files:
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, 'r') as f:
+                    sources[os.path.relpath(path, project_dir).replace(os.sep, "/")] = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+    return sources
+
+class _ProjectView:
+    """
+    The project tree as it will be once a bundle is written: files on disk
+    under `project_dir` overlaid with the bundle's paths.
+    """
+    def __init__(self, project_dir, bundle, filename):
+        self.project_dir = project_dir
+        self.filename = filename
+        self.paths = {path.replace(os.sep, "/") for path in (bundle or {})} | {filename.replace(os.sep, "/")}
+        self.file_dir = os.path.dirname(self.filename.replace(os.sep, "/"))
+
+    def _roots(self):
+        """Directories imports are resolved from: the project root and the file's own directory."""
+        return ["", self.file_dir] if self.file_dir else [""]
+
+    def top_level_names(self):
+        """Module and package names importable from the roots."""
+        names = set()
+        for root in self._roots():
+            if self.project_dir:
+                directory = os.path.join(self.project_dir, root)
+                try:
+                    entries = os.listdir(directory)
+                except OSError:
+                    entries = []
+                for entry in entries:
+                    if entry.endswith(".py"):
+                        names.add(entry[:-3])
+                    elif entry.isidentifier() and os.path.isdir(os.path.join(directory, entry)):
+                        names.add(entry)
+            prefix = f"{root}/" if root else ""
+            for path in self.paths:
+                if path.startswith(prefix):
+                    first = path[len(prefix):].split("/")[0]
+                    names.add(first[:-3] if first.endswith(".py") else first)
+        return names
+
+    def is_package(self, parts):
+        """True if the dotted parts name a directory of the project or the bundle."""
+        rel = "/".join(parts)
+        if self.project_dir and os.path.isdir(os.path.join(self.project_dir, *parts)):
+            return True
+        return any(path.startswith(rel + "/") for path in self.paths)
+
+    def module_exists(self, module):
+        """True if a dotted module resolves to a module or package from one of the roots."""
+        parts = module.split(".")
+        for root in self._roots():
+            rel = "/".join(([root] if root else []) + parts)
+            if rel + ".py" in self.paths or any(path.startswith(rel + "/") for path in self.paths):
+                return True
+            if self.project_dir:
+                base = os.path.join(self.project_dir, *rel.split("/"))
+                if os.path.isfile(base + ".py") or os.path.isdir(base):
+                    return True
+        return False
@@ -0,0 +1,134 @@
+"""
+Lazy registry of VSM System 1 (S1) agents.
+
+Agents are declared by name together with the "module:Class" path that
+implements them. Nothing is imported until an agent is first requested,
+at which point its module is imported and the agent is instantiated
+(registering itself with the AgentState as before).
+
+Besides the built-in manifest, third-party packages can contribute agents
+through the "autonomous_app_writer.s1_agents" entry point group, e.g.:
+
+    [project.entry-points."autonomous_app_writer.s1_agents"]
+    SecurityReviewAgent = "my_package.security:SecurityReviewAgent"
+"""
+
+import importlib
+import threading
+from importlib import metadata
+from autonomous_app_writer.core.logging_setup import get_logger
+from autonomous_app_writer.core.agent_state import get_agent_state
+
+logger = get_logger(__name__)
+
+ENTRY_POINT_GROUP = "autonomous_app_writer.s1_agents"
+
+_PACKAGE = "autonomous_app_writer.vsm_system1_operational_agents"
+
+AGENT_MANIFEST = {
+    "RequirementsAgent": f"{_PACKAGE}.requirements_agent:RequirementsAgent",
+    "ArchitectureAgent": f"{_PACKAGE}.architecture_agent:ArchitectureAgent",
+    "UiUxAgent": f"{_PACKAGE}.ui_ux_agent:UiUxAgent",
+    "FrontendCoderAgent": f"{_PACKAGE}.coding_agents.frontend_coder_agent:FrontendCoderAgent",
+    "BackendCoderAgent": f"{_PACKAGE}.coding_agents.backend_coder_agent:BackendCoderAgent",
+    "DatabaseAgent": f"{_PACKAGE}.coding_agents.database_agent:DatabaseAgent",
+    "UnitTesterAgent": f"{_PACKAGE}.testing_agents.unit_tester_agent:UnitTesterAgent",
+    "IntegrationTesterAgent": f"{_PACKAGE}.testing_agents.integration_tester_agent:IntegrationTesterAgent",
+    "E2ETesterAgent": f"{_PACKAGE}.testing_agents.e2e_tester_agent:E2ETesterAgent",
+    "DeploymentAgent": f"{_PACKAGE}.deployment_agent:DeploymentAgent",
+    "DocumentationAgent": f"{_PACKAGE}.documentation_agent:DocumentationAgent",
+    "VersionControlAgent": f"{_PACKAGE}.version_control_agent:VersionControlAgent",
+}
+
+def load_object(spec):
+    """Imports and returns the object named by a "module:attribute" spec."""
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+class AgentRegistry:
+    """
+    Maps S1 agent names to their implementations and instantiates them on first use.
+    """
+    def __init__(self, manifest=None):
+        self._specs = dict(AGENT_MANIFEST if manifest is None else manifest)
+        self._entry_points_loaded = False
+        self._lock = threading.RLock()
+
+    def declare(self, agent_name, spec):
+        """
+        Declares an agent without importing it.
+
+        Args:
+            agent_name (str): The name tasks use to refer to the agent.
+            spec (str or callable): A "module:Class" path, or a class/factory.
+        """
+        with self._lock:
+            self._specs[agent_name] = spec
+
+    def names(self):
+        """Returns the names of all declared agents."""
+        self._load_entry_points()
+        return sorted(self._specs)
+
+    def is_declared(self, agent_name):
+        """Returns True if an agent with this name can be created."""
+        self._load_entry_points()
+        return agent_name in self._specs
+
+    def get_agent(self, agent_name):
+        """
+        Returns the agent instance, importing and creating it on first use.
+
+        Returns:
+            BaseS1Agent: The agent, or None if no such agent is declared.
+        """
+        agent_state = get_agent_state()
+        agent = agent_state.s1_capabilities.get(agent_name)
+        if agent is not None:
+            return agent
+
+        self._load_entry_points()
+        with self._lock:
+            agent = agent_state.s1_capabilities.get(agent_name)
+            if agent is not None:
+                return agent
+            spec = self._specs.get(agent_name)
+            if spec is None:
+                return None
+            factory = load_object(spec) if isinstance(spec, str) else spec
+            logger.info(f"Lazily instantiating S1 agent '{agent_name}'.")
+            agent = factory()
+            # Agents register themselves on construction; make sure factories
+            # that do not are still reachable under the declared name.
+            if agent_state.s1_capabilities.get(agent_name) is not agent:
+                agent_state.register_s1_capability(agent_name, agent)
+            return agent
+
+    def _load_entry_points(self):
+        """Adds agents declared by installed packages, once. Built-in names take precedence."""
+        if self._entry_points_loaded:
+            return
+        with self._lock:
+            if self._entry_points_loaded:
+                return
+            try:
+                for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+                    self._specs.setdefault(entry_point.name, entry_point.value)
+            except Exception as e:
+                logger.warning(f"Could not read S1 agent entry points: {e}")
+            self._entry_points_loaded = True
+
+# Singleton instance, created on first use
+_agent_registry = None
+_agent_registry_lock = threading.Lock()
+
+def get_agent_registry():
+    """
+    Returns the singleton AgentRegistry instance.
+    """
+    global _agent_registry
+    if _agent_registry is None:
+        with _agent_registry_lock:
+            if _agent_registry is None:
+                _agent_registry = AgentRegistry()
+    return _agent_registry
@@ -4,6 +4,8 @@ S1.UnitTextWriter Agent
 
 from .base_testing_agent import BaseTestingAgent
 from autonomous_app_writer import config
+from autonomous_app_writer.project_tracker.project_state_manager import is_artifact_handle, resolve_artifact_handle
+from autonomous_app_writer.project_tracker.symbol_index import get_code_context
 
 class UnitTesterAgent(BaseTestingAgent):
     """
@@ -17,7 +19,11 @@ class UnitTesterAgent(BaseTestingAgent):
         Generates unit test cases for a specific code artifact.
         """
         code_artifact = task_details.get("code_artifact", {})
-        code_to_test = code_artifact.get("code")
+        if is_artifact_handle(code_artifact):
+            # S3 passes a handle to the stored artifact rather than the code itself.
+            code_to_test = resolve_artifact_handle(code_artifact)
+        else:
+            code_to_test = code_artifact.get("code")
         
         if not code_to_test:
             self.logger.error("No code provided to generate unit tests for.")
@@ -25,6 +31,10 @@ class UnitTesterAgent(BaseTestingAgent):
 
         self.logger.debug(f"Generating unit tests for code: {code_to_test[:100]}...")
         context = self.get_relevant_context(project_state)
+        # Signatures of the project code the code under test uses, so tests can import and mock it.
+        code_context = ""
+        if config.ENABLE_SYMBOL_INDEX:
+            code_context = get_code_context(project_state, code_to_test, exclude=[code_artifact.get("artifact_ref")])
 
         prompt = f"""
         You are the S1.UnitTesterAgent. Your task is to write unit tests for a given
@@ -38,6 +48,8 @@ class UnitTesterAgent(BaseTestingAgent):
         Project Context:
         - Requirements: {context.get('requirements')}
         - Architecture: {context.get('architecture')}
+        - Project code it uses (signatures and snippets):
+        {code_context or 'None.'}
         - Testing Framework: (e.g., pytest for Python, Jest for JavaScript)
 
         Write a complete unit test suite for the provided code.
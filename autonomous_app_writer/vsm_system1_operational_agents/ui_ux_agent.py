@@ -30,7 +30,8 @@ class UiUxAgent(BaseS1Agent):
         if not structured_requirements:
             return self._create_task_result("FAILURE", error_message="Structured requirements not found.")
 
-        context = self.get_relevant_context(project_state)
+        # Bias knowledge retrieval towards the UX/UI trends category.
+        context = self.get_relevant_context(project_state, query=f"ux ui design {structured_requirements}")
 
         prompt = f"""
         You are the S1.UI/UXDesign Agent. Your task is to design the user interface
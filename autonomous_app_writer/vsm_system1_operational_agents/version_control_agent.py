@@ -41,8 +41,7 @@ class VersionControlAgent(BaseS1Agent):
     def _initialize_repo(self, project_path):
         """Initializes a new Git repository."""
         self.logger.info(f"Initializing Git repository at {project_path}")
-        command = f"cd {project_path} && git init"
-        result = self.tool_interface.execute_shell_command(command)
+        result = self.tool_interface.run_command(["git", "init"], cwd=project_path)
         if result['return_code'] == 0:
             return self._create_task_result("SUCCESS", artifact=result['stdout'])
         else:
@@ -53,16 +52,13 @@ class VersionControlAgent(BaseS1Agent):
         if not commit_message:
             return self._create_task_result("FAILURE", error_message="Commit message cannot be empty.")
         
-        files_str = " ".join(files_to_add)
         self.logger.info(f"Committing changes in {project_path} with message: '{commit_message}'")
         
-        add_command = f"cd {project_path} && git add {files_str}"
-        add_result = self.tool_interface.execute_shell_command(add_command)
+        add_result = self.tool_interface.run_command(["git", "add", "--", *files_to_add], cwd=project_path)
         if add_result['return_code'] != 0:
             return self._create_task_result("FAILURE", error_message=f"git add failed: {add_result['stderr']}")
 
-        commit_command = f"cd {project_path} && git commit -m \"{commit_message}\""
-        commit_result = self.tool_interface.execute_shell_command(commit_command)
+        commit_result = self.tool_interface.run_command(["git", "commit", "-m", commit_message], cwd=project_path)
         if commit_result['return_code'] == 0:
             return self._create_task_result("SUCCESS", artifact=commit_result['stdout'])
         else:
@@ -2,6 +2,7 @@
 VSM System 2: Coordination and Conflict Resolution.
 """
 
+import threading
 from autonomous_app_writer.core.logging_setup import get_logger
 from autonomous_app_writer.core.llm_services import get_llm_service
 
@@ -66,11 +67,17 @@ class CoordinatorService:
         logger.info(f"S2: Proposed resolution: {resolution}")
         return resolution
 
-# Singleton instance
-coordinator_service = CoordinatorService()
+# Singleton instance, created on first use
+_coordinator_service = None
+_coordinator_service_lock = threading.Lock()
 
 def get_coordinator_service():
     """
     Returns the singleton CoordinatorService instance.
     """
-    return coordinator_service
+    global _coordinator_service
+    if _coordinator_service is None:
+        with _coordinator_service_lock:
+            if _coordinator_service is None:
+                _coordinator_service = CoordinatorService()
+    return _coordinator_service
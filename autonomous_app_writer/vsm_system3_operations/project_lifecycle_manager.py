@@ -3,14 +3,51 @@ VSM System 3: Operational Management & Internal Regulation.
 Manages the "here and now" of the entire app development lifecycle.
 """
 
+import threading
 from typing import TypedDict, List
+from autonomous_app_writer import config
 from autonomous_app_writer.core.logging_setup import get_logger
 from autonomous_app_writer.core.langgraph_orchestrator import LangGraphOrchestrator
 from autonomous_app_writer.core.agent_state import get_agent_state
+from autonomous_app_writer.core.algedonic_manager import get_algedonic_manager
 from autonomous_app_writer.project_tracker.project_state_manager import ProjectStateManager
 
 logger = get_logger(__name__)
 
+# Interventions a PAIN signal can trigger, least to most disruptive.
+INTERVENTIONS = ("replan", "pause", "abort")
+
+# Lifecycle managers of the projects whose workflow is running, by project ID,
+# so operators and daemons can reach them (e.g. to resume a paused project).
+_active_projects = {}
+_active_projects_lock = threading.Lock()
+
+def get_active_project(project_id):
+    """Returns the ProjectLifecycleManager running a project, or None."""
+    with _active_projects_lock:
+        return _active_projects.get(project_id)
+
+def active_project_ids():
+    """Returns the IDs of the projects whose workflow is running."""
+    with _active_projects_lock:
+        return list(_active_projects)
+
+def pause_project(project_id, reason="operator"):
+    """Pauses a running project before its next workflow step. Returns False if it isn't running."""
+    manager = get_active_project(project_id)
+    if manager is None:
+        return False
+    manager.pause(reason)
+    return True
+
+def resume_project(project_id):
+    """Resumes a paused project. Returns False if it isn't running."""
+    manager = get_active_project(project_id)
+    if manager is None:
+        return False
+    manager.resume()
+    return True
+
 # Define the state for the S3 project management workflow
 class S3WorkflowState(TypedDict):
     project_manager: ProjectStateManager
@@ -27,6 +64,12 @@ class ProjectLifecycleManager:
     def __init__(self, user_request):
         self.agent_state = get_agent_state()
         self.project_manager = ProjectStateManager(user_request=user_request)
+        self.algedonic_manager = get_algedonic_manager()
+        self._pending_intervention = None  # (action, signal) raised by a PAIN signal
+        self._intervention_signal = None  # the signal behind the intervention being carried out
+        self._intervention_lock = threading.Lock()
+        self._resume_event = threading.Event()
+        self._signal_handler_id = None
         self.workflow = self._build_workflow()
         logger.info(f"S3 ProjectLifecycleManager initialized for project {self.project_manager.project_id}")
 
@@ -35,12 +78,12 @@ class ProjectLifecycleManager:
         orchestrator = LangGraphOrchestrator(S3WorkflowState)
 
         # Define nodes
-        orchestrator.add_node("start_project", self.start_project)
-        orchestrator.add_node("plan_and_design", self.plan_and_design)
-        orchestrator.add_node("decompose_into_tasks", self.decompose_into_tasks)
-        orchestrator.add_node("execute_task", self.execute_task)
-        orchestrator.add_node("evaluate_task_result", self.evaluate_task_result)
-        orchestrator.add_node("finalize_project", self.finalize_project)
+        orchestrator.add_node("start_project", self._step(self.start_project))
+        orchestrator.add_node("plan_and_design", self._step(self.plan_and_design))
+        orchestrator.add_node("decompose_into_tasks", self._step(self.decompose_into_tasks))
+        orchestrator.add_node("execute_task", self._step(self.execute_task))
+        orchestrator.add_node("evaluate_task_result", self._step(self.evaluate_task_result))
+        orchestrator.add_node("finalize_project", self._step(self.finalize_project))
 
         # Define edges
         orchestrator.set_entry_point("start_project")
@@ -57,16 +100,51 @@ class ProjectLifecycleManager:
                 "continue": "execute_task",
                 "rework": "execute_task", # Or a new "rework_task" node
                 "audit": "conduct_audit",
+                "replan": "replan_tasks",
+                "abort": "abort_project",
                 "end": "finalize_project"
             }
         )
         
-        # Audit loop
-        orchestrator.add_node("conduct_audit", self.conduct_audit)
-        orchestrator.add_edge("conduct_audit", "execute_task")
+        # Audit loop; audits raise PAIN signals, so act on them right away.
+        orchestrator.add_node("conduct_audit", self._step(self.conduct_audit))
+        orchestrator.add_conditional_edge(
+            "conduct_audit",
+            self.check_interventions,
+            {
+                "continue": "execute_task",
+                "replan": "replan_tasks",
+                "abort": "abort_project"
+            }
+        )
+
+        # Interventions triggered by PAIN signals
+        orchestrator.add_node("replan_tasks", self._step(self.replan_tasks))
+        orchestrator.add_conditional_edge(
+            "replan_tasks",
+            self.check_if_more_tasks,
+            {
+                "continue": "execute_task",
+                "end": "finalize_project"
+            }
+        )
+        orchestrator.add_node("abort_project", self._step(self.abort_project))
 
         return orchestrator.compile()
 
+    def _step(self, node):
+        """
+        Wraps a node so that a pending pause is honoured before it runs.
+
+        Replans and aborts change the route through the graph, so they are
+        still carried out at the next decision point.
+        """
+        def run_node(state):
+            self._wait_if_paused()
+            return node(state)
+        run_node.__name__ = node.__name__
+        return run_node
+
     # --- Workflow Node Functions ---
 
     def start_project(self, state):
@@ -156,17 +234,34 @@ class ProjectLifecycleManager:
         
         if result.get("status") == "SUCCESS":
             artifact = result.get("artifact")
-            if artifact and isinstance(artifact, dict) and "filename" in artifact and "content" in artifact:
-                pm.add_code_artifact(artifact["filename"], artifact["content"])
-                # After a successful coding task, we can add a testing task.
+            files = None
+            if artifact and isinstance(artifact, dict) and isinstance(artifact.get("files"), dict):
+                # A multi-file bundle: {path: content}.
+                files = artifact["files"]
+            elif artifact and isinstance(artifact, dict) and "filename" in artifact:
+                # Coding agents return their output under "code", others under "content".
+                content = artifact.get("content", artifact.get("code"))
+                if content is not None:
+                    files = {artifact["filename"]: content}
+            if files:
+                # Persist the content in one batch and keep only handles in the
+                # workflow state, so state copies between nodes stay small.
+                handles = pm.add_code_artifacts(files)
+                result = {**result, "artifact": handles[0] if len(handles) == 1 else {"files": handles}}
+                # After a successful coding task, we can add a testing task per file.
                 if "CoderAgent" in result.get("agent_name", ""):
-                     test_task = {"description": f"Write unit tests for {artifact['filename']}", "agent": "UnitTesterAgent", "code_artifact": artifact}
-                     state["task_list"].insert(0, test_task)
+                    for handle in reversed(handles):
+                        test_task = {"description": f"Write unit tests for {handle['artifact_ref']}", "agent": "UnitTesterAgent", "code_artifact": handle}
+                        state["task_list"].insert(0, test_task)
 
-        return state
+        return {**state, "current_task_result": result}
 
     def decide_next_step(self, state):
         logger.info("S3 Node: decide_next_step")
+        intervention = self._take_intervention()
+        if intervention:
+            return intervention
+
         if state["current_task_result"].get("status") != "SUCCESS":
             logger.error("Task failed. Adding rework task to the queue.")
             # Add a rework task to the front of the queue
@@ -200,6 +295,48 @@ class ProjectLifecycleManager:
         pm.update_state("audit_findings", pm.get_state().get("audit_findings", []) + [audit_findings])
         return state
 
+    def check_interventions(self, state):
+        return self._take_intervention() or "continue"
+
+    def replan_tasks(self, state):
+        logger.info("S3 Node: replan_tasks")
+        pm = state["project_manager"]
+        project_state = pm.get_state()
+        signal = self._intervention_signal or {}
+
+        prompt = f"""
+        You are a System 3 project manager. A problem was reported while the project was
+        being built, so the remaining plan must be revised.
+
+        Requirements: {project_state.get('structured_requirements')}
+        Architecture: {project_state.get('architecture_design')}
+        Completed tasks: {[t.get('description') for t in state['completed_tasks']]}
+        Remaining tasks: {state['task_list']}
+        Reported problem ({signal.get('category')}): {signal.get('details')}
+
+        Provide the revised JSON list of remaining tasks. Each task should be a dictionary with
+        'description' and 'agent' keys, and should address the reported problem where relevant.
+        """
+
+        llm_service = self.agent_state.get_s1_agent("RequirementsAgent").llm_service # Reuse an LLM service
+        try:
+            tasks = llm_service.parse_json_response(llm_service.generate_text(prompt))
+            logger.info(f"S3: Re-planned remaining work into {len(tasks)} tasks.")
+        except Exception as e:
+            logger.error(f"S3: Re-planning failed, keeping the current plan: {e}")
+            tasks = state["task_list"]
+        return {**state, "task_list": tasks}
+
+    def abort_project(self, state):
+        logger.info("S3 Node: abort_project")
+        pm = state["project_manager"]
+        signal = self._intervention_signal or {}
+        pm.update_state("status", "ABORTED")
+        pm.update_state("abort_reason", {"category": signal.get("category"), "severity": signal.get("severity"),
+                                         "details": signal.get("details")})
+        logger.error(f"Project {pm.project_id} aborted by PAIN signal '{signal.get('category')}'.")
+        return {**state, "final_result": pm.get_project_report()}
+
     def finalize_project(self, state):
         logger.info("S3 Node: finalize_project")
         pm = state["project_manager"]
@@ -224,12 +361,93 @@ class ProjectLifecycleManager:
             
         pm.update_state("status", "COMPLETED")
         logger.info(f"Project {pm.project_id} finalized successfully.")
+        final_report = pm.get_project_report()
+
+        # 3. Move the finished project into the archive tier. Otherwise the
+        # background archiver compacts it once it has aged.
+        if config.ENABLE_PROJECT_ARCHIVAL and config.ARCHIVE_ON_FINALIZE:
+            pm.archive_project()
         
-        return {**state, "final_result": pm.get_project_report()}
+        return {**state, "final_result": final_report}
 
     def check_if_more_tasks(self, state):
         return "continue" if state["task_list"] else "end"
 
+    # --- Algedonic Interventions ---
+
+    def on_algedonic_signal(self, signal):
+        """
+        Receives the PAIN/PLEASURE signals routed to this project's S3.
+
+        Called in the thread that raised the signal, so it only records the
+        intervention; the workflow carries it out at its next decision point.
+        """
+        if signal.get("type") != "PAIN":
+            return
+        severity = signal.get("severity", 0.0)
+        action = None
+        for candidate in INTERVENTIONS:
+            if severity >= config.S3_PAIN_THRESHOLDS.get(candidate, float("inf")):
+                action = candidate
+        if action is None:
+            return
+        with self._intervention_lock:
+            pending = self._pending_intervention
+            if pending is None or INTERVENTIONS.index(action) >= INTERVENTIONS.index(pending[0]):
+                self._pending_intervention = (action, signal)
+        if action == "pause":
+            self._resume_event.clear()
+        logger.warning(f"S3: PAIN signal '{signal.get('category')}' (severity {severity}) requests '{action}'.")
+
+    def pause(self, reason="operator"):
+        """Pauses the project before its next workflow step, until resume() is called."""
+        signal = {"type": "PAIN", "category": reason, "severity": None}
+        with self._intervention_lock:
+            pending = self._pending_intervention
+            if pending is None or INTERVENTIONS.index(pending[0]) < INTERVENTIONS.index("pause"):
+                self._pending_intervention = ("pause", signal)
+        self._resume_event.clear()
+        logger.warning(f"S3: Pause of project {self.project_manager.project_id} requested ({reason}).")
+
+    def resume(self):
+        """Resumes a paused project."""
+        self._resume_event.set()
+
+    def _wait_if_paused(self):
+        """Takes a pending pause, if any, and blocks until resume() or S3_PAUSE_TIMEOUT_SECONDS."""
+        with self._intervention_lock:
+            pending = self._pending_intervention
+            if pending is None or pending[0] != "pause":
+                return
+            self._pending_intervention = None
+        self._pause(pending[1])
+
+    def _pause(self, signal):
+        self._intervention_signal = signal
+        logger.warning(f"S3: Project {self.project_manager.project_id} paused by '{signal.get('category')}'.")
+        if not self._resume_event.wait(config.S3_PAUSE_TIMEOUT_SECONDS):
+            logger.warning("S3: Pause timed out; resuming the workflow.")
+        else:
+            logger.info(f"S3: Project {self.project_manager.project_id} resumed.")
+
+    def _take_intervention(self):
+        """
+        Returns "replan" or "abort" if a PAIN signal requested one, else None.
+
+        A pause blocks here (or before the next node, see _step) until
+        resume() is called or S3_PAUSE_TIMEOUT_SECONDS pass.
+        """
+        with self._intervention_lock:
+            pending, self._pending_intervention = self._pending_intervention, None
+        if pending is None:
+            return None
+        action, signal = pending
+        if action == "pause":
+            self._pause(signal)
+            return None
+        self._intervention_signal = signal
+        return action
+
     def run(self):
         """Executes the project lifecycle workflow."""
         logger.info(f"S3: Starting development lifecycle for project {self.project_manager.project_id}")
@@ -239,6 +457,17 @@ class ProjectLifecycleManager:
             "completed_tasks": [],
             "final_result": None
         }
-        final_state = self.workflow.invoke(initial_state)
+        project_id = self.project_manager.project_id
+        self._signal_handler_id = self.algedonic_manager.register_handler(
+            "S3", self.on_algedonic_signal, project_id=project_id
+        )
+        with _active_projects_lock:
+            _active_projects[project_id] = self
+        try:
+            final_state = self.workflow.invoke(initial_state)
+        finally:
+            with _active_projects_lock:
+                _active_projects.pop(project_id, None)
+            self.algedonic_manager.unregister_handler(self._signal_handler_id)
         logger.info(f"S3: Project lifecycle finished with state: {final_state}")
         return final_state
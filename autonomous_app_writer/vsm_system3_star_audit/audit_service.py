@@ -2,9 +2,11 @@
 VSM System 3*: Audit and Monitoring.
 """
 
+import threading
 from autonomous_app_writer.core.logging_setup import get_logger
 from autonomous_app_writer.core.llm_services import get_llm_service
 from autonomous_app_writer.core.algedonic_manager import get_algedonic_manager
+from autonomous_app_writer.project_tracker.artifact_reader import get_artifact_reader
 
 logger = get_logger(__name__)
 
@@ -16,6 +18,7 @@ class AuditService:
     def __init__(self):
         self.llm_service = get_llm_service()
         self.algedonic_manager = get_algedonic_manager()
+        self.artifact_reader = get_artifact_reader()
         logger.info("System 3* Audit Service initialized.")
 
     def conduct_audit(self, project_state):
@@ -28,7 +31,8 @@ class AuditService:
         Returns:
             dict: A dictionary containing the audit findings.
         """
-        logger.info(f"S3*: Conducting audit for project {project_state.get('id')}")
+        project_id = project_state.get('project_id')
+        logger.info(f"S3*: Conducting audit for project {project_id}")
         
         audit_findings = {
             "code_quality": self._audit_code_quality(project_state.get('code_artifacts')),
@@ -42,12 +46,21 @@ class AuditService:
                 self.algedonic_manager.handle_signal(
                     "PAIN",
                     f"Audit_Failure_{audit_type}",
-                    findings,
-                    ["S3", "S5"]
+                    {**findings, "project_id": project_id},
+                    ["S3", "S5"],
+                    severity=self._failure_severity(findings)
                 )
         
         return audit_findings
 
+    @staticmethod
+    def _failure_severity(findings):
+        """Maps a failed audit to a PAIN severity; the lower the review score, the more severe."""
+        score = findings.get("review", {}).get("score")
+        if isinstance(score, (int, float)):
+            return round(min(1.0, max(0.0, 1 - score / 10)), 2)
+        return None
+
     def _audit_code_quality(self, code_artifacts):
         """Audits the quality of the generated code using an LLM."""
         logger.debug("S3*: Auditing code quality with LLM.")
@@ -60,8 +73,7 @@ class AuditService:
                 logger.info(f"S3*: Performing LLM code review for: {filename}")
                 
                 try:
-                    with open(artifact_info["path"], 'r') as f:
-                        code_content = f.read()
+                    code_content = self.artifact_reader.read_text(artifact_info["path"])
                 except Exception as e:
                     logger.error(f"S3*: Could not read file {filename} for audit. Error: {e}")
                     continue
@@ -113,11 +125,17 @@ class AuditService:
         # Placeholder logic
         return {"status": "PASS", "details": "Implementation aligns with defined architecture."}
 
-# Singleton instance
-audit_service = AuditService()
+# Singleton instance, created on first use
+_audit_service = None
+_audit_service_lock = threading.Lock()
 
 def get_audit_service():
     """
     Returns the singleton AuditService instance.
     """
-    return audit_service
+    global _audit_service
+    if _audit_service is None:
+        with _audit_service_lock:
+            if _audit_service is None:
+                _audit_service = AuditService()
+    return _audit_service
@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark for the agent's modules.
+
+Imports each module in a fresh interpreter, several times, and reports the
+median wall-clock import time. Every run happens in an empty temporary
+working directory, so files created as an import side effect (log files,
+knowledge bases, ...) are reported too.
+
+Usage:
+    python benchmarks/cold_start.py [--runs N] [module ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "autonomous_app_writer.config",
+    "autonomous_app_writer.core.logging_setup",
+    "autonomous_app_writer.core.agent_state",
+    "autonomous_app_writer.core.llm_services",
+    "autonomous_app_writer.core.langgraph_orchestrator",
+    "autonomous_app_writer.utils.network_utils",
+    "autonomous_app_writer.vsm_system1_operational_agents",
+    "autonomous_app_writer.vsm_system3_operations.project_lifecycle_manager",
+    "autonomous_app_writer.main",
+    "autonomous_app_writer.ui",
+]
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("langgraph", "requests", "gradio", "openai") if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+def measure(module, runs):
+    """
+    Imports a module in `runs` fresh interpreters.
+
+    Returns:
+        dict: 'median' and 'min' seconds, the heavy third-party packages the
+        import pulled in, the files it created, or an 'error'.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    timings, heavy, created = [], "", set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            proc = subprocess.run(
+                [sys.executable, "-c", _PROBE.format(module=module)],
+                cwd=cwd, env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+                return {"error": error}
+            elapsed, _, heavy = proc.stdout.strip().splitlines()[-1].partition(" ")
+            timings.append(float(elapsed))
+            for root, _, files in os.walk(cwd):
+                created.update(os.path.relpath(os.path.join(root, name), cwd) for name in files)
+    return {"median": statistics.median(timings), "min": min(timings), "heavy": heavy, "created": sorted(created)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (default: 5)")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<72} {'median ms':>10} {'min ms':>8}  side effects")
+    for module in args.modules:
+        result = measure(module, args.runs)
+        if "error" in result:
+            print(f"{module:<72} {'-':>10} {'-':>8}  import failed: {result['error']}")
+            continue
+        notes = []
+        if result["heavy"]:
+            notes.append(f"imports {result['heavy']}")
+        if result["created"]:
+            notes.append(f"creates {', '.join(result['created'])}")
+        print(f"{module:<72} {result['median'] * 1000:>10.1f} {result['min'] * 1000:>8.1f}  {'; '.join(notes) or 'none'}")
+
+if __name__ == "__main__":
+    main()